@@ -0,0 +1,130 @@
+import asyncio
+import concurrent.futures
+import functools
+
+from BlastApi import BlastClient, results_path
+from BlastApi.Validator.BlastResultsValidator import RESULTS_SCHEMA
+from BlastApi.Validator.BlastSearchValidator import SEARCH_SCHEMA
+
+
+class AsyncBlastClient(BlastClient):
+    def __init__(self, *, transport=None, rate_limiter=None, result_cache=None, journal=None, endpoints=None,
+                 download_manager=None, observer=None, single_flight=None, max_workers=10):
+        r"""Creates asyncio-native NCBI-BLAST Common URL API client.
+
+        Waiting is done with asyncio.sleep, so single event loop can drive hundreds of in-flight submissions. Only
+        actual HTTP calls are run in a thread pool, all of them sharing connection pool of the transport.
+
+        :param transport: Transport used to send HTTP requests (see BlastApi.Transport.BlastTransport). Default: pooled,
+                keep-alive SessionTransport.
+        :param rate_limiter: Rate limiter throttling requests (see BlastApi.RateLimiter). Default: no limits.
+        :param result_cache: BlastApi.ResultCache.ResultCache used to reuse identical searches and their results.
+        :param journal: BlastApi.JobJournal.JobJournal recording submissions, status transitions and results locations.
+        :param endpoints: BlastApi.EndpointPool.EndpointPool or list of endpoints exposing the Common URL API.
+                Default: NCBI only.
+        :param download_manager: BlastApi.DownloadManager.DownloadManager used to download XML2 and JSON2 archives.
+        :param observer: BlastApi.Observer.BlastObserver receiving events of every HTTP call, submission, status check,
+                results retrieval and retry. Called from thread pool threads.
+        :param single_flight: BlastApi.SingleFlight.SingleFlight coalescing concurrent identical status checks and
+                results retrievals, also of different coroutines.
+        :param max_workers: Maximum number of concurrent HTTP calls. Should not exceed pool size of the transport.
+        """
+        super().__init__(transport=transport, rate_limiter=rate_limiter, result_cache=result_cache,
+                         journal=journal, endpoints=endpoints, download_manager=download_manager, observer=observer,
+                         single_flight=single_flight)
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        r"""Shuts down thread pool and closes pooled connections of the underlying transport."""
+        self.executor.shutdown(wait=False)
+        super().close()
+
+    async def search(self, query, database, program, *, filter=None, format_type=None, expect=None,
+                     nucl_reward=None, nucl_penalty=None, gapcosts=None, matrix=None, hitlist_size=None,
+                     descriptions=None, alignments=None, ncbi_gi=None, threshold=None, word_size=None,
+                     composition_based_statistics=None, num_threads=None):
+        r"""Sends search submission to NCBI-BLAST Common URL API. See BlastClient.search() for parameters description.
+
+        :return: Tuple of request_id and estimated time in seconds until the search is completed
+        """
+        params = self._search_params(SEARCH_SCHEMA.build(locals()))
+        cached = self._cached_submission(params)
+        if cached is not None:
+            return cached
+
+        return self._cache_submission(params, await self._run(self._submit, params))
+
+    async def check_submission_status(self, request_id):
+        r"""Checks submission status.
+
+        :param request_id: ID of requested submission
+        :return: Status of submission. 'WAITING', 'UNKNOWN' or 'READY'
+        """
+        return await self._run(self._fetch_status, request_id)
+
+    async def get_results(self, request_id, *, format_type='HTML', hitlist_size=None, descriptions=None,
+                          alignments=None, ncbi_gi=None, format_object=None, results_file_path='{rid}.zip',
+                          as_buffer=False):
+        r"""Retrieves results from NCBI. See BlastClient.get_results() for parameters description.
+
+        :return: Results, relative path to results file or ResultBuffer
+        """
+        results_file_path = None if as_buffer else results_path(results_file_path, request_id)
+        params = self._results_params(RESULTS_SCHEMA.build(locals()))
+
+        return await self._run(self._fetch_results, params, format_type, results_file_path)
+
+    async def get_results_multi(self, request_id, formats=('Tabular', 'XML2', 'Text'), *, hitlist_size=None,
+                                descriptions=None, alignments=None, ncbi_gi=None, format_object=None,
+                                results_file_path='{rid}_{format_type}.zip', as_buffer=False):
+        r"""Retrieves results in many formats at once, downloading them concurrently. See
+        BlastClient.get_results_multi() for parameters description.
+
+        :return: Dict of format type: results, path to results file or ResultBuffer, in order of formats
+        """
+        if as_buffer:
+            results_file_path = None
+        retrievals = self._multi_results_params(RESULTS_SCHEMA.build(locals()), formats, results_file_path)
+        results = await asyncio.gather(*(self._run(self._fetch_results, params, format_type, path)
+                                         for format_type, params, path in retrievals))
+        return {format_type: result for (format_type, _, _), result in zip(retrievals, results)}
+
+    async def wait_for_results(self, request_id, estimated_time=2, *, format_type='HTML', hitlist_size=None,
+                               descriptions=None, alignments=None, ncbi_gi=None, format_object=None,
+                               results_file_path='{rid}.zip', as_buffer=False):
+        r"""Waits for availability of results and retrieves it without blocking the event loop. See
+        BlastClient.wait_for_results() for parameters description.
+
+        :return: Results, relative path to results file or ResultBuffer
+        """
+        results_file_path = None if as_buffer else results_path(results_file_path, request_id)
+        if self.result_cache is not None:
+            params = self._results_params(RESULTS_SCHEMA.build(locals()))
+            cached = self._cached_results(params, format_type, results_file_path)
+            if cached is not None:
+                return cached
+
+        await asyncio.sleep(int(estimated_time))
+        status = await self.check_submission_status(request_id)
+        while status == 'WAITING':
+            await asyncio.sleep(2)
+            status = await self.check_submission_status(request_id)
+
+        if status == 'UNKNOWN':
+            self._forget_request_id(request_id)
+            raise ValueError("NCBI returned 'UNKNOWN' submition state")
+
+        return await self.get_results(request_id, format_type=format_type, hitlist_size=hitlist_size,
+                                      descriptions=descriptions, alignments=alignments, ncbi_gi=ncbi_gi,
+                                      format_object=format_object, results_file_path=results_file_path,
+                                      as_buffer=as_buffer)
+
+    async def _run(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(function, *args, **kwargs))
@@ -0,0 +1,229 @@
+import hashlib
+
+from BlastApi.BlastReport import BlastReport
+
+
+class BatchSubmission:
+    __slots__ = ('request_id', 'estimated_time', 'query_ids')
+
+    def __init__(self, request_id, estimated_time, query_ids):
+        r"""Single multi-FASTA submission.
+
+        :param request_id: ID of requested submission
+        :param estimated_time: Estimated time in seconds until the search is completed
+        :param query_ids: IDs of queries packed into the submission, in submission order
+        """
+        self.request_id = request_id
+        self.estimated_time = estimated_time
+        self.query_ids = query_ids
+
+    def __repr__(self):
+        return 'BatchSubmission(request_id={0}, queries={1})'.format(self.request_id, len(self.query_ids))
+
+
+class BatchSearch:
+    def __init__(self, client, *, max_residues=100000, max_sequences=100, deduplicate=False):
+        r"""Packs many queries into multi-FASTA submissions and splits returned reports back into per-query results.
+
+        :param client: BlastClient used to submit searches and retrieve results
+        :param max_residues: Maximal number of residues in single submission. Longer sequences are submitted alone.
+        :param max_sequences: Maximal number of sequences in single submission
+        :param deduplicate: If True, search() submits every distinct sequence once (see QueryDeduplicator) and yields
+                its results for IDs of all its duplicates
+        """
+        if max_residues <= 0 or max_sequences <= 0:
+            raise ValueError("Invalid 'max_residues' or 'max_sequences' parameter")
+        self.client = client
+        self.max_residues = max_residues
+        self.max_sequences = max_sequences
+        self.deduplicate = deduplicate
+
+    def pack(self, queries):
+        r"""Splits queries into batches respecting residues and sequences limits.
+
+        :param queries: Iterable of (query_id, sequence) tuples, BlastApi.FastaReader.FastaRecord objects or sequences
+                (IDs are generated then)
+        :return: Generator of lists of (query_id, sequence) tuples
+        """
+        batch = []
+        residues = 0
+        for number, query in enumerate(queries, 1):
+            query_id, sequence = as_query(query, number)
+            sequence = ''.join(sequence.split())
+            if batch and (residues + len(sequence) > self.max_residues or len(batch) >= self.max_sequences):
+                yield batch
+                batch = []
+                residues = 0
+            batch.append((query_id, sequence))
+            residues += len(sequence)
+        if batch:
+            yield batch
+
+    def submit(self, queries, database, program, **search_params):
+        r"""Submits queries packed into multi-FASTA batches. See BlastClient.search() for search parameters.
+
+        :param queries: Iterable of (query_id, sequence) tuples, FastaRecord objects or sequences
+        :param database: Name of existing database or one uploaded to blastdb_custom
+        :param program: BLAST Program
+        :return: Generator of BatchSubmission, one for every batch
+        """
+        for batch in self.pack(queries):
+            request_id, estimated_time = self.client.search(to_fasta(batch), database, program, **search_params)
+            yield BatchSubmission(request_id, estimated_time, [query_id for query_id, _ in batch])
+
+    def demultiplex(self, submission, report):
+        r"""Assigns query results of batch report to IDs of submitted queries. Queries are matched by ID in report
+        query title or ID. If report contains all submitted queries, the ones not matched by ID are matched by
+        position. Queries without results (e.g. ones without hits in Tabular report) are mapped to None.
+
+        :param submission: BatchSubmission
+        :param report: BlastReport of the submission
+        :return: Dict of query ID: QueryResult
+        """
+        results = {query_id: None for query_id in submission.query_ids}
+        queries = list(report)
+        unmatched = []
+        for query in queries:
+            query_id = _report_query_id(query, results)
+            if query_id is not None and results[query_id] is None:
+                results[query_id] = query
+            else:
+                unmatched.append(query)
+
+        if unmatched and len(queries) == len(submission.query_ids):
+            # Position is used only where neither the query ID nor the report query was matched by ID
+            unmatched = {id(query) for query in unmatched}
+            for query_id, query in zip(submission.query_ids, queries):
+                if id(query) in unmatched and results[query_id] is None:
+                    results[query_id] = query
+        return results
+
+    def search(self, queries, database, program, *, format_type='XML', results_file_path=None, **search_params):
+        r"""Submits queries in batches, waits for results of every batch and yields per-query results.
+
+        :param queries: Iterable of (query_id, sequence) tuples, FastaRecord objects or sequences
+        :param database: Name of existing database or one uploaded to blastdb_custom
+        :param program: BLAST Program
+        :param format_type: Report type. One of: ['XML', 'XML2', 'JSON2', 'Tabular']. Default: 'XML'.
+        :param results_file_path: Results file path for XML2 and JSON2 ('{rid}' is replaced with request ID).
+                Default: '{rid}.zip'
+        :return: Generator of (query_id, QueryResult) tuples. With deduplicate, duplicates share the QueryResult.
+        """
+        deduplicator = None
+        if self.deduplicate:
+            deduplicator = QueryDeduplicator(database, program, **search_params)
+            queries = deduplicator.unique(queries)
+        submissions = list(self.submit(queries, database, program, **search_params))
+        for submission in submissions:
+            path = (results_file_path or '{rid}.zip').format(rid=submission.request_id)
+            results = self.client.wait_for_results(submission.request_id, submission.estimated_time,
+                                                   format_type=format_type, results_file_path=path)
+            results = self.demultiplex(submission, BlastReport.read(results, format_type)).items()
+            yield from deduplicator.fan_out(results) if deduplicator is not None else results
+
+
+class QueryDeduplicator:
+    def __init__(self, database, program, **search_params):
+        r"""Drops exact-duplicate queries before submission and fans results of every submitted query back out to IDs
+        of its duplicates. Queries are identified by hash of their sequence, with case and whitespace folded, and
+        search parameters, so only hashes and query IDs are kept in memory. Query IDs have to be unique, as results
+        are assigned to them.
+
+        :param database: Name of database the queries are searched in
+        :param program: BLAST Program
+        :param search_params: Additional parameters of BlastClient.search()
+        """
+        self.query_count = 0
+        self._params = repr(sorted(dict(search_params, database=database, program=program).items()))
+        self._unique = dict()
+        self._duplicates = dict()
+        self._query_ids = set()
+
+    @property
+    def unique_count(self):
+        return len(self._unique)
+
+    def key(self, sequence):
+        r"""Returns key identifying the sequence searched with parameters of the deduplicator.
+
+        :param sequence: Query sequence
+        :return: Hex digest
+        """
+        normalized = ''.join(sequence.split()).upper()
+        return hashlib.sha256('{0}\0{1}'.format(self._params, normalized).encode('utf-8')).hexdigest()
+
+    def add(self, query_id, sequence):
+        r"""Registers query.
+
+        :param query_id: Query ID
+        :param sequence: Query sequence
+        :return: ID of the first query with the same key, query_id itself if the query has to be submitted
+        """
+        if query_id in self._query_ids:
+            raise ValueError("Duplicate query ID '{0}'".format(query_id))
+        self._query_ids.add(query_id)
+        self.query_count += 1
+        first_id = self._unique.setdefault(self.key(sequence), query_id)
+        if first_id != query_id:
+            self._duplicates.setdefault(first_id, []).append(query_id)
+        return first_id
+
+    def unique(self, queries):
+        r"""Filters out duplicates of already seen queries.
+
+        :param queries: Iterable of (query_id, sequence) tuples, BlastApi.FastaReader.FastaRecord objects or sequences
+                (IDs are generated then)
+        :return: Generator of (query_id, sequence) tuples to submit
+        """
+        for number, query in enumerate(queries, 1):
+            query_id, sequence = as_query(query, number)
+            if self.add(query_id, sequence) == query_id:
+                yield query_id, sequence
+
+    def duplicates(self, query_id):
+        r"""Returns IDs of queries sharing results of submitted query.
+
+        :param query_id: ID of submitted query
+        :return: List of the query ID and IDs of its duplicates
+        """
+        return [query_id] + self._duplicates.get(query_id, [])
+
+    def fan_out(self, results):
+        r"""Assigns results of submitted queries to all their duplicates.
+
+        :param results: Iterable of (query_id, result) tuples of submitted queries
+        :return: Generator of (query_id, result) tuples for every registered query
+        """
+        for query_id, result in results:
+            for duplicate_id in self.duplicates(query_id):
+                yield duplicate_id, result
+
+
+def as_query(query, number):
+    r"""Converts query to (query_id, sequence) tuple.
+
+    :param query: (query_id, sequence) tuple, BlastApi.FastaReader.FastaRecord object or sequence
+    :param number: Position of the query, used to generate ID of plain sequences
+    :return: Tuple of query ID and sequence
+    """
+    if hasattr(query, 'to_query'):
+        query = query.to_query()
+    return query if isinstance(query, tuple) else ('query_{0}'.format(number), query)
+
+
+def to_fasta(queries):
+    r"""Formats queries as multi-FASTA.
+
+    :param queries: Iterable of (query_id, sequence) tuples
+    :return: Multi-FASTA string
+    """
+    return ''.join('>{0}\n{1}\n'.format(query_id, sequence) for query_id, sequence in queries)
+
+
+def _report_query_id(query, results):
+    for value in (query.query_title, query.query_id):
+        if value:
+            query_id = value.split(None, 1)[0]
+            if query_id in results:
+                return query_id
+    return None
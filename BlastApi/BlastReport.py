@@ -0,0 +1,221 @@
+from BlastApi.Parser import QUERY, HIT, HSP
+
+_HSP_FIELDS = ('num', 'bit_score', 'score', 'evalue', 'identity', 'positive', 'gaps', 'align_len', 'query_from',
+               'query_to', 'hit_from', 'hit_to', 'query_strand', 'hit_strand', 'query_frame', 'hit_frame')
+_HIT_FIELDS = ('num', 'id', 'accession', 'title', 'taxid', 'sciname', 'len')
+_QUERY_FIELDS = ('query_id', 'query_title', 'query_len')
+_TABULAR_QUERY_COLUMNS = ('query_acc_ver', 'query_id', 'query_acc', 'query_gi')
+_TABULAR_SUBJECT_COLUMNS = ('subject_acc_ver', 'subject_id', 'subject_ids', 'subject_acc', 'subject_gi')
+_TABULAR_HSP_COLUMNS = {'bit_score': 'bit_score', 'score': 'score', 'evalue': 'evalue', 'gaps': 'gaps',
+                        'positives': 'positive', 'alignment_length': 'align_len', 'query_start': 'query_from',
+                        'query_end': 'query_to', 'subject_start': 'hit_from', 'subject_end': 'hit_to',
+                        'query_frame': 'query_frame', 'subject_frame': 'hit_frame'}
+
+
+class Hsp:
+    __slots__ = _HSP_FIELDS + ('_alignment', '_alignment_len')
+
+    def __init__(self, **fields):
+        r"""High-scoring segment pair. Alignment strings (qseq, hseq, midline) are kept as single ASCII bytes object
+        and decoded only when accessed.
+
+        :param fields: Hsp fields (see _HSP_FIELDS) and optional qseq, hseq and midline strings
+        """
+        for field in _HSP_FIELDS:
+            setattr(self, field, fields.get(field))
+        qseq, hseq, midline = fields.get('qseq'), fields.get('hseq'), fields.get('midline')
+        if qseq is None:
+            self._alignment = None
+            self._alignment_len = 0
+        else:
+            self._alignment = ''.join((qseq, hseq or '', midline or '')).encode('ascii')
+            self._alignment_len = (len(qseq), len(hseq or ''))
+
+    @property
+    def qseq(self):
+        return self._alignment_part(0)
+
+    @property
+    def hseq(self):
+        return self._alignment_part(1)
+
+    @property
+    def midline(self):
+        return self._alignment_part(2)
+
+    @property
+    def percent_identity(self):
+        if self.identity is None or not self.align_len:
+            return None
+        return 100 * self.identity / self.align_len
+
+    def _alignment_part(self, index):
+        if self._alignment is None:
+            return None
+        qseq_len, hseq_len = self._alignment_len
+        bounds = (0, qseq_len, qseq_len + hseq_len, len(self._alignment))
+        return self._alignment[bounds[index]:bounds[index + 1]].decode('ascii')
+
+    def __repr__(self):
+        return 'Hsp(num={0}, evalue={1}, bit_score={2})'.format(self.num, self.evalue, self.bit_score)
+
+
+class Hit:
+    __slots__ = _HIT_FIELDS + ('hsps',)
+
+    def __init__(self, hsps=None, **fields):
+        r"""Database sequence matched by query.
+
+        :param hsps: List of Hsp
+        :param fields: Hit fields (see _HIT_FIELDS)
+        """
+        for field in _HIT_FIELDS:
+            setattr(self, field, fields.get(field))
+        self.hsps = hsps if hsps is not None else []
+
+    def __repr__(self):
+        return 'Hit(num={0}, accession={1}, hsps={2})'.format(self.num, self.accession, len(self.hsps))
+
+
+class QueryResult:
+    __slots__ = _QUERY_FIELDS + ('hits',)
+
+    def __init__(self, hits=None, **fields):
+        r"""Results of single query.
+
+        :param hits: List of Hit
+        :param fields: Query fields (see _QUERY_FIELDS)
+        """
+        for field in _QUERY_FIELDS:
+            setattr(self, field, fields.get(field))
+        self.hits = hits if hits is not None else []
+
+    def __repr__(self):
+        return 'QueryResult(query_id={0}, hits={1})'.format(self.query_id, len(self.hits))
+
+
+class BlastReport:
+    __slots__ = ('queries',)
+
+    def __init__(self, queries=None):
+        r"""BLAST report.
+
+        :param queries: List of QueryResult
+        """
+        self.queries = queries if queries is not None else []
+
+    def __iter__(self):
+        return iter(self.queries)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def __repr__(self):
+        return 'BlastReport(queries={0})'.format(len(self.queries))
+
+    @classmethod
+    def read(cls, results, format_type, *, parallel=False):
+        r"""Builds report from results retrieved by BlastClient.get_results().
+
+        :param results: Results (XML or Tabular) or path to results file (XML2 or JSON2)
+        :param format_type: Report type. One of: ['XML', 'XML2', 'JSON2', 'Tabular']
+        :param parallel: If True, members of XML2 and JSON2 archives are parsed in worker processes
+        :return: BlastReport
+        """
+        if format_type == 'XML2' or format_type == 'JSON2':
+            return cls.from_archive(results, parallel=parallel)
+        if format_type == 'XML':
+            return cls.from_xml(results)
+        if format_type == 'Tabular':
+            return cls.from_tabular(results)
+        raise ValueError("Invalid 'format_type' parameter")
+
+    @classmethod
+    def from_records(cls, records):
+        r"""Builds report from (kind, record) tuples yielded by parsers from BlastApi.Parser.
+
+        :param records: Iterable of (kind, record) tuples
+        :return: BlastReport
+        """
+        return cls(list(iter_query_results(records)))
+
+    @classmethod
+    def from_archive(cls, archive, *, parallel=False):
+        r"""Builds report from XML2 or JSON2 archive.
+
+        :param archive: Path to the archive or binary file-like object
+        :param parallel: If True, archive members are parsed in worker processes (see
+                BlastApi.Parser.ParallelArchiveParser)
+        :return: BlastReport
+        """
+        if parallel:
+            from BlastApi.Parser.ParallelArchiveParser import ParallelArchiveParser
+            return cls.from_records(ParallelArchiveParser(archive))
+        from BlastApi.Parser.ArchiveParser import ArchiveParser
+        return cls.from_records(ArchiveParser(archive))
+
+    @classmethod
+    def from_xml(cls, source):
+        r"""Builds report from XML results.
+
+        :param source: XML report as str or bytes, path to file or binary file-like object
+        :return: BlastReport
+        """
+        from BlastApi.Parser.XmlParser import XmlParser
+        return cls.from_records(XmlParser(source))
+
+    @classmethod
+    def from_tabular(cls, report):
+        r"""Builds report from Tabular results. Alignment strings are not available in Tabular reports.
+
+        :param report: Tabular report as str or bytes, or BlastApi.Parser.TabularParser.TabularReport
+        :return: BlastReport
+        """
+        from BlastApi.Parser.TabularParser import parse_tabular
+        if isinstance(report, (str, bytes, bytearray, memoryview)):
+            report = parse_tabular(report)
+
+        columns = report.columns()
+        query_column = next(columns[name] for name in _TABULAR_QUERY_COLUMNS if name in columns)
+        subject_column = next(columns[name] for name in _TABULAR_SUBJECT_COLUMNS if name in columns)
+        hsp_columns = [(field, columns[name]) for name, field in _TABULAR_HSP_COLUMNS.items() if name in columns]
+        identity = columns.get('identity')
+        align_len = columns.get('alignment_length')
+
+        queries = []
+        query = hit = None
+        for row in range(len(report)):
+            query_id, subject_id = str(query_column[row]), str(subject_column[row])
+            if query is None or query.query_id != query_id:
+                query = QueryResult(query_id=query_id)
+                queries.append(query)
+                hit = None
+            if hit is None or hit.id != subject_id:
+                hit = Hit(num=len(query.hits) + 1, id=subject_id, accession=subject_id)
+                query.hits.append(hit)
+            fields = {field: column[row].item() for field, column in hsp_columns}
+            if identity is not None and align_len is not None:
+                fields['identity'] = round(identity[row].item() * align_len[row].item() / 100)
+            hit.hsps.append(Hsp(num=len(hit.hsps) + 1, **fields))
+        return cls(queries)
+
+
+def iter_query_results(records):
+    r"""Builds QueryResult objects from (kind, record) tuples, yielding every query as soon as it is complete.
+
+    :param records: Iterable of (kind, record) tuples yielded by parsers from BlastApi.Parser
+    :return: Generator of QueryResult
+    """
+    query = hit = None
+    for kind, record in records:
+        if kind == QUERY:
+            if query is not None:
+                yield query
+            query = QueryResult(**{field: record.get(field) for field in _QUERY_FIELDS})
+        elif kind == HIT:
+            hit = Hit(**{field: record.get(field) for field in _HIT_FIELDS})
+            query.hits.append(hit)
+        elif kind == HSP:
+            hit.hsps.append(Hsp(**record))
+    if query is not None:
+        yield query
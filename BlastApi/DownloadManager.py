@@ -0,0 +1,200 @@
+import concurrent.futures
+import contextlib
+import os
+import uuid
+import zipfile
+
+from BlastApi.ResultBuffer import ResultBuffer
+
+_PARTIAL_CONTENT = 206
+
+
+class DownloadManager:
+    def __init__(self, *, chunk_size=64 * 1024, parallel_parts=4, min_part_size=4 * 1024 * 1024, max_resumes=3,
+                 verify=True, spool_size=1024 * 1024):
+        r"""Downloads results archives (XML2, JSON2) to unique temporary files, which are renamed to the destination
+        path only when complete, so concurrent downloads to the same path never leave mixed or truncated file.
+
+        Dropped connections are resumed with HTTP Range requests if the server accepts them (otherwise the download
+        starts over). Large archives are fetched in parallel ranges.
+
+        :param chunk_size: Number of bytes read at once
+        :param parallel_parts: Maximal number of ranges fetched in parallel. 1 disables parallel download.
+        :param min_part_size: Minimal number of bytes of a single range
+        :param max_resumes: Number of resumes of a single range before the download fails
+        :param verify: If True, CRC of every archive member is checked before rename
+        :param spool_size: Number of bytes of results buffer (see buffer()) kept in memory before it's moved to
+                temporary file
+        """
+        self.chunk_size = chunk_size
+        self.parallel_parts = parallel_parts
+        self.min_part_size = min_part_size
+        self.max_resumes = max_resumes
+        self.verify = verify
+        self.spool_size = spool_size
+
+    def download(self, request, path, *, on_retry=None):
+        r"""Downloads archive to the path.
+
+        :param request: Function sending the request. Takes dict of additional HTTP headers (or None) and returns
+                streamed response.
+        :param path: Destination path
+        :param on_retry: Function called with attempt number and error before interrupted download is resumed
+        :return: Destination path
+        """
+        with _temporary_file(path) as temp_path:
+            self._download(request, temp_path, on_retry)
+            if self.verify:
+                verify_archive(temp_path)
+            os.replace(temp_path, path)
+        return path
+
+    def buffer(self, request, *, archive=True, on_retry=None):
+        r"""Downloads results to BlastApi.ResultBuffer.ResultBuffer instead of a file. Dropped connections are resumed
+        the same way as by download(), ranges are never fetched in parallel.
+
+        :param request: Function sending the request. Takes dict of additional HTTP headers (or None) and returns
+                streamed response.
+        :param archive: If True, results are zip archive verified when complete
+        :param on_retry: Function called with attempt number and error before interrupted download is resumed
+        :return: ResultBuffer positioned at the beginning
+        """
+        buffer = ResultBuffer(max_size=self.spool_size)
+        try:
+            response = request(None)
+            size = _content_length(response)
+            self._fetch(request, buffer, 0, size, response=response, ranges=size is not None and _accepts_ranges(
+                response), on_retry=on_retry)
+            if archive and self.verify:
+                verify_archive(buffer)
+        except BaseException:
+            buffer.close()
+            raise
+        buffer.seek(0)
+        return buffer
+
+    def save(self, data, path):
+        r"""Atomically writes archive already held in memory (e.g. cached one) to the path.
+
+        :param data: Archive bytes
+        :param path: Destination path
+        :return: Destination path
+        """
+        with _temporary_file(path) as temp_path:
+            with open(temp_path, 'wb') as file:
+                file.write(data)
+            os.replace(temp_path, path)
+        return path
+
+    def _download(self, request, temp_path, on_retry):
+        response = request(None)
+        size = _content_length(response)
+        ranges = size is not None and _accepts_ranges(response)
+        parts = self._parts(size) if ranges else [(0, size)]
+        if len(parts) == 1:
+            self._fetch_range(request, temp_path, 0, size, response=response, ranges=ranges, on_retry=on_retry)
+            return
+
+        with open(temp_path, 'r+b') as file:
+            file.truncate(size)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(parts) - 1) as executor:
+            futures = [executor.submit(self._fetch_range, request, temp_path, start, end, on_retry=on_retry)
+                       for start, end in parts[1:]]
+            try:
+                self._fetch_range(request, temp_path, *parts[0], response=response, on_retry=on_retry)
+            finally:
+                errors = [future.exception() for future in futures]
+        for error in errors:
+            if error is not None:
+                raise error
+
+    def _parts(self, size):
+        count = max(1, min(self.parallel_parts, size // max(self.min_part_size, 1)))
+        bounds = [size * number // count for number in range(count + 1)]
+        return list(zip(bounds, bounds[1:]))
+
+    def _fetch_range(self, request, path, start, end, *, response=None, ranges=True, on_retry=None):
+        with open(path, 'r+b') as file:
+            self._fetch(request, file, start, end, response=response, ranges=ranges, on_retry=on_retry)
+
+    def _fetch(self, request, file, start, end, *, response=None, ranges=True, on_retry=None):
+        offset = start
+        resumes = 0
+        while True:
+            try:
+                if response is None:
+                    response = request({'Range': 'bytes={0}-{1}'.format(offset, end - 1)} if ranges else None)
+                file.seek(offset)
+                offset = self._write(response, file, offset, end)
+                if end is None:
+                    file.truncate(offset)
+                    return
+                if offset >= end:
+                    return
+                raise ConnectionError('Connection closed after {0} of {1} bytes'.format(offset, end))
+            except OSError as error:
+                resumes += 1
+                if resumes > self.max_resumes:
+                    raise
+                if on_retry is not None:
+                    on_retry(resumes, error)
+                if not ranges:
+                    offset = start
+            finally:
+                if response is not None:
+                    response.close()
+                response = None
+
+    def _write(self, response, file, offset, end):
+        # Body of '206 Partial Content' starts at requested offset, any other body starts at the beginning of the file
+        position = offset if getattr(response, 'status_code', None) == _PARTIAL_CONTENT else 0
+        for chunk in response.iter_content(chunk_size=self.chunk_size):
+            chunk_end = position + len(chunk)
+            if chunk_end > offset:
+                data = chunk[offset - position:None if end is None else end - position]
+                file.write(data)
+                offset += len(data)
+            position = chunk_end
+            if end is not None and offset >= end:
+                break
+        return offset
+
+
+@contextlib.contextmanager
+def _temporary_file(path):
+    # Created next to the destination (os.replace() doesn't work across file systems), with permissions set by umask
+    directory, name = os.path.split(os.path.abspath(path))
+    temp_path = os.path.join(directory, '.{0}.{1}.part'.format(name, uuid.uuid4().hex))
+    open(temp_path, 'xb').close()
+    try:
+        yield temp_path
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def verify_archive(path):
+    r"""Checks that the file is a complete zip archive with valid CRC of every member.
+
+    :param path: Path to the archive or binary file-like object
+    """
+    try:
+        with zipfile.ZipFile(path) as archive:
+            corrupted = archive.testzip()
+    except zipfile.BadZipFile:
+        raise ValueError("Invalid results archive '{0}'".format(path)) from None
+    if corrupted is not None:
+        raise ValueError("Corrupted member '{0}' of results archive '{1}'".format(corrupted, path))
+
+
+def _content_length(response):
+    headers = getattr(response, 'headers', dict())
+    if headers.get('Content-Encoding', 'identity').lower() != 'identity':
+        # Length of encoded body, not of the archive
+        return None
+    length = headers.get('Content-Length')
+    return int(length) if length is not None and length.isdigit() else None
+
+
+def _accepts_ranges(response):
+    return getattr(response, 'headers', dict()).get('Accept-Ranges', '').lower() == 'bytes'
@@ -0,0 +1,174 @@
+import collections
+import threading
+import time
+
+_SERVER_ERROR = 500
+
+
+class Endpoint:
+    __slots__ = ('url', 'weight', 'in_flight', 'searches', 'failures', 'ejected_until')
+
+    def __init__(self, url, weight=1):
+        r"""Single BLAST Common URL API endpoint (NCBI or self-hosted cloud instance).
+
+        :param url: URL of the API (e.g. 'https://blast.ncbi.nlm.nih.gov/Blast.cgi')
+        :param weight: Relative capacity of the endpoint. Number greater than zero.
+        """
+        if weight <= 0:
+            raise ValueError("Invalid 'weight' parameter")
+        self.url = url
+        self.weight = weight
+        self.in_flight = 0
+        self.searches = 0
+        self.failures = 0
+        self.ejected_until = 0
+
+    def load(self):
+        r"""Returns load of the endpoint: number of running searches and in-flight requests divided by weight."""
+        return (self.searches + self.in_flight) / self.weight
+
+    def is_healthy(self, now=None):
+        return self.ejected_until <= (time.monotonic() if now is None else now)
+
+    def __repr__(self):
+        return 'Endpoint(url={0}, weight={1})'.format(self.url, self.weight)
+
+
+class EndpointPool:
+    def __init__(self, endpoints, *, max_failures=3, eject_time=30, max_request_ids=100000):
+        r"""Balances requests across many endpoints exposing the same Common URL API.
+
+        Submissions go to the healthy endpoint with the lowest load. Status checks and results retrieval of a request
+        ID stick to the endpoint which issued it, request IDs of unknown endpoint are rejected (with more than one
+        endpoint), as other endpoints would report them 'UNKNOWN'. Endpoint is ejected for eject_time seconds after
+        max_failures consecutive failures (connection errors or 5xx responses). If all endpoints are ejected, the one
+        which comes back first is used.
+
+        :param endpoints: List of Endpoint objects, URLs or (url, weight) tuples
+        :param max_failures: Number of consecutive failures ejecting endpoint
+        :param eject_time: Number of seconds endpoint stays ejected
+        :param max_request_ids: Number of request IDs remembered, the oldest ones are forgotten first
+        """
+        self.endpoints = [self._endpoint(endpoint) for endpoint in endpoints]
+        if not self.endpoints:
+            raise ValueError("Invalid 'endpoints' parameter")
+        self.max_failures = max_failures
+        self.eject_time = eject_time
+        self.max_request_ids = max_request_ids
+        self._request_ids = collections.OrderedDict()
+        self._running = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.endpoints)
+
+    def select(self, request_id=None):
+        r"""Selects endpoint for a request and counts it as in-flight until release_request() is called.
+
+        :param request_id: ID of requested submission. None for submissions.
+        :return: Endpoint
+        """
+        with self._lock:
+            endpoint = self._request_ids.get(request_id) if request_id is not None else None
+            if endpoint is None and request_id is not None and len(self.endpoints) > 1:
+                raise ValueError("Unknown endpoint of request ID '{0}'".format(request_id))
+            if endpoint is None:
+                now = time.monotonic()
+                healthy = [endpoint for endpoint in self.endpoints if endpoint.is_healthy(now)]
+                if healthy:
+                    endpoint = min(healthy, key=Endpoint.load)
+                else:
+                    endpoint = min(self.endpoints, key=lambda candidate: candidate.ejected_until)
+            endpoint.in_flight += 1
+        return endpoint
+
+    def release_request(self, endpoint, *, failed=False):
+        r"""Finishes in-flight request and updates health of the endpoint.
+
+        :param endpoint: Endpoint returned by select()
+        :param failed: True if request failed
+        """
+        with self._lock:
+            endpoint.in_flight -= 1
+            if not failed:
+                endpoint.failures = 0
+                return
+            endpoint.failures += 1
+            if endpoint.failures >= self.max_failures:
+                endpoint.failures = 0
+                endpoint.ejected_until = time.monotonic() + self.eject_time
+
+    def bind(self, request_id, endpoint):
+        r"""Binds request ID to the endpoint which issued it. Search counts to endpoint load until finish().
+
+        :param request_id: ID of requested submission
+        :param endpoint: Endpoint which issued the request ID
+        """
+        with self._lock:
+            self._finish(request_id)
+            self._request_ids[request_id] = endpoint
+            self._request_ids.move_to_end(request_id)
+            self._running.add(request_id)
+            endpoint.searches += 1
+            while len(self._request_ids) > self.max_request_ids:
+                oldest = next(iter(self._request_ids))
+                self._finish(oldest)
+                del self._request_ids[oldest]
+
+    def finish(self, request_id):
+        r"""Stops counting search of the request ID to endpoint load (results were retrieved or search expired).
+        Request ID stays bound, so results in other formats are still retrieved from the same endpoint.
+
+        :param request_id: ID of requested submission
+        """
+        with self._lock:
+            self._finish(request_id)
+
+    def find(self, url):
+        r"""Returns endpoint of the pool with given URL.
+
+        :param url: URL of the API
+        :return: Endpoint or None
+        """
+        return next((endpoint for endpoint in self.endpoints if endpoint.url == url), None)
+
+    def endpoint_of(self, request_id):
+        r"""Returns endpoint bound to the request ID.
+
+        :param request_id: ID of requested submission
+        :return: Endpoint or None
+        """
+        with self._lock:
+            return self._request_ids.get(request_id)
+
+    def request(self, transport, params, *, stream=False, headers=None, endpoint=None):
+        r"""Sends request through the transport to selected endpoint.
+
+        :param transport: BlastApi.Transport.BlastTransport
+        :param params: Request parameters
+        :param stream: If True response content is not downloaded immediately
+        :param headers: Additional HTTP headers
+        :param endpoint: Endpoint to use. Default: endpoint selected for the request ID in params.
+        :return: Response
+        """
+        endpoint = endpoint if endpoint is not None else self.select(params.get('RID'))
+        try:
+            response = transport.get(endpoint.url, params, stream=stream, headers=headers)
+        except Exception:
+            self.release_request(endpoint, failed=True)
+            raise
+        self.release_request(endpoint, failed=getattr(response, 'status_code', 200) >= _SERVER_ERROR)
+        return response
+
+    def _finish(self, request_id):
+        if request_id in self._running:
+            self._running.discard(request_id)
+            self._request_ids[request_id].searches -= 1
+
+    @staticmethod
+    def _endpoint(endpoint):
+        if isinstance(endpoint, Endpoint):
+            return endpoint
+        if isinstance(endpoint, str):
+            return Endpoint(endpoint)
+        return Endpoint(*endpoint)
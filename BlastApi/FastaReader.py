@@ -0,0 +1,210 @@
+import array
+import mmap
+import os
+import tempfile
+
+_RECORD_START = b'\n>'
+_WHITESPACE = b'\r\n\t '
+_INDEX_SUFFIX = '.bfi'
+
+
+class FastaRecord:
+    __slots__ = ('_buffer', '_start', '_end')
+
+    def __init__(self, buffer, start, end):
+        r"""Single FASTA record. Holds only its offsets in memory-mapped file, header and sequence are decoded when
+        accessed.
+
+        :param buffer: Memory-mapped FASTA file
+        :param start: Offset of record start ('>' character)
+        :param end: Offset of record end
+        """
+        self._buffer = buffer
+        self._start = start
+        self._end = end
+
+    @property
+    def raw(self):
+        r"""Record as memoryview of the mapped file (no copy). Must be released before reader is closed."""
+        return memoryview(self._buffer)[self._start:self._end]
+
+    @property
+    def header(self):
+        return bytes(self._buffer[self._start + 1:self._header_end()]).decode('utf-8').rstrip('\r')
+
+    @property
+    def id(self):
+        header = self.header
+        return header.split(None, 1)[0] if header.strip() else ''
+
+    @property
+    def description(self):
+        parts = self.header.split(None, 1)
+        return parts[1] if len(parts) > 1 else ''
+
+    @property
+    def sequence(self):
+        return bytes(self._buffer[self._header_end():self._end]).translate(None, _WHITESPACE).decode('ascii')
+
+    def to_fasta(self):
+        r"""Formats record as FASTA, ready to be passed as BlastClient.search() query.
+
+        :return: FASTA string
+        """
+        return '>{0}\n{1}\n'.format(self.header, self.sequence)
+
+    def to_query(self):
+        r"""Returns record as (query_id, sequence) tuple accepted by BlastApi.BatchSearch.BatchSearch.
+
+        :return: Tuple of record ID and sequence
+        """
+        return self.id, self.sequence
+
+    def _header_end(self):
+        header_end = self._buffer.find(b'\n', self._start, self._end)
+        return header_end if header_end >= 0 else self._end
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __repr__(self):
+        return 'FastaRecord(id={0}, bytes={1})'.format(self.id, len(self))
+
+
+class FastaReader:
+    def __init__(self, path, *, index_path=None):
+        r"""Memory-mapped multi-FASTA reader. Records are yielded without reading the whole file and decoded only on
+        demand. Offset index of records can be built once, saved next to the file and reused by many workers, so every
+        worker can seek straight to its own shard.
+
+        :param path: Path to FASTA file
+        :param index_path: Path to offset index file. Default: path + '.bfi'
+        """
+        self.path = path
+        self.index_path = index_path if index_path is not None else path + _INDEX_SUFFIX
+        self.index = None
+        self._file = open(path, 'rb')
+        status = os.fstat(self._file.fileno())
+        # Index is valid only for the same file size and modification time
+        self._index_header = array.array('Q', [status.st_size, status.st_mtime_ns])
+        self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if status.st_size else b''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __iter__(self):
+        start = self._first_record()
+        while start >= 0:
+            end = self._buffer.find(_RECORD_START, start + 1)
+            end = end + 1 if end >= 0 else len(self._buffer)
+            yield FastaRecord(self._buffer, start, end)
+            start = end if end < len(self._buffer) else -1
+
+    def __len__(self):
+        return len(self._load_index()) - 1
+
+    def __getitem__(self, number):
+        index = self._load_index()
+        if number < 0:
+            number += len(index) - 1
+        if not 0 <= number < len(index) - 1:
+            raise IndexError('FASTA record index out of range')
+        return FastaRecord(self._buffer, index[number], index[number + 1])
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._file.close()
+
+    def build_index(self, *, save=True):
+        r"""Builds offset index of records: start offset of every record followed by end offset of the last one.
+
+        :param save: If True index is saved to index_path
+        :return: array.array of offsets
+        """
+        index = array.array('Q')
+        end = len(self._buffer)
+        for record in self:
+            index.append(record._start)
+            end = record._end
+        index.append(end)
+        self.index = index
+        if save:
+            self.save_index()
+        return index
+
+    def save_index(self):
+        r"""Saves offset index to index_path. Index starts with size and modification time (in nanoseconds) of indexed
+        file. The index is written to temporary file replacing index_path, so concurrent readers never load partially
+        written index.
+        """
+        index_path = os.path.abspath(self.index_path)
+        descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(index_path), prefix='.tmp-')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                self._index_header.tofile(file)
+                self.index.tofile(file)
+            os.replace(temp_path, index_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def load_index(self):
+        r"""Loads offset index from index_path.
+
+        :return: array.array of offsets or None if index file doesn't exist or was built for different file size or
+                modification time
+        """
+        if not os.path.exists(self.index_path):
+            return None
+        index = array.array('Q')
+        with open(self.index_path, 'rb') as file:
+            index.frombytes(file.read())
+        header_size = len(self._index_header)
+        if index[:header_size] != self._index_header:
+            return None
+        self.index = index[header_size:]
+        return self.index
+
+    def records(self, start=0, stop=None):
+        r"""Yields records from given range of record numbers, using offset index.
+
+        :param start: Number of the first record
+        :param stop: Number of record after the last one. Default: number of records
+        :return: Generator of FastaRecord
+        """
+        index = self._load_index()
+        stop = len(index) - 1 if stop is None else min(stop, len(index) - 1)
+        for number in range(start, stop):
+            yield FastaRecord(self._buffer, index[number], index[number + 1])
+
+    def shard(self, worker_index, worker_count):
+        r"""Yields records of single worker's shard. Records are split into worker_count contiguous shards of equal
+        size.
+
+        :param worker_index: Number of the worker (from 0 to worker_count - 1)
+        :param worker_count: Number of workers
+        :return: Generator of FastaRecord
+        """
+        if not 0 <= worker_index < worker_count:
+            raise ValueError("Invalid 'worker_index' parameter")
+        count = len(self)
+        return self.records(count * worker_index // worker_count, count * (worker_index + 1) // worker_count)
+
+    def _load_index(self):
+        if self.index is None and self.load_index() is None:
+            self.build_index(save=False)
+            try:
+                self.save_index()
+            except OSError:
+                pass
+        return self.index
+
+    def _first_record(self):
+        if self._buffer[:1] == b'>':
+            return 0
+        start = self._buffer.find(_RECORD_START)
+        return start + 1 if start >= 0 else -1
@@ -0,0 +1,267 @@
+import concurrent.futures
+import json
+import sqlite3
+import threading
+import time
+
+from BlastApi.PollScheduler import PollScheduler
+from BlastApi.ResultCache import params_hash
+
+SUBMITTED = 'SUBMITTED'
+FETCHED = 'FETCHED'
+_TERMINAL_STATUSES = (FETCHED, 'UNKNOWN')
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS jobs (request_id TEXT PRIMARY KEY, params_hash TEXT NOT NULL, params TEXT NOT NULL, '
+    'estimated_time INTEGER, submitted_at REAL NOT NULL, status TEXT NOT NULL, updated_at REAL NOT NULL, '
+    'results_location TEXT, endpoint TEXT)',
+    'CREATE TABLE IF NOT EXISTS transitions (request_id TEXT NOT NULL, status TEXT NOT NULL, at REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)',
+)
+_COLUMNS = ('request_id, params_hash, params, estimated_time, submitted_at, status, updated_at, results_location, '
+            'endpoint')
+
+
+class JournalEntry:
+    __slots__ = ('request_id', 'params_hash', 'params', 'estimated_time', 'submitted_at', 'status', 'updated_at',
+                 'results_location', 'endpoint')
+
+    def __init__(self, request_id, params_hash, params, estimated_time, submitted_at, status, updated_at,
+                 results_location, endpoint=None):
+        self.request_id = request_id
+        self.params_hash = params_hash
+        self.params = params
+        self.estimated_time = estimated_time
+        self.submitted_at = submitted_at
+        self.status = status
+        self.updated_at = updated_at
+        self.results_location = results_location
+        self.endpoint = endpoint
+
+    def remaining_time(self, now=None):
+        r"""Returns number of seconds left until estimated completion of the search.
+
+        :param now: Current time (time.time()). Default: now
+        :return: Number of seconds, not lower than 0
+        """
+        now = time.time() if now is None else now
+        return max(0, int(self.submitted_at + (self.estimated_time or 0) - now))
+
+    def __repr__(self):
+        return 'JournalEntry(request_id={0}, status={1})'.format(self.request_id, self.status)
+
+
+class JobJournal:
+    def __init__(self, database_path, *, batch_size=100, flush_interval=1.0):
+        r"""Persistent journal of submissions stored in SQLite database (WAL mode). Records params hash, request ID,
+        RTOE, submission time, status transitions and results location of every search, so searches of crashed workers
+        can be resumed instead of submitted again.
+
+        Submissions are written immediately, status transitions and results locations are written in batches: when
+        batch_size records are pending, every flush_interval seconds, on flush() and on close().
+
+        :param database_path: Path to SQLite database file
+        :param batch_size: Number of pending records triggering write
+        :param flush_interval: Maximal number of seconds pending records are kept in memory
+        """
+        self.database_path = database_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._connection = sqlite3.connect(database_path, check_same_thread=False, timeout=30)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        with self._connection:
+            for statement in _SCHEMA:
+                self._connection.execute(statement)
+            # Journals created before endpoints were recorded
+            columns = [row[1] for row in self._connection.execute('PRAGMA table_info(jobs)')]
+            if 'endpoint' not in columns:
+                self._connection.execute('ALTER TABLE jobs ADD COLUMN endpoint TEXT')
+        self._pending = []
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name='JobJournal', daemon=True)
+        self._flusher.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        r"""Writes pending records and closes database."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._flusher.join()
+        self.flush()
+        self._connection.close()
+
+    def record_submission(self, params, request_id, estimated_time, endpoint=None):
+        r"""Records submitted search. Written immediately together with all pending records.
+
+        :param params: Search parameters
+        :param request_id: ID of requested submission
+        :param estimated_time: Estimated time in seconds until the search is completed
+        :param endpoint: URL of the endpoint which issued the request ID. None if the client has no EndpointPool.
+        """
+        now = time.time()
+        encoded_params = json.dumps({key: value for key, value in params.items() if key != 'CMD'}, sort_keys=True,
+                                    default=str)
+        self._add(('INSERT OR REPLACE INTO jobs (request_id, params_hash, params, estimated_time, submitted_at, '
+                   'status, updated_at, results_location, endpoint) VALUES (?, ?, ?, ?, ?, ?, ?, NULL, ?)',
+                   (request_id, params_hash(params), encoded_params, int(estimated_time or 0), now, SUBMITTED, now,
+                    endpoint)),
+                  self._transition(request_id, SUBMITTED, now), flush=True)
+
+    def record_status(self, request_id, status):
+        r"""Records submission status ('WAITING', 'READY' or 'UNKNOWN'). Only status changes are stored.
+
+        :param request_id: ID of requested submission
+        :param status: Submission status
+        """
+        now = time.time()
+        self._add(('UPDATE jobs SET status = ?, updated_at = ? WHERE request_id = ? AND status NOT IN (?, ?)',
+                   (status, now, request_id, status, FETCHED)),
+                  self._changed_transition(request_id, status, now))
+
+    def record_results(self, request_id, results_location=None):
+        r"""Records retrieval of results.
+
+        :param request_id: ID of requested submission
+        :param results_location: Path to results file. None if results were returned in memory.
+        """
+        now = time.time()
+        self._add(('UPDATE jobs SET status = ?, updated_at = ?, results_location = ? '
+                   'WHERE request_id = ? AND status != ?',
+                   (FETCHED, now, results_location, request_id, FETCHED)),
+                  self._changed_transition(request_id, FETCHED, now))
+
+    def flush(self):
+        r"""Writes all pending records in single transaction."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if pending:
+                with self._connection:
+                    for statement, args in pending:
+                        self._connection.execute(statement, args)
+
+    def get(self, request_id):
+        r"""Returns journal entry of the submission.
+
+        :param request_id: ID of requested submission
+        :return: JournalEntry or None
+        """
+        self.flush()
+        with self._lock:
+            row = self._connection.execute('SELECT {0} FROM jobs WHERE request_id = ?'.format(_COLUMNS),
+                                           (request_id,)).fetchone()
+        return self._entry(row) if row is not None else None
+
+    def transitions(self, request_id):
+        r"""Returns status transitions of the submission.
+
+        :param request_id: ID of requested submission
+        :return: List of (status, time) tuples
+        """
+        self.flush()
+        with self._lock:
+            return self._connection.execute('SELECT status, at FROM transitions WHERE request_id = ? ORDER BY rowid',
+                                            (request_id,)).fetchall()
+
+    def pending_jobs(self):
+        r"""Returns submissions which results were not retrieved yet and which status is not 'UNKNOWN'.
+
+        :return: List of JournalEntry ordered by submission time
+        """
+        self.flush()
+        with self._lock:
+            rows = self._connection.execute('SELECT {0} FROM jobs WHERE status NOT IN (?, ?) ORDER BY submitted_at'
+                                            .format(_COLUMNS), _TERMINAL_STATUSES).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def resume(self, client, *, format_type='HTML', results_file_path='{rid}.zip', scheduler=None):
+        r"""Resumes polling and retrieval of all pending submissions (e.g. ones left by crashed worker). Request IDs
+        are bound again to the endpoints which issued them, if the client has EndpointPool.
+
+        :param client: BlastClient used to check status and retrieve results
+        :param format_type: Report type. One of: ['HTML', 'Text', 'XML', 'XML2', 'JSON2', 'Tabular']. Default: 'HTML'.
+        :param results_file_path: Results file path for XML2 and JSON2 ('{rid}' is replaced with request ID).
+        :param scheduler: PollScheduler used to poll submissions. Default: new PollScheduler of the client
+        :return: Generator of (request_id, results) tuples in order of completion. Results are None for submissions
+                with 'UNKNOWN' status and the raised exception for submissions which status check or retrieval failed
+                (they stay pending).
+        """
+        own_scheduler = scheduler is None
+        scheduler = PollScheduler(client) if own_scheduler else scheduler
+        try:
+            now = time.time()
+            entries = self.pending_jobs()
+            for entry in entries:
+                bind_endpoint(client, entry)
+            futures = {scheduler.submit(entry.request_id, entry.remaining_time(now)): entry.request_id
+                       for entry in entries}
+            for future in concurrent.futures.as_completed(futures):
+                request_id = futures[future]
+                # Failed submission stays pending in the journal, the other ones are still resumed
+                try:
+                    status = future.result()
+                    self.record_status(request_id, status)
+                    if status != 'READY':
+                        yield request_id, None
+                        continue
+                    path = results_file_path.format(rid=request_id)
+                    results = client.get_results(request_id, format_type=format_type, results_file_path=path)
+                except Exception as e:
+                    yield request_id, e
+                    continue
+                self.record_results(request_id, path if results == path else None)
+                yield request_id, results
+        finally:
+            if own_scheduler:
+                scheduler.shutdown()
+
+    def _add(self, *statements, flush=False):
+        with self._lock:
+            self._pending.extend(statements)
+            flush = flush or len(self._pending) >= self.batch_size
+        if flush:
+            self.flush()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    @staticmethod
+    def _transition(request_id, status, at):
+        return 'INSERT INTO transitions (request_id, status, at) VALUES (?, ?, ?)', (request_id, status, at)
+
+    @staticmethod
+    def _changed_transition(request_id, status, at):
+        return ('INSERT INTO transitions (request_id, status, at) SELECT ?, ?, ? WHERE changes() > 0',
+                (request_id, status, at))
+
+    @staticmethod
+    def _entry(row):
+        request_id, hash_value, params, estimated_time, submitted_at, status, updated_at, results_location, \
+            endpoint = row
+        return JournalEntry(request_id, hash_value, json.loads(params), estimated_time, submitted_at, status,
+                            updated_at, results_location, endpoint)
+
+
+def bind_endpoint(client, entry):
+    r"""Binds request ID of the journal entry to the endpoint which issued it, unless it's bound already.
+
+    :param client: BlastClient
+    :param entry: JournalEntry
+    :return: Endpoint or None if the client has no EndpointPool or the endpoint isn't in the pool
+    """
+    pool = getattr(client, 'endpoints', None)
+    if pool is None or entry is None or entry.endpoint is None:
+        return None
+    endpoint = pool.endpoint_of(entry.request_id)
+    if endpoint is None:
+        endpoint = pool.find(entry.endpoint)
+        if endpoint is not None:
+            pool.bind(entry.request_id, endpoint)
+    return endpoint
@@ -0,0 +1,110 @@
+import collections
+import threading
+import time
+
+from BlastApi.Observer import BlastObserver
+from BlastApi.Observer.MetricsRegistry import COUNT_BUCKETS, SIZE_BUCKETS, MetricsRegistry
+
+_INITIAL_STATUS = 'SUBMITTED'
+_WAITING = 'WAITING'
+
+
+class MetricsObserver(BlastObserver):
+    def __init__(self, registry=None, *, max_request_ids=100000):
+        r"""Observer collecting client metrics in MetricsRegistry: request counts, latencies and sizes per operation,
+        retries, status transitions, polls and wall time of every search, and sizes of retrieved results per format.
+
+        Search is tracked from submission until status other than WAITING is checked. Time between submission and
+        READY status includes both queueing and running at NCBI, as the API doesn't tell them apart, and is compared
+        with estimated time (RTOE) of the submission.
+
+        :param registry: MetricsRegistry to register metrics in. Default: new registry
+        :param max_request_ids: Number of tracked searches, the oldest ones are forgotten first
+        """
+        self.registry = registry if registry is not None else MetricsRegistry()
+        self.max_request_ids = max_request_ids
+        self._searches = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+        metrics = self.registry
+        self.requests = metrics.counter('blast_requests_total', 'HTTP requests sent to BLAST API.',
+                                        ('operation', 'code'))
+        self.in_flight = metrics.gauge('blast_requests_in_flight', 'HTTP requests waiting for response.',
+                                       ('operation',))
+        self.request_duration = metrics.histogram('blast_request_duration_seconds',
+                                                  'Time until response headers were received.', ('operation',))
+        self.response_bytes = metrics.counter('blast_response_bytes_total', 'Bytes of response bodies of known size.',
+                                              ('operation',))
+        self.retries = metrics.counter('blast_retries_total', 'Retried, hedged and resumed requests.', ('operation',))
+        self.submissions = metrics.counter('blast_submissions_total', 'Submitted searches.')
+        self.status_checks = metrics.counter('blast_status_checks_total', 'Status checks by returned status.',
+                                             ('status',))
+        self.transitions = metrics.counter('blast_status_transitions_total', 'Status changes of searches.',
+                                           ('from', 'to'))
+        self.searches_in_progress = metrics.gauge('blast_searches_in_progress', 'Submitted searches not finished yet.')
+        self.polls = metrics.histogram('blast_polls_per_search', 'Status checks needed until search finished.',
+                                       buckets=COUNT_BUCKETS)
+        self.search_duration = metrics.histogram('blast_search_duration_seconds',
+                                                 'Time from submission until final status was checked.', ('status',))
+        self.estimated_duration = metrics.histogram('blast_search_estimated_seconds',
+                                                    'Estimated time (RTOE) returned with submission.')
+        self.results = metrics.counter('blast_results_total', 'Retrieved results.', ('format_type', 'source'))
+        self.results_bytes = metrics.histogram('blast_results_bytes', 'Size of retrieved results.', ('format_type',),
+                                               buckets=SIZE_BUCKETS)
+
+    def render(self):
+        r"""Renders metrics of the registry in Prometheus text exposition format.
+
+        :return: str
+        """
+        return self.registry.render()
+
+    def request_started(self, operation, params):
+        self.in_flight.inc(operation)
+
+    def request_finished(self, operation, params, *, elapsed, status_code=None, size=None, error=None):
+        self.in_flight.dec(operation)
+        self.requests.inc(operation, 'error' if error is not None else str(status_code or ''))
+        self.request_duration.observe(elapsed, operation)
+        if size is not None:
+            self.response_bytes.inc(operation, amount=size)
+
+    def submitted(self, request_id, estimated_time):
+        self.submissions.inc()
+        self.searches_in_progress.inc()
+        try:
+            self.estimated_duration.observe(float(estimated_time))
+        except (TypeError, ValueError):
+            pass
+        with self._lock:
+            # Search state: [status, submission time, number of status checks]
+            self._searches[request_id] = [_INITIAL_STATUS, time.monotonic(), 0]
+            self._searches.move_to_end(request_id)
+            while len(self._searches) > self.max_request_ids:
+                self._searches.popitem(last=False)
+                self.searches_in_progress.dec()
+
+    def status_checked(self, request_id, status):
+        self.status_checks.inc(status)
+        with self._lock:
+            search = self._searches.get(request_id)
+            if search is None:
+                return
+            previous = search[0]
+            search[0] = status
+            search[2] += 1
+            if status != _WAITING:
+                del self._searches[request_id]
+        if previous != status:
+            self.transitions.inc(previous, status)
+        if status != _WAITING:
+            self.searches_in_progress.dec()
+            self.polls.observe(search[2])
+            self.search_duration.observe(time.monotonic() - search[1], status)
+
+    def results_retrieved(self, request_id, format_type, size, *, cached=False):
+        self.results.inc(format_type, 'cache' if cached else 'api')
+        self.results_bytes.observe(size, format_type)
+
+    def retried(self, operation, params, *, attempt, error):
+        self.retries.inc(operation)
@@ -0,0 +1,201 @@
+import bisect
+import math
+import threading
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 ** 2, 10 * 1024 ** 2, 100 * 1024 ** 2, 1024 ** 3)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        r"""In-process registry of counters, gauges and histograms, rendered in Prometheus text exposition format
+        (e.g. served on /metrics endpoint of the application or written to node_exporter textfile directory).
+        """
+        self._metrics = dict()
+        self._lock = threading.Lock()
+
+    def counter(self, name, help, labels=()):
+        r"""Registers counter, value which only goes up.
+
+        :param name: Metric name, e.g. 'blast_requests_total'
+        :param help: Metric description
+        :param labels: Label names
+        :return: Counter
+        """
+        return self._register(Counter(name, help, labels, self._lock))
+
+    def gauge(self, name, help, labels=()):
+        r"""Registers gauge, value which goes up and down.
+
+        :param name: Metric name
+        :param help: Metric description
+        :param labels: Label names
+        :return: Gauge
+        """
+        return self._register(Gauge(name, help, labels, self._lock))
+
+    def histogram(self, name, help, labels=(), buckets=DURATION_BUCKETS):
+        r"""Registers histogram counting observed values in buckets.
+
+        :param name: Metric name, e.g. 'blast_request_duration_seconds'
+        :param help: Metric description
+        :param labels: Label names
+        :param buckets: Upper bounds of buckets, +Inf bucket is added
+        :return: Histogram
+        """
+        return self._register(Histogram(name, help, labels, self._lock, buckets))
+
+    def get(self, name):
+        r"""Returns registered metric.
+
+        :param name: Metric name
+        :return: Counter, Gauge, Histogram or None
+        """
+        return self._metrics.get(name)
+
+    def render(self):
+        r"""Renders all metrics in Prometheus text exposition format (version 0.0.4).
+
+        :return: str
+        """
+        with self._lock:
+            lines = []
+            for metric in self._metrics.values():
+                lines.append('# HELP {0} {1}'.format(metric.name, _escape_help(metric.help)))
+                lines.append('# TYPE {0} {1}'.format(metric.name, metric.type))
+                lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError("Metric '{0}' is already registered".format(metric.name))
+            self._metrics[metric.name] = metric
+        return metric
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, help, labels, lock):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = dict()
+        self._lock = lock
+
+    def value(self, *label_values):
+        r"""Returns current value for given label values.
+
+        :param label_values: Values of labels, in order of label names
+        :return: Value, 0 if nothing was recorded
+        """
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def samples(self):
+        return ['{0}{1} {2}'.format(self.name, self._label_string(label_values), _format_value(value))
+                for label_values, value in sorted(self._values.items())]
+
+    def _label_string(self, label_values, extra=None):
+        pairs = list(zip(self.labels, label_values))
+        if extra is not None:
+            pairs.append(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join('{0}="{1}"'.format(name, _escape_label(value)) for name, value in pairs) + '}'
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, *label_values, amount=1):
+        r"""Increments counter.
+
+        :param label_values: Values of labels, in order of label names
+        :param amount: Non-negative increment
+        """
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+
+class Gauge(_Metric):
+    type = 'gauge'
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) - amount
+
+    def set(self, value, *label_values):
+        r"""Sets gauge value.
+
+        :param value: New value
+        :param label_values: Values of labels, in order of label names
+        """
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name, help, labels, lock, buckets):
+        super().__init__(name, help, labels, lock)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *label_values):
+        r"""Records observed value.
+
+        :param value: Observed value, e.g. duration in seconds
+        :param label_values: Values of labels, in order of label names
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def value(self, *label_values):
+        r"""Returns number and sum of observed values for given label values.
+
+        :param label_values: Values of labels, in order of label names
+        :return: Tuple of count and sum
+        """
+        with self._lock:
+            state = self._values.get(label_values)
+            return (state[2], state[1]) if state is not None else (0, 0)
+
+    def samples(self):
+        samples = []
+        for label_values, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                samples.append('{0}_bucket{1} {2}'.format(
+                    self.name, self._label_string(label_values, ('le', _format_value(bound))), cumulative))
+            labels = self._label_string(label_values)
+            samples.append('{0}_sum{1} {2}'.format(self.name, labels, _format_value(total)))
+            samples.append('{0}_count{1} {2}'.format(self.name, labels, count))
+        return samples
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape_label(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _escape_help(text):
+    return text.replace('\\', r'\\').replace('\n', r'\n')
@@ -0,0 +1,40 @@
+SUBMIT = 'submit'
+STATUS = 'status'
+RESULTS = 'results'
+
+
+class BlastObserver:
+    r"""Receives events of BlastClient: every HTTP call, submissions, status checks, results retrievals and retries.
+    All methods do nothing, subclasses override the ones they need. Methods are called from threads sending the
+    requests, so they should be thread-safe and fast. Client without observer doesn't create any events.
+    """
+
+    def request_started(self, operation, params):
+        """ Called before request is sent. Operation is one of: SUBMIT, STATUS or RESULTS """
+
+    def request_finished(self, operation, params, *, elapsed, status_code=None, size=None, error=None):
+        """ Called when response headers are received (elapsed is in seconds) or request failed with error. Size is
+        number of bytes of response body, None if not known before the body is streamed """
+
+    def submitted(self, request_id, estimated_time):
+        """ Called when search was submitted and got request ID """
+
+    def status_checked(self, request_id, status):
+        """ Called after every status check with status returned by NCBI """
+
+    def results_retrieved(self, request_id, format_type, size, *, cached=False):
+        """ Called when results were retrieved (or taken from result cache). Size is number of bytes """
+
+    def retried(self, operation, params, *, attempt, error):
+        """ Called when request is retried: interrupted download resumed or restarted, failed connection or 429/5xx
+        response retried by SessionTransport (error is None for responses) or request hedged by HedgedTransport
+        (error is None). Attempt is number of the retry """
+
+
+def operation_of(params):
+    r"""Returns operation of request with given params: SUBMIT, STATUS or RESULTS."""
+    if params.get('CMD') == 'Put':
+        return SUBMIT
+    if params.get('FORMAT_OBJECT') == 'SearchInfo':
+        return STATUS
+    return RESULTS
@@ -0,0 +1,187 @@
+import json
+import xml.etree.ElementTree as ElementTree
+import zipfile
+
+from BlastApi.Parser import QUERY, HIT, HSP, convert_field, report_members
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+_QUERY_FIELDS = ('query_id', 'query_title', 'query_len')
+_HIT_DESCRIPTION_FIELDS = ('id', 'accession', 'title', 'taxid', 'sciname')
+_SCALAR_EVENTS = {'string', 'number', 'boolean', 'null'}
+
+
+class ArchiveParser:
+    def __init__(self, archive):
+        r"""Streaming parser of XML2 and JSON2 results archives retrieved by BlastClient.get_results(). Records are
+        yielded one at a time as (kind, record) tuples, where kind is one of BlastApi.Parser.QUERY, HIT or HSP, so
+        memory usage doesn't depend on report size. Hit records are followed by their HSP records and query records by
+        their hits.
+
+        XML2 members are parsed with ElementTree.iterparse. JSON2 members are parsed incrementally if ijson is
+        installed, otherwise every member (single query report) is loaded at once.
+
+        :param archive: Path to the archive or binary file-like object
+        """
+        self.archive = archive
+
+    def __iter__(self):
+        with zipfile.ZipFile(self.archive) as archive:
+            for name in report_members(archive.namelist()):
+                with archive.open(name) as member:
+                    yield from self.parse_member(name, member)
+
+    def members(self):
+        r"""Lists names of archive members holding reports, ordered by query number.
+
+        :return: List of member names
+        """
+        with zipfile.ZipFile(self.archive) as archive:
+            return report_members(archive.namelist())
+
+    def parse_member(self, name, member):
+        r"""Parses single archive member.
+
+        :param name: Member name. Member extension (.xml or .json) determines format.
+        :param member: Binary file-like object
+        :return: Generator of (kind, record) tuples
+        """
+        if name.lower().endswith('.json'):
+            if ijson is not None:
+                return self._parse_json_stream(member)
+            return self._parse_json(member)
+        return self._parse_xml(member)
+
+    def _parse_xml(self, member):
+        stack = []
+        emitted = set()
+        for event, element in ElementTree.iterparse(member, events=('start', 'end')):
+            tag = _local_name(element.tag)
+            if event == 'start':
+                parent = stack[-1] if stack else None
+                stack.append(element)
+                if tag == 'hits' and parent is not None and _local_name(parent.tag) == 'Search':
+                    emitted.add(parent)
+                    yield QUERY, _xml_query_record(parent)
+                elif tag == 'hsps' and parent is not None and _local_name(parent.tag) == 'Hit':
+                    emitted.add(parent)
+                    yield HIT, _xml_hit_record(stack, parent)
+                continue
+
+            stack.pop()
+            parent = stack[-1] if stack else None
+            if tag == 'Hsp':
+                yield HSP, _xml_hsp_record(stack, element)
+            elif tag == 'Hit':
+                if element not in emitted:
+                    yield HIT, _xml_hit_record(stack, element)
+                emitted.discard(element)
+            elif tag == 'Search':
+                if element not in emitted:
+                    yield QUERY, _xml_query_record(element)
+                emitted.discard(element)
+            else:
+                continue
+            element.clear()
+            if parent is not None:
+                parent.remove(element)
+
+    def _parse_json(self, member):
+        data = json.load(member)
+        outputs = data.get('BlastOutput2', [])
+        for output in outputs if isinstance(outputs, list) else [outputs]:
+            search = output.get('report', {}).get('results', {}).get('search')
+            if search is None:
+                continue
+            query = _json_query_record(search)
+            yield QUERY, query
+            for hit in search.get('hits', []):
+                yield from _json_hit_records(query['query_id'], hit)
+
+    def _parse_json_stream(self, member):
+        search_prefix = None
+        query = None
+        emitted = False
+        events = ijson.parse(member, use_float=True)
+        for prefix, event, value in events:
+            if prefix.endswith('report.results.search') and event == 'start_map':
+                search_prefix, query, emitted = prefix, dict(), False
+            elif search_prefix is None:
+                continue
+            elif event in _SCALAR_EVENTS and prefix.rpartition('.')[0] == search_prefix:
+                query[prefix.rpartition('.')[2]] = value
+            elif prefix == search_prefix + '.hits' and event == 'start_array':
+                query = _json_query_record(query)
+                emitted = True
+                yield QUERY, query
+            elif prefix == search_prefix + '.hits.item' and event == 'start_map':
+                yield from _json_hit_records(query['query_id'], _build_json_object(prefix, event, value, events))
+            elif prefix == search_prefix and event == 'end_map':
+                if not emitted:
+                    yield QUERY, _json_query_record(query)
+                search_prefix = None
+
+
+def _local_name(tag):
+    return tag.rpartition('}')[2]
+
+
+def _xml_fields(element):
+    return {_local_name(child.tag).replace('-', '_'): child.text for child in element if len(child) == 0}
+
+
+def _xml_query_record(search):
+    fields = _xml_fields(search)
+    return {field: convert_field(field, fields.get(field)) for field in _QUERY_FIELDS}
+
+
+def _xml_hit_record(stack, hit):
+    fields = _xml_fields(hit)
+    record = {'query_id': _xml_query_id(stack), 'num': convert_field('num', fields.get('num'))}
+    description = hit.find('./{*}description/{*}HitDescr')
+    description_fields = _xml_fields(description) if description is not None else dict()
+    for field in _HIT_DESCRIPTION_FIELDS:
+        record[field] = convert_field(field, description_fields.get(field))
+    record['len'] = convert_field('len', fields.get('len'))
+    return record
+
+
+def _xml_hsp_record(stack, hsp):
+    hit = next(element for element in reversed(stack) if _local_name(element.tag) == 'Hit')
+    record = {'query_id': _xml_query_id(stack), 'hit_num': convert_field('num', hit.findtext('./{*}num'))}
+    record.update((field, convert_field(field, value)) for field, value in _xml_fields(hsp).items())
+    return record
+
+
+def _xml_query_id(stack):
+    search = next(element for element in reversed(stack) if _local_name(element.tag) == 'Search')
+    return search.findtext('./{*}query-id')
+
+
+def _json_query_record(search):
+    return {field: convert_field(field, search.get(field)) for field in _QUERY_FIELDS}
+
+
+def _json_hit_records(query_id, hit):
+    descriptions = hit.get('description') or [dict()]
+    record = {'query_id': query_id, 'num': convert_field('num', hit.get('num'))}
+    for field in _HIT_DESCRIPTION_FIELDS:
+        record[field] = convert_field(field, descriptions[0].get(field))
+    record['len'] = convert_field('len', hit.get('len'))
+    yield HIT, record
+    for hsp in hit.get('hsps', []):
+        hsp_record = {'query_id': query_id, 'hit_num': record['num']}
+        hsp_record.update((field, convert_field(field, value)) for field, value in hsp.items())
+        yield HSP, hsp_record
+
+
+def _build_json_object(prefix, event, value, events):
+    builder = ijson.ObjectBuilder()
+    builder.event(event, value)
+    for current_prefix, event, value in events:
+        builder.event(event, value)
+        if current_prefix == prefix and event == 'end_map':
+            return builder.value
@@ -0,0 +1,128 @@
+import collections
+import concurrent.futures
+import io
+import os
+import zipfile
+
+from BlastApi.Parser import report_members
+from BlastApi.Parser.ArchiveParser import ArchiveParser
+
+# Archive opened by worker process: ((path, mtime, size), ZipFile)
+_worker_archive = [None, None]
+
+
+class ParallelArchiveParser:
+    def __init__(self, archive, *, max_workers=None, ordered=True, chunk_size=16, executor=None):
+        r"""Parser of XML2 and JSON2 results archives fanning archive members (one per query) out to worker
+        processes, so multi-query reports are parsed on all cores. Yields the same (kind, record) tuples as
+        BlastApi.Parser.ArchiveParser, records of every member stay together.
+
+        Archives given as path are opened by workers themselves, members of file-like archives (e.g.
+        BlastApi.ResultBuffer.ResultBuffer) are read by the calling process and sent to workers. Only a few chunks
+        per worker are parsed ahead of the consumer. Archives with a single member, or all archives if there is only one
+        worker, are streamed in the calling process as by ArchiveParser.
+
+        :param archive: Path to the archive, binary file-like object or bytes
+        :param max_workers: Number of worker processes. Default: number of CPUs
+        :param ordered: If True, records are yielded in query order, otherwise members are yielded as soon as parsed
+        :param chunk_size: Number of members parsed by single task
+        :param executor: concurrent.futures.ProcessPoolExecutor to use instead of creating one per iteration. It's
+                not shut down by the parser.
+        """
+        if chunk_size <= 0:
+            raise ValueError("Invalid 'chunk_size' parameter")
+        self.archive = io.BytesIO(archive) if isinstance(archive, (bytes, bytearray, memoryview)) else archive
+        self.max_workers = max_workers
+        self.ordered = ordered
+        self.chunk_size = chunk_size
+        self.executor = executor
+
+    def __iter__(self):
+        path = os.fspath(self.archive) if isinstance(self.archive, (str, os.PathLike)) else None
+        with zipfile.ZipFile(self.archive) as archive:
+            names = report_members(archive.namelist())
+            chunks = [names[start:start + self.chunk_size] for start in range(0, len(names), self.chunk_size)]
+            workers = self._workers(len(chunks))
+            if len(names) <= 1 or self.executor is None and workers <= 1:
+                # Members are streamed as by ArchiveParser, never read nor parsed at once
+                parser = ArchiveParser(None)
+                for name in names:
+                    with archive.open(name) as member:
+                        yield from parser.parse_member(name, member)
+                return
+
+            if path is not None:
+                key = _archive_key(os.path.abspath(path))
+                tasks = ((_parse_members, key, chunk, None) for chunk in chunks)
+            else:
+                tasks = ((_parse_members, None, chunk, [archive.read(name) for name in chunk]) for chunk in chunks)
+            if self.executor is not None:
+                yield from self._run(self.executor, tasks, workers)
+                return
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                yield from self._run(executor, tasks, workers)
+
+    def members(self):
+        r"""Lists names of archive members holding reports, ordered by query number.
+
+        :return: List of member names
+        """
+        return ArchiveParser(self.archive).members()
+
+    def _workers(self, chunk_count):
+        return min(self.max_workers or os.cpu_count() or 1, chunk_count)
+
+    def _run(self, executor, tasks, workers):
+        # Bounded window of submitted tasks keeps memory independent of the number of members
+        window = 2 * workers
+        pending = collections.deque()
+        tasks = iter(tasks)
+        try:
+            for task in tasks:
+                pending.append(executor.submit(*task))
+                if len(pending) < window:
+                    continue
+                if self.ordered:
+                    yield from pending.popleft().result()
+                else:
+                    yield from self._completed(pending)
+            while pending:
+                if self.ordered:
+                    yield from pending.popleft().result()
+                else:
+                    yield from self._completed(pending)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _completed(pending):
+        done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+        future = next(future for future in pending if future in done)
+        pending.remove(future)
+        return future.result()
+
+
+def _archive_key(path):
+    status = os.stat(path)
+    return path, status.st_mtime_ns, status.st_size
+
+
+def _parse_members(key, names, contents):
+    parser = ArchiveParser(None)
+    if contents is None:
+        contents = [_open_worker_archive(key).read(name) for name in names]
+    records = []
+    for name, content in zip(names, contents):
+        records.extend(parser.parse_member(name, io.BytesIO(content)))
+    return records
+
+
+def _open_worker_archive(key):
+    # Worker keeps the last archive open for the next chunks, reopening it if the file was replaced
+    if _worker_archive[0] != key:
+        if _worker_archive[1] is not None:
+            _worker_archive[1].close()
+        _worker_archive[1] = zipfile.ZipFile(key[0])
+        _worker_archive[0] = key
+    return _worker_archive[1]
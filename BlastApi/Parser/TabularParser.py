@@ -0,0 +1,142 @@
+import re
+
+import numpy
+
+# Tabular field description: (column name, dtype). Fields missing here are kept as strings.
+_FIELDS = {
+    'query id': ('query_id', None),
+    'query gi': ('query_gi', None),
+    'query acc.': ('query_acc', None),
+    'query acc.ver': ('query_acc_ver', None),
+    'query length': ('query_length', numpy.int64),
+    'subject id': ('subject_id', None),
+    'subject ids': ('subject_ids', None),
+    'subject gi': ('subject_gi', None),
+    'subject gis': ('subject_gis', None),
+    'subject acc.': ('subject_acc', None),
+    'subject acc.ver': ('subject_acc_ver', None),
+    'subject length': ('subject_length', numpy.int64),
+    'subject tax ids': ('subject_tax_ids', None),
+    'subject sci names': ('subject_sci_names', None),
+    'subject title': ('subject_title', None),
+    '% identity': ('identity', numpy.float64),
+    '% positives': ('positives_percent', numpy.float64),
+    '% query coverage per subject': ('query_coverage', numpy.float64),
+    'alignment length': ('alignment_length', numpy.int64),
+    'mismatches': ('mismatches', numpy.int64),
+    'gap opens': ('gap_opens', numpy.int64),
+    'gaps': ('gaps', numpy.int64),
+    'identical': ('identical', numpy.int64),
+    'positives': ('positives', numpy.int64),
+    'q. start': ('query_start', numpy.int64),
+    'q. end': ('query_end', numpy.int64),
+    's. start': ('subject_start', numpy.int64),
+    's. end': ('subject_end', numpy.int64),
+    'query frame': ('query_frame', numpy.int64),
+    'sbjct frame': ('subject_frame', numpy.int64),
+    'evalue': ('evalue', numpy.float64),
+    'bit score': ('bit_score', numpy.float64),
+    'score': ('score', numpy.int64),
+}
+DEFAULT_FIELDS = ('query acc.ver', 'subject acc.ver', '% identity', 'alignment length', 'mismatches', 'gap opens',
+                  'q. start', 'q. end', 's. start', 's. end', 'evalue', 'bit score')
+
+_HEADER_PATTERN = re.compile(r'^#\s*([^:]+):\s*(.*)$')
+_HITS_FOUND_PATTERN = re.compile(r'^#\s*(\d+) hits found')
+_TAG_PATTERN = re.compile(r'^\s*</?\w+[^>]*>\s*$')
+_NAME_PATTERN = re.compile(r'\W+')
+
+
+class TabularReport:
+    __slots__ = ('fields', 'headers', 'hits')
+
+    def __init__(self, fields, headers, hits):
+        r"""Parsed Tabular report.
+
+        :param fields: Names of report fields (as in '# Fields:' header)
+        :param headers: List of comment headers of every query, as dicts (e.g. {'Query': ..., 'Database': ...,
+                'Fields': ..., 'hits found': 5})
+        :param hits: numpy structured array with one row for each HSP
+        """
+        self.fields = fields
+        self.headers = headers
+        self.hits = hits
+
+    def __len__(self):
+        return len(self.hits)
+
+    def columns(self):
+        r"""Returns report as column arrays.
+
+        :return: Dict of column name: numpy array (views of structured array)
+        """
+        return {name: self.hits[name] for name in self.hits.dtype.names}
+
+
+def parse_tabular(report):
+    r"""Parses Tabular report retrieved by BlastClient.get_results(format_type='Tabular') into numpy structured array.
+    Numeric fields (identity, coordinates, evalue, bit score etc.) become typed columns, so reports can be filtered and
+    sorted without Python loops, e.g. `hits[hits['evalue'] < 1e-10]`.
+
+    :param report: Tabular report as str or bytes
+    :return: TabularReport
+    """
+    if isinstance(report, (bytes, bytearray, memoryview)):
+        report = bytes(report).decode('utf-8')
+
+    headers = []
+    fields = None
+    rows = []
+    for line in report.splitlines():
+        if not line.strip() or _TAG_PATTERN.match(line):
+            continue
+        if line.startswith('#'):
+            fields = _parse_header(line, headers, fields)
+        else:
+            rows.append(line)
+
+    fields = fields or DEFAULT_FIELDS
+    return TabularReport(fields, headers, _to_array(rows, fields))
+
+
+def _parse_header(line, headers, fields):
+    hits_found = _HITS_FOUND_PATTERN.match(line)
+    if hits_found:
+        _current_header(headers, 'hits found')['hits found'] = int(hits_found.group(1))
+        return fields
+
+    header = _HEADER_PATTERN.match(line)
+    if header is None:
+        _current_header(headers, 'Program')['Program'] = line.lstrip('#').strip()
+        return fields
+
+    key, value = header.group(1).strip(), header.group(2).strip()
+    _current_header(headers, key)[key] = value
+    if key == 'Fields':
+        current_fields = tuple(field.strip() for field in value.split(','))
+        if fields is not None and fields != current_fields:
+            raise ValueError('Tabular report contains queries with different fields')
+        return current_fields
+    return fields
+
+
+def _current_header(headers, key):
+    if not headers or key in headers[-1]:
+        headers.append(dict())
+    return headers[-1]
+
+
+def _to_array(rows, fields):
+    columns = [_FIELDS.get(field, (_NAME_PATTERN.sub('_', field).strip('_').lower(), None)) for field in fields]
+    cells = [row.split('\t') for row in rows]
+    for number, row in enumerate(cells):
+        if len(row) != len(fields):
+            raise ValueError('Invalid number of fields in Tabular report row {0}'.format(number + 1))
+
+    # Every column is converted on its own, so string columns are sized to their own longest value
+    values = [numpy.array(column, dtype=dtype if dtype is not None else str)
+              for column, (_, dtype) in zip(zip(*cells) if cells else [()] * len(fields), columns)]
+    hits = numpy.empty(len(rows), dtype=[(name, value.dtype) for (name, _), value in zip(columns, values)])
+    for (name, _), value in zip(columns, values):
+        hits[name] = value
+    return hits
@@ -0,0 +1,81 @@
+import io
+import xml.etree.ElementTree as ElementTree
+
+from BlastApi.Parser import QUERY, HIT, HSP, convert_field
+
+_QUERY_FIELDS = {'Iteration_query-ID': 'query_id', 'Iteration_query-def': 'query_title',
+                 'Iteration_query-len': 'query_len'}
+_HIT_FIELDS = {'Hit_num': 'num', 'Hit_id': 'id', 'Hit_accession': 'accession', 'Hit_def': 'title', 'Hit_len': 'len'}
+
+
+class XmlParser:
+    def __init__(self, source):
+        r"""Streaming parser of XML results (FORMAT_TYPE=XML) retrieved by BlastClient.get_results(). Yields the same
+        (kind, record) tuples as BlastApi.Parser.ArchiveParser.ArchiveParser.
+
+        :param source: XML report as str or bytes, path to file or binary file-like object
+        """
+        self.source = source
+
+    def __iter__(self):
+        source = self.source
+        if isinstance(source, str) and source.lstrip().startswith('<'):
+            source = io.BytesIO(source.encode('utf-8'))
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+
+        stack = []
+        emitted = set()
+        for event, element in ElementTree.iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                parent = stack[-1] if stack else None
+                stack.append(element)
+                if element.tag == 'Iteration_hits':
+                    emitted.add(parent)
+                    yield QUERY, _query_record(parent)
+                elif element.tag == 'Hit_hsps':
+                    emitted.add(parent)
+                    yield HIT, _hit_record(stack, parent)
+                continue
+
+            stack.pop()
+            parent = stack[-1] if stack else None
+            if element.tag == 'Hsp':
+                yield HSP, _hsp_record(stack, element)
+            elif element.tag == 'Hit':
+                if element not in emitted:
+                    yield HIT, _hit_record(stack, element)
+                emitted.discard(element)
+            elif element.tag == 'Iteration':
+                if element not in emitted:
+                    yield QUERY, _query_record(element)
+                emitted.discard(element)
+            else:
+                continue
+            element.clear()
+            if parent is not None:
+                parent.remove(element)
+
+
+def _query_record(iteration):
+    return {field: convert_field(field, iteration.findtext(tag)) for tag, field in _QUERY_FIELDS.items()}
+
+
+def _hit_record(stack, hit):
+    record = {'query_id': _query_id(stack)}
+    record.update((field, convert_field(field, hit.findtext(tag))) for tag, field in _HIT_FIELDS.items())
+    return record
+
+
+def _hsp_record(stack, hsp):
+    hit = next(element for element in reversed(stack) if element.tag == 'Hit')
+    record = {'query_id': _query_id(stack), 'hit_num': convert_field('num', hit.findtext('Hit_num'))}
+    for child in hsp:
+        field = child.tag[len('Hsp_'):].replace('-', '_')
+        record[field] = convert_field(field, child.text)
+    return record
+
+
+def _query_id(stack):
+    iteration = next(element for element in reversed(stack) if element.tag == 'Iteration')
+    return iteration.findtext('Iteration_query-ID')
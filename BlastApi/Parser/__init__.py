@@ -0,0 +1,39 @@
+import re
+
+QUERY = 'query'
+HIT = 'hit'
+HSP = 'hsp'
+
+_MEMBER_NUMBER_PATTERN = re.compile(r'_(\d+)\.\w+$')
+_INT_FIELDS = {'query_len', 'num', 'len', 'taxid', 'score', 'identity', 'positive', 'gaps', 'query_from', 'query_to',
+               'hit_from', 'hit_to', 'query_frame', 'hit_frame', 'align_len'}
+_FLOAT_FIELDS = {'bit_score', 'evalue'}
+
+
+def report_members(names):
+    r"""Orders members of XML2/JSON2 archive by query number and skips master file referencing them.
+
+    :param names: Names of archive members
+    :return: List of names of members holding reports
+    """
+    numbered = [(int(match.group(1)), name) for name, match in
+                ((name, _MEMBER_NUMBER_PATTERN.search(name)) for name in names) if match]
+    if not numbered:
+        return list(names)
+    return [name for _, name in sorted(numbered)]
+
+
+def convert_field(name, value):
+    r"""Converts value of report field to int or float if field is numeric.
+
+    :param name: Field name (snake_case)
+    :param value: Field value
+    :return: Converted value
+    """
+    if value is None:
+        return None
+    if name in _INT_FIELDS:
+        return int(value)
+    if name in _FLOAT_FIELDS:
+        return float(value)
+    return value
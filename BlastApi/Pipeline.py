@@ -0,0 +1,339 @@
+import queue
+import threading
+
+from BlastApi.BatchSearch import as_query, to_fasta
+from BlastApi.BlastReport import BlastReport
+from BlastApi.PollScheduler import PollScheduler
+
+_STOP = object()
+_WAIT = 0.1
+_PARSED_FORMAT_TYPES = {'XML', 'XML2', 'JSON2', 'Tabular'}
+
+
+class PipelineItem:
+    __slots__ = ('query_id', 'query', 'request_id', 'estimated_time', 'status', 'results', 'report', 'error',
+                 '_in_flight', '_buffered')
+
+    def __init__(self, query_id, query):
+        r"""Single query passing through the Pipeline.
+
+        :param query_id: Query ID
+        :param query: Query sequence
+        """
+        self.query_id = query_id
+        self.query = query
+        self.request_id = None
+        self.estimated_time = None
+        self.status = None
+        self.results = None
+        self.report = None
+        self.error = None
+        self._in_flight = False
+        self._buffered = 0
+
+    def __repr__(self):
+        return 'PipelineItem(query_id={0}, request_id={1}, status={2}, error={3!r})'.format(
+            self.query_id, self.request_id, self.status, self.error)
+
+
+class Pipeline:
+    def __init__(self, client, database, program, *, format_type='XML2', max_in_flight=100,
+                 max_buffered_bytes=64 * 1024 * 1024, queue_size=100, submit_workers=1, poll_workers=4,
+                 fetch_workers=4, parse_workers=2, sink_workers=1, parse=None, sink=None, scheduler=None,
+                 **search_params):
+        r"""Streams queries through submit, poll, fetch, parse and sink stages. Every stage has its own workers and
+        stages are connected by bounded queues, so a slow stage blocks the ones before it instead of letting memory
+        grow: at most max_in_flight request IDs are submitted and not fetched yet and fetching stops while
+        max_buffered_bytes of fetched results wait in memory for parsing (so the limit is exceeded by at most one
+        result per fetch worker).
+
+        Results are fetched into BlastApi.ResultBuffer.ResultBuffer, so results larger than spool_size of the
+        client's download manager are kept in temporary files and don't count to max_buffered_bytes.
+
+        :param client: BlastClient used to submit searches and retrieve results
+        :param database: Name of existing database or one uploaded to blastdb_custom
+        :param program: BLAST Program
+        :param format_type: Report type. One of: ['HTML', 'Text', 'XML', 'XML2', 'JSON2', 'Tabular']. Default: 'XML2'.
+        :param max_in_flight: Maximal number of submitted request IDs without fetched results
+        :param max_buffered_bytes: Maximal number of bytes of fetched results waiting in memory for parsing
+        :param queue_size: Capacity of queues between stages
+        :param submit_workers: Number of threads submitting searches
+        :param poll_workers: Number of threads checking status (of created PollScheduler)
+        :param fetch_workers: Number of threads retrieving results
+        :param parse_workers: Number of threads parsing results
+        :param sink_workers: Number of threads running sink
+        :param parse: Function taking ResultBuffer and returning parsed report. Default: BlastReport for XML, XML2,
+                JSON2 and Tabular, decoded text for HTML and Text
+        :param sink: Function called with every finished PipelineItem (e.g. storing the report), also with the
+                failed ones. Default: none.
+        :param scheduler: BlastApi.PollScheduler.PollScheduler used to check status. Default: PollScheduler created for
+                every run with poll_workers threads.
+        :param search_params: Additional parameters of BlastClient.search()
+        """
+        if max_in_flight <= 0 or max_buffered_bytes <= 0 or queue_size <= 0:
+            raise ValueError("Invalid 'max_in_flight', 'max_buffered_bytes' or 'queue_size' parameter")
+        self.client = client
+        self.database = database
+        self.program = program
+        self.format_type = format_type
+        self.max_in_flight = max_in_flight
+        self.max_buffered_bytes = max_buffered_bytes
+        self.queue_size = queue_size
+        self.submit_workers = submit_workers
+        self.poll_workers = poll_workers
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers
+        self.sink_workers = sink_workers
+        self.parse = parse if parse is not None else self._read_report
+        self.sink = sink
+        self.scheduler = scheduler
+        self.search_params = search_params
+        self.peak_in_flight = 0
+        self.peak_buffered_bytes = 0
+
+    def run(self, queries):
+        r"""Runs queries through the pipeline.
+
+        :param queries: Iterable of (query_id, sequence) tuples, BlastApi.FastaReader.FastaRecord objects or sequences
+                (IDs are generated then). Consumed lazily, as the submit stage has capacity.
+        :return: PipelineRun, iterator of PipelineItem in order of completion. Items with error set failed in one of
+                the stages. Iterator is bounded by queue_size too. Stages start right away, not when the iterator is
+                iterated first, closing it (or leaving its with block) stops the pipeline.
+        """
+        return PipelineRun(_Run(self, queries))
+
+    def _read_report(self, results):
+        if self.format_type not in _PARSED_FORMAT_TYPES:
+            return results.text()
+        if self.format_type == 'Tabular':
+            return BlastReport.read(results.getvalue(), self.format_type)
+        return BlastReport.read(results, self.format_type)
+
+
+class PipelineRun:
+    def __init__(self, run):
+        r"""Iterator of PipelineItems of single run of the Pipeline, stopping its stages when closed."""
+        self._run = run
+        self._items = self._results(run)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._items)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        r"""Stops the pipeline: stages stop taking new items and their threads are joined."""
+        self._items.close()
+        # Generator which was never iterated doesn't run its finally clause
+        self._run.stop()
+
+    @staticmethod
+    def _results(run):
+        try:
+            while True:
+                item = run.get()
+                if item is _STOP:
+                    break
+                yield item
+        finally:
+            run.stop()
+        if run.error is not None:
+            raise run.error
+
+
+class _Run:
+    def __init__(self, pipeline, queries):
+        r"""Single run of the pipeline: queues, worker threads and limits."""
+        self.pipeline = pipeline
+        self.error = None
+        self._stopped = threading.Event()
+        self._in_flight = threading.Semaphore(pipeline.max_in_flight)
+        self._condition = threading.Condition()
+        self._in_flight_count = 0
+        self._buffered = 0
+        self._fetching = 0
+        pipeline.peak_in_flight = pipeline.peak_buffered_bytes = 0
+        self._own_scheduler = pipeline.scheduler is None
+        self._scheduler = pipeline.scheduler if pipeline.scheduler is not None else PollScheduler(
+            pipeline.client, max_workers=pipeline.poll_workers)
+
+        submit_queue, fetch_queue, parse_queue, sink_queue, self._output = (queue.Queue(pipeline.queue_size)
+                                                                            for _ in range(5))
+        self._threads = [threading.Thread(target=self._feed, args=(queries, submit_queue), name='Pipeline-feed',
+                                          daemon=True)]
+        self._stage('submit', self._submit, None, pipeline.submit_workers, submit_queue, _PollStage(self, fetch_queue))
+        self._stage('fetch', self._fetch, self._fetched, pipeline.fetch_workers, fetch_queue, parse_queue)
+        self._stage('parse', self._parse, self._parsed, pipeline.parse_workers, parse_queue, sink_queue)
+        self._stage('sink', pipeline.sink, None, pipeline.sink_workers, sink_queue, self._output)
+        for thread in self._threads:
+            thread.start()
+
+    def get(self):
+        while True:
+            try:
+                return self._output.get(timeout=_WAIT)
+            except queue.Empty:
+                if self._stopped.is_set():
+                    return _STOP
+
+    def stop(self):
+        self._stopped.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._own_scheduler:
+            self._scheduler.shutdown(wait=False)
+        for thread in self._threads:
+            thread.join()
+
+    def put(self, output, item):
+        r"""Puts item to bounded queue, blocking while it's full. Returns False if the run was stopped."""
+        while not self._stopped.is_set():
+            try:
+                output.put(item, timeout=_WAIT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _stage(self, name, function, finish, workers, input, output):
+        workers = max(workers, 1)
+        remaining = [workers]
+        lock = threading.Lock()
+
+        def work():
+            while not self._stopped.is_set():
+                try:
+                    item = input.get(timeout=_WAIT)
+                except queue.Empty:
+                    continue
+                if item is _STOP:
+                    with lock:
+                        remaining[0] -= 1
+                        last = remaining[0] == 0
+                    # Remaining workers of the stage stop too, the last one passes end of stream further
+                    self.put(output if last else input, _STOP)
+                    return
+                try:
+                    if item.error is None and function is not None:
+                        function(item)
+                except Exception as e:
+                    item.error = e
+                finally:
+                    if finish is not None:
+                        finish(item)
+                if not self.put(output, item):
+                    return
+
+        self._threads.extend(threading.Thread(target=work, name='Pipeline-{0}-{1}'.format(name, number), daemon=True)
+                             for number in range(workers))
+
+    def _feed(self, queries, output):
+        try:
+            for number, query in enumerate(queries, 1):
+                query_id, sequence = as_query(query, number)
+                if not self.put(output, PipelineItem(query_id, sequence)):
+                    return
+        except Exception as e:
+            self.error = e
+        self.put(output, _STOP)
+
+    def _submit(self, item):
+        while not self._in_flight.acquire(timeout=_WAIT):
+            if self._stopped.is_set():
+                raise RuntimeError('Pipeline stopped')
+        item._in_flight = True
+        with self._condition:
+            self._in_flight_count += 1
+            self.pipeline.peak_in_flight = max(self.pipeline.peak_in_flight, self._in_flight_count)
+        pipeline = self.pipeline
+        item.request_id, item.estimated_time = pipeline.client.search(
+            to_fasta([(item.query_id, item.query)]), pipeline.database, pipeline.program, **pipeline.search_params)
+
+    def _fetch(self, item):
+        if item.status != 'READY':
+            raise ValueError("NCBI returned '{0}' submition state".format(item.status))
+        with self._condition:
+            # Fetches in progress count as one byte each. Single result is always let through, so results larger
+            # than the limit don't stall the pipeline.
+            while 0 < self._buffered + self._fetching >= self.pipeline.max_buffered_bytes and \
+                    not self._stopped.is_set():
+                self._condition.wait()
+            self._fetching += 1
+        try:
+            item.results = self.pipeline.client.get_results(item.request_id, format_type=self.pipeline.format_type,
+                                                            as_buffer=True)
+            item._buffered = len(item.results) if item.results.in_memory else 0
+        finally:
+            with self._condition:
+                self._fetching -= 1
+                self._buffered += item._buffered
+                self.pipeline.peak_buffered_bytes = max(self.pipeline.peak_buffered_bytes, self._buffered)
+                self._condition.notify_all()
+
+    def _fetched(self, item):
+        if item._in_flight:
+            item._in_flight = False
+            with self._condition:
+                self._in_flight_count -= 1
+            self._in_flight.release()
+
+    def _parse(self, item):
+        item.report = self.pipeline.parse(item.results)
+
+    def _parsed(self, item):
+        if item.results is not None:
+            item.results.close()
+            item.results = None
+        if item._buffered:
+            with self._condition:
+                self._buffered -= item._buffered
+                self._condition.notify_all()
+            item._buffered = 0
+
+
+class _PollStage:
+    def __init__(self, run, output):
+        r"""Passes submitted items to PollScheduler and finished ones to output. Scheduler keeps at most max_in_flight
+        request IDs, as the submit stage doesn't submit more.
+        """
+        self.run = run
+        self.output = output
+        self._pending = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def put(self, item, timeout=None):
+        if item is _STOP:
+            with self._lock:
+                self._closed = True
+                finished = self._pending == 0
+            if finished:
+                self.run.put(self.output, _STOP)
+            return
+        if item.error is not None:
+            self.run.put(self.output, item)
+            return
+        with self._lock:
+            self._pending += 1
+        future = self.run._scheduler.submit(item.request_id, item.estimated_time)
+        future.add_done_callback(lambda future: self._polled(item, future))
+
+    def _polled(self, item, future):
+        try:
+            item.status = future.result()
+        except Exception as e:
+            item.error = e
+        # Blocks the poll worker while fetch queue is full
+        self.run.put(self.output, item)
+        with self._lock:
+            self._pending -= 1
+            finished = self._closed and self._pending == 0
+        if finished:
+            self.run.put(self.output, _STOP)
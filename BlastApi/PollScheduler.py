@@ -0,0 +1,180 @@
+import concurrent.futures
+import heapq
+import itertools
+import threading
+import time
+
+_TERMINAL_STATUSES = {'READY', 'UNKNOWN'}
+
+
+class _PollJob:
+    __slots__ = ('request_id', 'interval', 'future', 'callback', 'polls', 'errors')
+
+    def __init__(self, request_id, interval, future, callback):
+        self.request_id = request_id
+        self.interval = interval
+        self.future = future
+        self.callback = callback
+        self.polls = 0
+        self.errors = 0
+
+
+class PollScheduler:
+    def __init__(self, client, *, min_interval=2, max_interval=60, backoff=1.5, max_polls_per_second=None,
+                 max_workers=4, max_errors=3):
+        r"""Polls submission status of many searches from a single scheduler thread.
+
+        Jobs are kept in a priority queue ordered by time of the next status check. First check of every job is done
+        after its estimated time (RTOE), later ones every `interval` seconds, where interval starts from RTOE and is
+        multiplied by `backoff` after each 'WAITING' status. Failed status check (e.g. timeout or connection error) is
+        retried after min_interval multiplied by `backoff` for every consecutive failure, the job fails after
+        `max_errors` consecutive failures.
+
+        :param client: BlastClient used to check submission status.
+        :param min_interval: Minimal number of seconds between two status checks of the same submission.
+        :param max_interval: Maximal number of seconds between two status checks of the same submission.
+        :param backoff: Multiplier applied to interval after each 'WAITING' status. Number not lower than 1.
+        :param max_polls_per_second: Global limit of status checks per second. Default: no limit.
+        :param max_workers: Number of threads checking submission status concurrently.
+        :param max_errors: Number of consecutive failed status checks after which future of the job is resolved with
+                the error.
+        """
+        if backoff < 1:
+            raise ValueError("Invalid 'backoff' parameter")
+        if max_errors < 1:
+            raise ValueError("Invalid 'max_errors' parameter")
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_polls_per_second = max_polls_per_second
+        self.max_errors = max_errors
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._next_poll_time = 0
+        self._shutdown = False
+        self._thread = threading.Thread(target=self._run, name='PollScheduler', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    def __len__(self):
+        with self._condition:
+            return len(self._queue)
+
+    def submit(self, request_id, estimated_time=0, callback=None):
+        r"""Schedules status polling of the submission.
+
+        :param request_id: ID of requested submission
+        :param estimated_time: Estimated time in seconds until the search is completed
+        :param callback: Callable invoked with (request_id, status) once submission is 'READY' or 'UNKNOWN'
+        :return: concurrent.futures.Future resolved with final status ('READY' or 'UNKNOWN') or with error of the last
+                status check after max_errors consecutive failures
+        """
+        future = concurrent.futures.Future()
+        estimated_time = int(estimated_time or 0)
+        interval = min(max(estimated_time, self.min_interval), self.max_interval)
+        job = _PollJob(request_id, interval, future, callback)
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError('Cannot submit to PollScheduler after shutdown')
+            self._push(time.monotonic() + estimated_time, job)
+        return future
+
+    def shutdown(self, wait=True):
+        r"""Stops polling. Futures of unfinished jobs are cancelled.
+
+        :param wait: If True waits for status checks in progress
+        """
+        with self._condition:
+            self._shutdown = True
+            jobs = [job for _, _, job in self._queue]
+            self._queue = []
+            self._condition.notify_all()
+        for job in jobs:
+            job.future.cancel()
+        self._thread.join()
+        self.executor.shutdown(wait=wait)
+
+    def _push(self, due, job):
+        heapq.heappush(self._queue, (due, next(self._sequence), job))
+        self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                job = self._next_due_job()
+                if job is None:
+                    return
+            self.executor.submit(self._poll, job)
+
+    def _next_due_job(self):
+        while not self._shutdown:
+            if not self._queue:
+                self._condition.wait()
+                continue
+            now = time.monotonic()
+            due = max(self._queue[0][0], self._next_poll_time)
+            if due > now:
+                self._condition.wait(due - now)
+                continue
+            _, _, job = heapq.heappop(self._queue)
+            if self.max_polls_per_second:
+                self._next_poll_time = now + 1 / self.max_polls_per_second
+            return job
+        return None
+
+    def _poll(self, job):
+        if job.future.cancelled():
+            return
+        try:
+            status = self.client.check_submission_status(job.request_id)
+        except Exception as e:
+            job.errors += 1
+            # Transient errors (timeouts, dropped connections) are retried with backoff
+            if job.errors >= self.max_errors:
+                _resolve(job.future, error=e)
+            else:
+                self._reschedule(job, min(self.min_interval * self.backoff ** job.errors, self.max_interval))
+            return
+        job.polls += 1
+        job.errors = 0
+
+        if status not in _TERMINAL_STATUSES:
+            self._reschedule(job, job.interval, backoff=True)
+            return
+
+        # Future is resolved even if callback fails, its error is set to the future then
+        if job.callback is not None:
+            try:
+                job.callback(job.request_id, status)
+            except Exception as e:
+                _resolve(job.future, error=e)
+                return
+        _resolve(job.future, result=status)
+
+    def _reschedule(self, job, delay, *, backoff=False):
+        with self._condition:
+            if not self._shutdown:
+                self._push(time.monotonic() + delay, job)
+                if backoff:
+                    job.interval = min(max(job.interval * self.backoff, self.min_interval), self.max_interval)
+                return
+        job.future.cancel()
+
+
+def _resolve(future, *, result=None, error=None):
+    # Future may have been cancelled by shutdown() in the meantime
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except concurrent.futures.InvalidStateError:
+        pass
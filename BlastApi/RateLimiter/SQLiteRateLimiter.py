@@ -0,0 +1,58 @@
+import sqlite3
+import threading
+import time
+
+from BlastApi.RateLimiter import RateLimiter
+
+_PRUNE_EVERY = 256
+
+
+class SQLiteRateLimiter(RateLimiter):
+    def __init__(self, database_path, quotas=None, *, timeout=30):
+        r"""Token bucket rate limiter stored in SQLite database, shared by all processes on a host using the same
+        database file.
+
+        :param database_path: Path to SQLite database file
+        :param quotas: Dict of bucket name: (tokens per second, capacity). Default: BlastApi.RateLimiter.NCBI_QUOTAS
+        :param timeout: Number of seconds to wait for database lock held by other process
+        """
+        super().__init__(quotas)
+        self.database_path = database_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._reservations = 0
+        with self._connection() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS buckets '
+                               '(name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+
+    def _reserve(self, bucket, rate, capacity):
+        connection = self._connection()
+        now = time.time()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute('SELECT tokens, updated FROM buckets WHERE name = ?', (bucket,)).fetchone()
+            tokens, updated = row if row is not None else (capacity, now)
+            tokens = self._refill(tokens, updated, max(now, updated), rate, capacity) - 1
+            connection.execute('INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)',
+                               (bucket, tokens, max(now, updated)))
+            self._reservations += 1
+            if self._reservations % _PRUNE_EVERY == 0:
+                self._prune(connection, now)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return -tokens / rate
+
+    def _prune(self, connection, now):
+        for name, tokens, updated in connection.execute('SELECT name, tokens, updated FROM buckets').fetchall():
+            rate, capacity = self.quotas.get(name.split(':', 1)[0], (None, None))
+            if rate is None or self._refill(tokens, updated, now, rate, capacity) >= capacity:
+                connection.execute('DELETE FROM buckets WHERE name = ?', (name,))
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.database_path, timeout=self.timeout, isolation_level=None)
+            self._local.connection = connection
+        return connection
@@ -0,0 +1,33 @@
+import threading
+import time
+
+from BlastApi.RateLimiter import RateLimiter
+
+_MAX_IDLE_BUCKETS = 1024
+
+
+class TokenBucketRateLimiter(RateLimiter):
+    def __init__(self, quotas=None):
+        r"""In-memory token bucket rate limiter shared by all threads of a process.
+
+        :param quotas: Dict of bucket name: (tokens per second, capacity). Default: BlastApi.RateLimiter.NCBI_QUOTAS
+        """
+        super().__init__(quotas)
+        self._buckets = dict()
+        self._lock = threading.Lock()
+
+    def _reserve(self, bucket, rate, capacity):
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(bucket, (capacity, now))
+            tokens = self._refill(tokens, updated, now, rate, capacity) - 1
+            self._buckets[bucket] = (tokens, now)
+            if len(self._buckets) > _MAX_IDLE_BUCKETS:
+                self._prune(now)
+        return -tokens / rate
+
+    def _prune(self, now):
+        for bucket, (tokens, updated) in list(self._buckets.items()):
+            rate, capacity = self.quotas[bucket.split(':', 1)[0]]
+            if self._refill(tokens, updated, now, rate, capacity) >= capacity:
+                del self._buckets[bucket]
@@ -0,0 +1,46 @@
+import abc
+import time
+
+_SEARCH_INFO = 'SearchInfo'
+
+# Bucket name: (tokens per second, bucket capacity). 'SearchInfo' bucket is kept separately for every request ID.
+NCBI_QUOTAS = {'Put': (1 / 10, 1), 'Get': (1, 1), _SEARCH_INFO: (1 / 60, 1)}
+
+
+class RateLimiter:
+    def __init__(self, quotas=None):
+        self.quotas = dict(NCBI_QUOTAS if quotas is None else quotas)
+
+    @abc.abstractmethod
+    def _reserve(self, bucket, rate, capacity):
+        """ Takes single token from bucket and returns number of seconds to wait before it can be used """
+
+    def acquire(self, bucket):
+        r"""Takes token from given bucket, sleeping until it is available. Buckets without quota are not limited.
+
+        :param bucket: Bucket name. One of quotas keys, optionally followed by ':' and request ID
+        :return: Number of seconds spent waiting
+        """
+        quota = self.quotas.get(bucket.split(':', 1)[0])
+        if quota is None:
+            return 0
+        delay = self._reserve(bucket, *quota)
+        if delay > 0:
+            time.sleep(delay)
+        return max(delay, 0)
+
+    def throttle(self, params):
+        r"""Takes tokens required to send request with given params: one from the bucket of the command ('Put' or
+        'Get') and, for status checks, one from the 'SearchInfo' bucket of the request ID.
+
+        :param params: Request parameters
+        :return: Number of seconds spent waiting
+        """
+        delay = self.acquire(params.get('CMD', ''))
+        if params.get('FORMAT_OBJECT') == _SEARCH_INFO and params.get('RID'):
+            delay += self.acquire(_SEARCH_INFO + ':' + params['RID'])
+        return delay
+
+    @staticmethod
+    def _refill(tokens, updated, now, rate, capacity):
+        return min(capacity, tokens + (now - updated) * rate)
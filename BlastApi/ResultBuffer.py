@@ -0,0 +1,119 @@
+import io
+import tempfile
+
+
+class ResultBuffer:
+    def __init__(self, data=b'', *, max_size=1024 * 1024):
+        r"""Binary file-like buffer holding retrieved results. Buffer stays in memory until it grows over max_size
+        bytes, then it's moved to anonymous temporary file (removed when closed), like tempfile.SpooledTemporaryFile.
+
+        Archives (XML2, JSON2) can be passed directly to BlastReport.read() or BlastApi.Parser.ArchiveParser, reports
+        (Text, HTML, Tabular) are available as bytes or memoryview without decoding.
+
+        :param data: Initial content
+        :param max_size: Number of bytes kept in memory
+        """
+        self.max_size = max_size
+        self._file = io.BytesIO()
+        if data:
+            self.write(data)
+            self.seek(0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        position = self._file.tell()
+        size = self._file.seek(0, io.SEEK_END)
+        self._file.seek(position)
+        return size
+
+    def __repr__(self):
+        return 'ResultBuffer(size={0}, in_memory={1})'.format(len(self), self.in_memory)
+
+    @property
+    def in_memory(self):
+        r"""True if content is held in memory, False if it was moved to temporary file."""
+        return isinstance(self._file, io.BytesIO)
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def getvalue(self):
+        r"""Returns whole content, regardless of current position.
+
+        :return: bytes
+        """
+        if self.in_memory:
+            return self._file.getvalue()
+        position = self._file.tell()
+        self._file.seek(0)
+        data = self._file.read()
+        self._file.seek(position)
+        return data
+
+    def getbuffer(self):
+        r"""Returns whole content without copying it if it's held in memory. Buffer can't be written while the view
+        exists.
+
+        :return: memoryview
+        """
+        if self.in_memory:
+            return self._file.getbuffer()
+        return memoryview(self.getvalue())
+
+    def text(self, encoding='utf-8'):
+        r"""Decodes whole content.
+
+        :param encoding: Text encoding
+        :return: str
+        """
+        return str(self.getbuffer(), encoding)
+
+    def write(self, data):
+        if self.in_memory and self._file.tell() + len(data) > self.max_size:
+            self._roll_over()
+        return self._file.write(data)
+
+    def read(self, size=-1):
+        return self._file.read(size)
+
+    def readinto(self, buffer):
+        return self._file.readinto(buffer)
+
+    def readline(self, size=-1):
+        return self._file.readline(size)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        return self._file.tell()
+
+    def truncate(self, size=None):
+        return self._file.truncate(size)
+
+    def flush(self):
+        self._file.flush()
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def close(self):
+        self._file.close()
+
+    def _roll_over(self):
+        file = tempfile.TemporaryFile()
+        file.write(self._file.getbuffer())
+        file.seek(self._file.tell())
+        self._file = file
@@ -0,0 +1,198 @@
+import collections
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+_LOCAL_PARAMS = {'CMD', 'RESULTS_FILE_PATH'}
+# Number of seconds after which the directory is scanned again even if it's under max_size (e.g. to evict expired
+# entries never read again or to count entries put by other processes)
+_SCAN_INTERVAL = 60
+
+
+def params_hash(params):
+    r"""Computes canonical hash of request parameters. Parameters which are not sent to NCBI (like CMD or
+    RESULTS_FILE_PATH) are skipped, so identical searches have identical hashes.
+
+    :param params: Parameters built by BlastClient
+    :return: Hexadecimal SHA-256 digest
+    """
+    canonical = {key: value for key, value in params.items() if key not in _LOCAL_PARAMS and value is not None}
+    encoded = json.dumps(canonical, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _request_id_key(request_id):
+    return 'rid-' + hashlib.sha256(request_id.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, directory, *, max_size=1024 ** 3, max_age=24 * 60 * 60, memory_items=128,
+                 memory_item_size=1024 ** 2):
+        r"""Content-addressed cache of submissions and results. Entries are stored on disk and evicted in least
+        recently used order once total size exceeds `max_size`, or once they are older than `max_age`. Recently used
+        small entries are additionally kept in memory. Total size is kept up to date by every put, the directory is
+        scanned only once it exceeds `max_size` (or once a minute).
+
+        :param directory: Cache directory. Created if doesn't exist.
+        :param max_size: Maximal total size of cached entries in bytes.
+        :param max_age: Maximal age of cached entry in seconds. RIDs expire at NCBI after about 24 hours.
+        :param memory_items: Number of entries kept in memory.
+        :param memory_item_size: Maximal size in bytes of entry kept in memory.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.max_age = max_age
+        self.memory_items = memory_items
+        self.memory_item_size = memory_item_size
+        self._memory = collections.OrderedDict()
+        self._sizes = dict()
+        self._total_size = 0
+        self._scanned_at = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def get_request_id(self, params):
+        r"""Returns request ID of identical search submitted before.
+
+        :param params: Search parameters
+        :return: Request ID or None
+        """
+        data = self._get('search-' + params_hash(params))
+        return data.decode('utf-8') if data is not None else None
+
+    def put_request_id(self, params, request_id):
+        r"""Stores request ID of submitted search.
+
+        :param params: Search parameters
+        :param request_id: ID of requested submission
+        """
+        key = 'search-' + params_hash(params)
+        self._put(key, request_id.encode('utf-8'))
+        # Reverse mapping lets forget_request_id() find the search of expired request ID
+        self._put(_request_id_key(request_id), key.encode('utf-8'))
+
+    def forget_request_id(self, request_id):
+        r"""Removes cached search which returned the request ID (e.g. once NCBI reports it 'UNKNOWN'), so identical
+        search is submitted again.
+
+        :param request_id: ID of requested submission
+        """
+        key = self._get(_request_id_key(request_id))
+        if key is None:
+            return
+        key = key.decode('utf-8')
+        if self._get(key) == request_id.encode('utf-8'):
+            self._delete(key)
+        self._delete(_request_id_key(request_id))
+
+    def get_results(self, params):
+        r"""Returns cached results.
+
+        :param params: Results parameters (including RID and FORMAT_TYPE)
+        :return: Results content as bytes or None
+        """
+        return self._get('results-' + params_hash(params))
+
+    def put_results(self, params, data):
+        r"""Stores results.
+
+        :param params: Results parameters (including RID and FORMAT_TYPE)
+        :param data: Results content as bytes
+        """
+        self._put('results-' + params_hash(params), data)
+
+    def clear(self):
+        r"""Removes all cached entries."""
+        with self._lock:
+            self._memory.clear()
+            self._sizes.clear()
+            self._total_size = 0
+            for entry in os.scandir(self.directory):
+                os.remove(entry.path)
+
+    def _delete(self, key):
+        with self._lock:
+            self._remove(key, os.path.join(self.directory, key))
+
+    def _get(self, key):
+        path = os.path.join(self.directory, key)
+        now = time.time()
+        with self._lock:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                self._memory.pop(key, None)
+                return None
+            if now - stat.st_mtime > self.max_age:
+                self._remove(key, path)
+                return None
+            os.utime(path, (now, stat.st_mtime))
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            # Evicted since checked above
+            return None
+        with self._lock:
+            self._remember(key, data)
+        return data
+
+    def _put(self, key, data):
+        path = os.path.join(self.directory, key)
+        descriptor, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(data)
+        os.replace(temp_path, path)
+        with self._lock:
+            self._remember(key, data)
+            self._total_size += len(data) - self._sizes.get(key, 0)
+            self._sizes[key] = len(data)
+            now = time.time()
+            if self._total_size > self.max_size or self._scanned_at is None or \
+                    now - self._scanned_at > _SCAN_INTERVAL:
+                self._evict(now)
+
+    def _remember(self, key, data):
+        if len(data) > self.memory_item_size:
+            self._memory.pop(key, None)
+            return
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now):
+        self._scanned_at = now
+        self._sizes.clear()
+        self._total_size = 0
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith('.tmp-'):
+                continue
+            stat = entry.stat()
+            if now - stat.st_mtime > self.max_age:
+                self._remove(entry.name, entry.path)
+                continue
+            entries.append((stat.st_atime, entry.name, entry.path))
+            self._sizes[entry.name] = stat.st_size
+            self._total_size += stat.st_size
+
+        entries.sort()
+        for _, key, path in entries:
+            if self._total_size <= self.max_size:
+                break
+            self._remove(key, path)
+
+    def _remove(self, key, path):
+        self._memory.pop(key, None)
+        self._total_size -= self._sizes.pop(key, 0)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,90 @@
+import collections
+import concurrent.futures
+import threading
+import time
+
+_READY = 'READY'
+
+
+class SingleFlight:
+    def __init__(self, *, ready_ttl=5, max_request_ids=100000):
+        r"""Coalesces identical requests running at the same time: the first caller sends the request, the others wait
+        for it and get the same result (or exception). Requests are identified by their parameters.
+
+        'READY' statuses are also remembered for ready_ttl seconds, so consumers checking status of a finished
+        search don't send any request at all.
+
+        :param ready_ttl: Number of seconds 'READY' status is remembered. 0 disables remembering.
+        :param max_request_ids: Number of remembered 'READY' statuses, the oldest ones are forgotten first
+        """
+        self.ready_ttl = ready_ttl
+        self.max_request_ids = max_request_ids
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight = dict()
+        self._ready = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def do(self, params, function):
+        r"""Calls the function unless a call with the same parameters is already running, then waits for its result.
+
+        :param params: Request parameters identifying the call
+        :param function: Function without arguments sending the request
+        :return: Result of the function
+        """
+        key = request_key(params)
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = concurrent.futures.Future()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = function()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        future.set_result(result)
+        return result
+
+    def ready_status(self, request_id):
+        r"""Returns remembered 'READY' status of the request ID.
+
+        :param request_id: ID of requested submission
+        :return: 'READY' or None if status isn't remembered or expired
+        """
+        with self._lock:
+            expires = self._ready.get(request_id)
+            if expires is None:
+                return None
+            if expires <= time.monotonic():
+                del self._ready[request_id]
+                return None
+            return _READY
+
+    def remember_status(self, request_id, status):
+        r"""Remembers status of the request ID if it's 'READY'.
+
+        :param request_id: ID of requested submission
+        :param status: Checked status
+        """
+        if status != _READY or self.ready_ttl <= 0:
+            return
+        with self._lock:
+            self._ready[request_id] = time.monotonic() + self.ready_ttl
+            self._ready.move_to_end(request_id)
+            while len(self._ready) > self.max_request_ids:
+                self._ready.popitem(last=False)
+
+
+def request_key(params):
+    r"""Returns hashable key of request parameters, independent of their order."""
+    return tuple(sorted((name, str(value)) for name, value in params.items()))
@@ -0,0 +1,132 @@
+import threading
+import time
+
+from BlastApi.Transport import BlastTransport
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+_FAILURE_STATUSES = (429,)
+_SERVER_ERROR = 500
+
+
+class _Circuit:
+    __slots__ = ('state', 'failures', 'opened_at', 'trials', 'generation')
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self.trials = 0
+        # Incremented whenever the circuit becomes half-open, so trials of earlier half-open periods are told apart
+        self.generation = 0
+
+
+class CircuitBreakerTransport(BlastTransport):
+    def __init__(self, transport, *, failure_threshold=5, reset_timeout=30, half_open_requests=1):
+        r"""Transport wrapper failing fast instead of hammering failing endpoint. Every URL has its own circuit, which
+        opens after failure_threshold consecutive failures (connection errors, timeouts, 429 and 5xx responses).
+        Requests to open circuit raise ConnectionError without being sent. After reset_timeout seconds the circuit is
+        half-open: half_open_requests trial requests are sent, success closes the circuit and failure opens it again.
+        Only trials change state of half-open circuit, responses of requests sent before the circuit opened are ignored.
+
+        :param transport: Wrapped BlastApi.Transport.BlastTransport (e.g. SessionTransport or HedgedTransport)
+        :param failure_threshold: Number of consecutive failures opening the circuit
+        :param reset_timeout: Number of seconds the circuit stays open
+        :param half_open_requests: Number of concurrent trial requests of half-open circuit
+        """
+        if failure_threshold <= 0 or half_open_requests <= 0:
+            raise ValueError("Invalid 'failure_threshold' or 'half_open_requests' parameter")
+        self.transport = transport
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_requests = half_open_requests
+        self.rejected = 0
+        self._circuits = dict()
+        self._lock = threading.Lock()
+
+    def get(self, url, params, *, stream=False, headers=None):
+        r"""Sends GET request unless circuit of the URL is open.
+
+        :param url: Request URL
+        :param params: Query string parameters
+        :param stream: If True response content is not downloaded immediately
+        :param headers: Additional HTTP headers, e.g. Range
+        :return: Response
+        """
+        circuit, trial = self._acquire(url)
+        try:
+            response = self.transport.get(url, params, stream=stream, headers=headers)
+        except Exception:
+            self._release(circuit, trial, failed=True)
+            raise
+        status_code = getattr(response, 'status_code', 200)
+        self._release(circuit, trial, failed=status_code >= _SERVER_ERROR or status_code in _FAILURE_STATUSES)
+        return response
+
+    def state(self, url):
+        r"""Returns state of circuit of the URL.
+
+        :param url: Request URL
+        :return: 'closed', 'open' or 'half-open'
+        """
+        with self._lock:
+            circuit = self._circuits.get(url)
+            if circuit is None:
+                return CLOSED
+            if circuit.state == OPEN and time.monotonic() - circuit.opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return circuit.state
+
+    def set_observer(self, observer):
+        self.transport.set_observer(observer)
+
+    def close(self):
+        self.transport.close()
+
+    def _acquire(self, url):
+        with self._lock:
+            circuit = self._circuits.get(url)
+            if circuit is None:
+                circuit = self._circuits[url] = _Circuit()
+            if circuit.state == OPEN and time.monotonic() - circuit.opened_at >= self.reset_timeout:
+                circuit.state = HALF_OPEN
+                circuit.trials = 0
+                circuit.generation += 1
+            if circuit.state == OPEN or circuit.state == HALF_OPEN and circuit.trials >= self.half_open_requests:
+                self.rejected += 1
+                raise ConnectionError("Circuit of '{0}' is open".format(url))
+            if circuit.state == HALF_OPEN:
+                circuit.trials += 1
+                return circuit, circuit.generation
+        return circuit, None
+
+    def _release(self, circuit, trial, *, failed):
+        with self._lock:
+            if trial is not None:
+                # Only trials of the current half-open period decide its outcome
+                if circuit.state != HALF_OPEN or circuit.generation != trial:
+                    return
+                circuit.trials -= 1
+                if failed:
+                    self._open(circuit)
+                else:
+                    circuit.state = CLOSED
+                    circuit.failures = 0
+                return
+            # Requests sent while the circuit was closed don't change open or half-open circuit
+            if circuit.state != CLOSED:
+                return
+            if not failed:
+                circuit.failures = 0
+                return
+            circuit.failures += 1
+            if circuit.failures >= self.failure_threshold:
+                self._open(circuit)
+
+    @staticmethod
+    def _open(circuit):
+        circuit.state = OPEN
+        circuit.opened_at = time.monotonic()
+        circuit.failures = 0
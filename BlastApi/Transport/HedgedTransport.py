@@ -0,0 +1,141 @@
+import collections
+import concurrent.futures
+import math
+import threading
+import time
+
+from BlastApi.Observer import STATUS, SUBMIT, operation_of
+from BlastApi.Transport import BlastTransport
+
+
+class HedgedTransport(BlastTransport):
+    def __init__(self, transport, *, operations=(STATUS,), percentile=95, min_delay=0.05, max_delay=10,
+                 window=200, min_samples=20, max_hedges=1, max_workers=20):
+        r"""Transport wrapper sending hedged (duplicate) requests: if response of idempotent request doesn't arrive
+        within the given latency percentile of recent requests of the same operation, the same request is sent again
+        and the first response wins. Responses of the other requests are closed when they arrive.
+
+        Only status checks are hedged by default, they are small and a stalled one blocks the whole polling loop.
+        Submissions are never hedged, as they aren't idempotent. Hedged requests bypass client's rate limiter, so
+        max_hedges should be kept small.
+
+        :param transport: Wrapped BlastApi.Transport.BlastTransport (e.g. SessionTransport)
+        :param operations: Hedged operations: 'status' and/or 'results' (see BlastApi.Observer)
+        :param percentile: Latency percentile (of headers arrival) after which request is hedged
+        :param min_delay: Minimal number of seconds before request is hedged
+        :param max_delay: Maximal number of seconds before request is hedged, used until min_samples are known
+        :param window: Number of the latest latencies of every operation the percentile is computed from
+        :param min_samples: Number of latencies needed to compute the percentile
+        :param max_hedges: Maximal number of duplicates of single request
+        :param max_workers: Number of threads sending hedged operations
+        """
+        if not 0 < percentile <= 100 or max_hedges < 0 or min_delay > max_delay:
+            raise ValueError("Invalid 'percentile', 'max_hedges' or 'min_delay' parameter")
+        if SUBMIT in operations:
+            raise ValueError("Invalid 'operations' parameter")
+        self.transport = transport
+        self.operations = frozenset(operations)
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.max_hedges = max_hedges
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.observer = None
+        self._latencies = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                               thread_name_prefix='HedgedTransport')
+
+    def get(self, url, params, *, stream=False, headers=None):
+        r"""Sends GET request, hedged if its operation is hedged.
+
+        :param url: Request URL
+        :param params: Query string parameters
+        :param stream: If True response content is not downloaded immediately
+        :param headers: Additional HTTP headers, e.g. Range
+        :return: Response which arrived first
+        """
+        operation = operation_of(params)
+        if operation not in self.operations:
+            return self.transport.get(url, params, stream=stream, headers=headers)
+        with self._lock:
+            self.requests += 1
+
+        delay = self.delay(operation)
+        first = self._executor.submit(self._send, operation, url, params, stream, headers)
+        pending = [first]
+        sent = 1
+        hedge_at = time.monotonic() + delay
+        error = None
+        while True:
+            can_hedge = sent <= self.max_hedges
+            timeout = max(hedge_at - time.monotonic(), 0) if can_hedge else None
+            done, _ = concurrent.futures.wait(pending, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in [future for future in pending if future in done]:
+                if future.exception() is None:
+                    self._discard(future, pending, hedged=future is not first)
+                    return future.result()
+                # Failed request isn't hedged, the other ones still may succeed
+                error = error or future.exception()
+                pending.remove(future)
+            if not pending:
+                raise error
+            if not done and can_hedge:
+                with self._lock:
+                    self.hedges += 1
+                if self.observer is not None:
+                    self.observer.retried(operation, params, attempt=sent, error=None)
+                pending.append(self._executor.submit(self._send, operation, url, params, stream, headers))
+                sent += 1
+                hedge_at = time.monotonic() + delay
+
+    def delay(self, operation):
+        r"""Returns number of seconds after which request of the operation is hedged.
+
+        :param operation: Operation ('status' or 'results')
+        :return: Latency percentile of recent requests, between min_delay and max_delay
+        """
+        with self._lock:
+            latencies = sorted(self._latencies[operation])
+        if len(latencies) < self.min_samples:
+            return self.max_delay
+        index = min(math.ceil(len(latencies) * self.percentile / 100) - 1, len(latencies) - 1)
+        return min(max(latencies[max(index, 0)], self.min_delay), self.max_delay)
+
+    def set_observer(self, observer):
+        r"""Sets observer notified of every hedged request (as retry without error) and of retries of the wrapped
+        transport.
+
+        :param observer: BlastApi.Observer.BlastObserver or None
+        """
+        self.observer = observer
+        self.transport.set_observer(observer)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.transport.close()
+
+    def _send(self, operation, url, params, stream, headers):
+        start = time.perf_counter()
+        response = self.transport.get(url, params, stream=stream, headers=headers)
+        with self._lock:
+            self._latencies[operation].append(time.perf_counter() - start)
+        return response
+
+    def _discard(self, winner, pending, *, hedged):
+        if hedged:
+            with self._lock:
+                self.hedge_wins += 1
+        for future in pending:
+            if future is not winner:
+                future.add_done_callback(_close_response)
+
+
+def _close_response(future):
+    if not future.cancelled() and future.exception() is None:
+        close = getattr(future.result(), 'close', None)
+        if close is not None:
+            close()
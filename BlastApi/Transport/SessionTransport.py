@@ -0,0 +1,115 @@
+import threading
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from BlastApi.Observer import STATUS, SUBMIT, operation_of
+from BlastApi.Transport import BlastTransport
+
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Status pages are small, a status check still waiting for them is stalled
+_TIMEOUTS = {STATUS: (3.05, 15)}
+
+
+class _ObservedRetry(Retry):
+    r"""Retry notifying observer of every retry it allows."""
+    observer = None
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.observer = self.observer
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        if self.observer is not None:
+            params = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(url or '').query))
+            self.observer.retried(operation_of(params), params, attempt=len(retry.history), error=error)
+        return retry
+
+
+class SessionTransport(BlastTransport):
+    def __init__(self, *, pool_connections=10, pool_maxsize=10, max_retries=3, backoff_factor=0.5,
+                 timeout=(3.05, 60), timeouts=None):
+        r"""Pooled, keep-alive HTTP transport based on requests.Session.
+
+        Every thread gets its own Session (sessions keep mutable state such as cookies), but all of them share a
+        single HTTPAdapter, so TCP/TLS connections are pooled and reused across threads.
+
+        Submissions aren't idempotent (every one starts a new search), so they are retried only if the connection
+        couldn't be established, never after read errors, timeouts or 429/5xx responses.
+
+        :param pool_connections: Number of connection pools to cache (one per host).
+        :param pool_maxsize: Maximum number of connections kept alive in a single pool.
+        :param max_retries: Number of retries for failed connections and 429/5xx responses (only failed connections
+                for submissions).
+        :param backoff_factor: Backoff factor for retries. Sleep between retries is backoff_factor * 2 ** (retry - 1).
+        :param timeout: Request timeout in seconds. Single number or (connect timeout, read timeout) tuple.
+        :param timeouts: Timeouts of single operations overriding timeout, dict of operation ('submit', 'status' or
+                'results', see BlastApi.Observer) and timeout. Default: status checks time out after 15 seconds
+                without data.
+        """
+        self.timeout = timeout
+        self.timeouts = dict(timeouts if timeouts is not None else _TIMEOUTS)
+        retry = _ObservedRetry(total=max_retries, backoff_factor=backoff_factor, status_forcelist=_RETRY_STATUSES,
+                               allowed_methods=frozenset(['GET']), raise_on_status=False)
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        submit_retry = _ObservedRetry(total=max_retries, connect=max_retries, read=0, status=0, other=0,
+                                      backoff_factor=backoff_factor, allowed_methods=frozenset(['GET']),
+                                      raise_on_status=False)
+        self.submit_adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                          max_retries=submit_retry)
+        # Both adapters share connection pools, they differ in retries only
+        self.submit_adapter.poolmanager.clear()
+        self.submit_adapter.poolmanager = self.adapter.poolmanager
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    def get(self, url, params, *, stream=False, headers=None):
+        r"""Sends GET request using pooled connection.
+
+        :param url: Request URL
+        :param params: Query string parameters
+        :param stream: If True response content is not downloaded immediately
+        :param headers: Additional HTTP headers, e.g. Range
+        :return: requests.Response
+        """
+        operation = operation_of(params)
+        session = self._session(self.submit_adapter if operation == SUBMIT else self.adapter)
+        return session.get(url, params=params, stream=stream, headers=headers,
+                           timeout=self.timeouts.get(operation, self.timeout))
+
+    def set_observer(self, observer):
+        r"""Sets observer notified of every retry of failed connection or 429/5xx response.
+
+        :param observer: BlastApi.Observer.BlastObserver or None
+        """
+        self.adapter.max_retries.observer = observer
+        self.submit_adapter.max_retries.observer = observer
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions = []
+        self.adapter.close()
+        self.submit_adapter.close()
+        self._local = threading.local()
+
+    def _session(self, adapter=None):
+        adapter = adapter if adapter is not None else self.adapter
+        # Separate session for every adapter, as sessions select adapters by URL prefix only
+        attribute = 'submit_session' if adapter is self.submit_adapter else 'session'
+        session = getattr(self._local, attribute, None)
+        if session is None:
+            session = requests.Session()
+            session.headers['Connection'] = 'keep-alive'
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            setattr(self._local, attribute, session)
+            with self._lock:
+                self._sessions.append(session)
+        return session
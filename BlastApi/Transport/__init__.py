@@ -0,0 +1,13 @@
+import abc
+
+
+class BlastTransport:
+    @abc.abstractmethod
+    def get(self, url, params, *, stream=False, headers=None):
+        """ Sends GET request with given params (and additional HTTP headers) and returns response """
+
+    def set_observer(self, observer):
+        """ Sets BlastApi.Observer.BlastObserver receiving retries (and hedges) made by transport itself """
+
+    def close(self):
+        """ Releases resources held by transport """
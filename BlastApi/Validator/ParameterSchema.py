@@ -0,0 +1,157 @@
+import collections.abc
+
+FORMAT_TYPES = {'HTML', 'Text', 'XML', 'XML2', 'JSON2', 'Tabular'}
+
+
+class Field:
+    __slots__ = ('name', 'argument', 'encode', 'rules')
+
+    def __init__(self, name, *rules, argument=None, encode=None):
+        r"""Single Common URL API parameter.
+
+        :param name: Parameter name, e.g. 'HITLIST_SIZE'
+        :param rules: Rule factories (e.g. required, greater_than_zero) taking parameter name and returning
+                (check, error) tuple. Checks get only values which are not None, check None means the value is required.
+                Rules are checked in given order.
+        :param argument: Name of client method argument holding the value. Default: lower-cased name
+        :param encode: Function encoding argument value as parameter value. Default: value is passed as it is
+        """
+        self.name = name
+        self.argument = argument if argument is not None else name.lower()
+        self.encode = encode
+        self.rules = tuple(rule(name) for rule in rules)
+
+
+class ParameterSchema:
+    def __init__(self, fields):
+        r"""Declarative parameter schema compiled into lookup tables once, when created. Builds request parameters from
+        client method arguments and validates them without any per-call introspection. Valid parameters are checked in
+        a single pass over present parameters only, rules are run in field order only to report errors.
+
+        :param fields: List of Field, in validation order
+        """
+        self.fields = tuple(fields)
+        self._arguments = tuple((field.argument, field.name, field.encode) for field in self.fields)
+        self._rules = tuple((field.name, check, error) for field in self.fields for check, error in field.rules)
+        self._required = tuple(field.name for field in self.fields if any(check is None for check, _ in field.rules))
+        self._checks = {field.name: _all(check for check, _ in field.rules if check is not None)
+                        for field in self.fields if any(check is not None for check, _ in field.rules)}
+
+    def build(self, arguments):
+        r"""Builds request parameters. Arguments without value (None, empty or 0) are skipped.
+
+        :param arguments: Dict of argument name: value, e.g. locals() of client method. Other entries are ignored.
+        :return: Dict of parameter name: encoded value
+        """
+        params = dict()
+        for argument, name, encode in self._arguments:
+            value = arguments.get(argument)
+            if value:
+                params[name] = encode(value) if encode is not None else value
+        return params
+
+    def is_valid(self, params):
+        r"""Checks parameters without collecting errors.
+
+        :param params: Dict of parameter name: value
+        :return: True if parameters are valid
+        """
+        for name in self._required:
+            if params.get(name) is None:
+                return False
+        get_check = self._checks.get
+        for name, value in params.items():
+            check = get_check(name)
+            if check is not None and value is not None and not check(value):
+                return False
+        return True
+
+    def validate(self, params):
+        r"""Validates parameters.
+
+        :param params: Dict of parameter name: value
+        :return: List of errors
+        """
+        if self.is_valid(params):
+            return []
+        errors = []
+        for name, check, error in self._rules:
+            value = params.get(name)
+            if value is None if check is None else value is not None and not check(value):
+                errors.append(error)
+        return errors
+
+    def validate_many(self, params_sets):
+        r"""Validates many parameter sets, e.g. all submissions of a batch run before the first one is sent.
+
+        :param params_sets: Iterable of parameter dicts
+        :return: Generator of (index, errors) tuples, only for invalid parameter sets
+        """
+        is_valid = self.is_valid
+        for index, params in enumerate(params_sets):
+            if not is_valid(params):
+                yield index, self.validate(params)
+
+
+def encode_gap_costs(gap_costs):
+    if isinstance(gap_costs, collections.abc.Iterable) and not isinstance(gap_costs, str):
+        return ' '.join(map(str, gap_costs))
+    return gap_costs
+
+
+def required(name):
+    return None, "Parameter '" + name.lower() + "' must be specified"
+
+
+def not_empty(name):
+    return (lambda value: len(value) != 0), "Parameter '" + name.lower() + "' cannot be empty"
+
+
+def one_of(values):
+    def rule(name):
+        return values.__contains__, _invalid(name)
+    return rule
+
+
+def optional_one_of(values):
+    r"""Like one_of(), but empty value is also valid."""
+    def rule(name):
+        return (lambda value: not len(value) or value in values), _invalid(name)
+    return rule
+
+
+def matches(pattern):
+    def rule(name):
+        return (lambda value: not len(value) or pattern.match(value) is not None), _invalid(name)
+    return rule
+
+
+def greater_than_zero(name):
+    return (lambda value: value > 0), _invalid(name)
+
+
+def less_than_zero(name):
+    return (lambda value: value < 0), _invalid(name)
+
+
+def positive_pair(name):
+    return _is_positive_pair, _invalid(name)
+
+
+def _is_positive_pair(value):
+    pair = value.split(' ')
+    try:
+        return len(pair) == 2 and int(pair[0]) > 0 and int(pair[1]) > 0
+    except ValueError:
+        return False
+
+
+def _all(checks):
+    checks = tuple(checks)
+    if len(checks) == 1:
+        return checks[0]
+    return lambda value: all(check(value) for check in checks)
+
+
+def _invalid(name):
+    return "Invalid '" + name.lower() + "' parameter"
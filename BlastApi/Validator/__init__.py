@@ -1,55 +1,19 @@
-import abc
-
-__FORMAT_TYPES__ = {'HTML', 'Text', 'XML', 'XML2', 'JSON2', 'Tabular'}
-
-
 class BlastValidator:
-    def __init__(self, allowed_values):
-        self.allowed_values = allowed_values
+    def __init__(self, schema):
+        self.schema = schema
 
-    @abc.abstractclassmethod
     def validate_params(self, params):
-        """ Validates given params """
-
-    def _validate_not_none(self, param_name, value, errors):
-        if value is None:
-            errors.append("Parameter '" + param_name.lower() + "' must be specified")
-            return False
-        return True
-
-    def _validate_not_empty(self, param_name, value, errors):
-        if value is not None and len(value) == 0:
-            errors.append("Parameter '" + param_name.lower() + "' cannot be empty")
-            return False
-        return True
-
-    def _validate_value(self, param_name, value, errors, *, not_none=False):
-        not_none_result = True
-        if not_none:
-            not_none_result = self._validate_not_none(param_name, value, errors)
-
-        if value not in self.allowed_values[param_name] and value is not None:
-            errors.append("Invalid '" + param_name.lower() + "' parameter")
-            return False
-
-        return not_none_result
-
-    def _validate_format_type(self, format_type, errors):
-        if format_type is None or len(format_type) == 0 or format_type in __FORMAT_TYPES__:
-            return True
-        errors.append("Invalid 'format_type' parameter")
+        r"""Validates given params.
 
-    def _validate_grater_than_zero(self, value, parameter_name, errors):
-        if value is None or value > 0:
-            return True
-        errors.append("Invalid '" + parameter_name.lower() + "' parameter")
+        :param params: Parameters to be validated
+        :return: List of potential errors
+        """
+        return self.schema.validate(params)
 
-    def _validate_less_than_zero(self, value, parameter_name, errors):
-        if value is None or value < 0:
-            return True
-        errors.append("Invalid '" + parameter_name.lower() + "' parameter")
+    def validate_many(self, params_sets):
+        r"""Validates many parameter sets in bulk, e.g. before a large batch run.
 
-    def _validate_ncbi_gi(self, ncbi_gi, errors):
-        if ncbi_gi is None or (ncbi_gi == "F" or ncbi_gi == "T"):
-            return True
-        errors.append("Invalid 'ncbi_gi' parameter")
+        :param params_sets: Iterable of parameter dicts
+        :return: Generator of (index, errors) tuples, only for invalid parameter sets
+        """
+        return self.schema.validate_many(params_sets)
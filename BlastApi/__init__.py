@@ -1,21 +1,75 @@
-import collections
-import inspect
+import concurrent.futures
+import os
 import re
-import shutil
 import time
 
-import requests
-
-from BlastApi.Validator.BlastResultsValidator import BlastResultsValidator
-from BlastApi.Validator.BlastSearchValidator import BlastSearchValidator
+from BlastApi.DownloadManager import DownloadManager
+from BlastApi.EndpointPool import EndpointPool
+from BlastApi.JobJournal import bind_endpoint
+from BlastApi.Observer import RESULTS, operation_of
+from BlastApi.ResultBuffer import ResultBuffer
+from BlastApi.Transport.SessionTransport import SessionTransport
+from BlastApi.Validator.BlastResultsValidator import RESULTS_SCHEMA, BlastResultsValidator
+from BlastApi.Validator.BlastSearchValidator import SEARCH_SCHEMA, BlastSearchValidator
 
 _API_URL = "https://blast.ncbi.nlm.nih.gov/Blast.cgi"
+_QBLAST_INFO_PATTERN = re.compile('QBlastInfoBegin(.*?)QBlastInfoEnd', flags=re.DOTALL)
+_QBLAST_INFO_BYTES_PATTERN = re.compile(b'QBlastInfoBegin(.*?)QBlastInfoEnd', flags=re.DOTALL)
+_QBLAST_INFO_END = b'QBlastInfoEnd'
+_CHUNK_SIZE = 8192
+_RESULTS_FILE_PATH = '{rid}.zip'
+_MULTI_RESULTS_FILE_PATH = '{rid}_{format_type}.zip'
+# Status pages are small, QBlastInfo is searched at the beginning of results only
+_STATUS_PAGE_SIZE = 64 * 1024
+_SUCCESS = 200
+_REDIRECT = 300
 
 
 class BlastClient:
-    def __init__(self):
+    def __init__(self, *, transport=None, rate_limiter=None, result_cache=None, journal=None, endpoints=None,
+                 download_manager=None, observer=None, single_flight=None):
+        r"""Creates NCBI-BLAST Common URL API client.
+
+        :param transport: Transport used to send HTTP requests (see BlastApi.Transport.BlastTransport). Default: pooled,
+                keep-alive SessionTransport shared by all threads using this client.
+        :param rate_limiter: Rate limiter throttling requests (see BlastApi.RateLimiter). Default: no limits.
+        :param result_cache: BlastApi.ResultCache.ResultCache used to reuse identical searches and their results.
+                Default: no caching.
+        :param journal: BlastApi.JobJournal.JobJournal recording submissions, status transitions and results locations.
+                Default: no journal.
+        :param endpoints: BlastApi.EndpointPool.EndpointPool or list of endpoints (URLs or (url, weight) tuples)
+                exposing the Common URL API. Default: NCBI only.
+        :param download_manager: BlastApi.DownloadManager.DownloadManager used to download XML2 and JSON2 archives.
+                Default: DownloadManager with default settings.
+        :param observer: BlastApi.Observer.BlastObserver receiving events of every HTTP call, submission, status check,
+                results retrieval and retry (e.g. BlastApi.Observer.MetricsObserver.MetricsObserver). Default: none.
+        :param single_flight: BlastApi.SingleFlight.SingleFlight coalescing concurrent identical status checks and
+                results retrievals (except ones returning ResultBuffer) and remembering 'READY' statuses.
+                Default: every call sends its own request.
+        """
         self.search_validator = BlastSearchValidator()
         self.result_validator = BlastResultsValidator()
+        self.transport = transport if transport is not None else SessionTransport()
+        self.rate_limiter = rate_limiter
+        self.result_cache = result_cache
+        self.journal = journal
+        self.endpoints = endpoints if endpoints is None or isinstance(endpoints, EndpointPool) else EndpointPool(
+            endpoints)
+        self.download_manager = download_manager if download_manager is not None else DownloadManager()
+        self.observer = observer
+        if observer is not None:
+            self.transport.set_observer(observer)
+        self.single_flight = single_flight
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        r"""Closes pooled connections of the underlying transport."""
+        self.transport.close()
 
     def search(self, query, database, program, *, filter=None, format_type=None, expect=None, nucl_reward=None,
                nucl_penalty=None, gapcosts=None, matrix=None, hitlist_size=None, descriptions=None, alignments=None,
@@ -46,17 +100,12 @@ class BlastClient:
         :return: Tuple of request_id and estimated time in seconds until the search is completed
         """
 
-        frame = inspect.currentframe()
-        params = self._get_params(frame)
-        params["CMD"] = "Put"
+        params = self._search_params(SEARCH_SCHEMA.build(locals()))
+        cached = self._cached_submission(params)
+        if cached is not None:
+            return cached
 
-        errors = self.search_validator.validate_params(params)
-        if errors:
-            raise AttributeError(errors)
-
-        response = requests.get(_API_URL, params)
-        qblast_info = self.__cropp_qblast_info__(response.text)
-        return qblast_info["RID"], qblast_info["RTOE"]
+        return self._cache_submission(params, self._submit(params))
 
     def check_submission_status(self, request_id):
         r"""Checks submission status.
@@ -65,11 +114,10 @@ class BlastClient:
         :return: Status of submission. 'WAITING', 'UNKNOWN' or 'READY'
         """
 
-        response = requests.get(_API_URL, {"CMD": "Get", "FORMAT_OBJECT": "SearchInfo", "RID": request_id})
-        return self.__cropp_qblast_info__(response.text)['Status']
+        return self._fetch_status(request_id)
 
     def get_results(self, request_id, *, format_type='HTML', hitlist_size=None, descriptions=None, alignments=None,
-                    ncbi_gi=None, format_object=None, results_file_path='results.zip'):
+                    ncbi_gi=None, format_object=None, results_file_path=_RESULTS_FILE_PATH, as_buffer=False):
         r"""Retrieves results from NCBI.
 
         :param request_id: ID of requested submission
@@ -80,31 +128,47 @@ class BlastClient:
         :param ncbi_gi: Show NCBI GIs in report. 'T' or 'F'
         :param format_object: Object type. SearchInfo (status check) or Alignment (report formatting). Only Alignment is
                 valid for retrieving results.
-        :param results_file_path: Results relative file path (applies to XML2 and JSON2).
-        :return: Results or relative path to results file
+        :param results_file_path: Results file path (applies to XML2 and JSON2). '{rid}' is replaced with the request
+                ID, so concurrent retrievals of different searches don't overwrite each other. Default: '{rid}.zip'
+        :param as_buffer: If True, results of any format are returned as BlastApi.ResultBuffer.ResultBuffer, kept in
+                memory up to spool_size of the download manager, and results_file_path is ignored.
+        :return: Results, relative path to results file or ResultBuffer
         """
-        frame = inspect.currentframe()
-        params = self._get_params(frame)
-        params['CMD'] = 'Get'
+        results_file_path = None if as_buffer else results_path(results_file_path, request_id)
+        params = self._results_params(RESULTS_SCHEMA.build(locals()))
+        return self._fetch_results(params, format_type, results_file_path)
 
-        errors = self.result_validator.validate_params(params)
-        if errors:
-            raise AttributeError(errors)
-
-        if format_type == 'XML2' or format_type == 'JSON2':
-            response = requests.get(_API_URL, params, stream=True)
-            with open(results_file_path, 'wb') as file:
-                shutil.copyfileobj(response.raw, file)
-            return results_file_path
-        else:
-            response = requests.get(_API_URL, params)
-            results = response.text
+    def get_results_multi(self, request_id, formats=('Tabular', 'XML2', 'Text'), *, hitlist_size=None,
+                          descriptions=None, alignments=None, ncbi_gi=None, format_object=None,
+                          results_file_path=_MULTI_RESULTS_FILE_PATH, as_buffer=False):
+        r"""Retrieves results in many formats at once. Formats are downloaded in parallel over pooled connections, so
+        the call takes about as long as the slowest single download.
 
-        return results
+        :param request_id: ID of requested submission
+        :param formats: Report types. Any of: ['HTML', 'Text', 'XML', 'XML2', 'JSON2', 'Tabular'].
+        :param hitlist_size: Number of databases sequences to keep. Integer greater than zero.
+        :param descriptions: Number of descriptions to print (applies to HTML and Text). Integer greater than zero.
+        :param alignments: Number of alignments to print (applies to HTML and Text). Integer greater than zero.
+        :param ncbi_gi: Show NCBI GIs in report. 'T' or 'F'
+        :param format_object: Object type. Only Alignment is valid for retrieving results.
+        :param results_file_path: Results file path (applies to XML2 and JSON2). Template ('{rid}' and '{format_type}'
+                are replaced) or dict of format type: path. Both XML2 and JSON2 need '{format_type}' in template or
+                different paths. Default: '{rid}_{format_type}.zip'
+        :param as_buffer: If True, results are returned as BlastApi.ResultBuffer.ResultBuffer objects and
+                results_file_path is ignored.
+        :return: Dict of format type: results, path to results file or ResultBuffer, in order of formats
+        """
+        if as_buffer:
+            results_file_path = None
+        retrievals = self._multi_results_params(RESULTS_SCHEMA.build(locals()), formats, results_file_path)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(retrievals)) as executor:
+            futures = [(format_type, executor.submit(self._fetch_results, params, format_type, path))
+                       for format_type, params, path in retrievals]
+            return {format_type: future.result() for format_type, future in futures}
 
     def wait_for_results(self, request_id, estimated_time=2, *, format_type='HTML', hitlist_size=None,
                          descriptions=None, alignments=None, ncbi_gi=None, format_object=None,
-                         results_file_path='results.zip'):
+                         results_file_path=_RESULTS_FILE_PATH, as_buffer=False):
         r"""Waits for availability of results and retrieves it.
 
         :param request_id: ID of requested submission
@@ -116,9 +180,18 @@ class BlastClient:
         :param ncbi_gi: Show NCBI GIs in report. 'T' or 'F'
         :param format_object: Object type. SearchInfo (status check) or Alignment (report formatting). Only Alignment is
                 valid for retrieving results.
-        :param results_file_path: Results relative file path (applies to XML2 and JSON2).
-        :return: Results or relative path to results file
+        :param results_file_path: Results file path (applies to XML2 and JSON2). '{rid}' is replaced with the request
+                ID, so concurrent retrievals of different searches don't overwrite each other. Default: '{rid}.zip'
+        :param as_buffer: If True, results are returned as BlastApi.ResultBuffer.ResultBuffer (see get_results()).
+        :return: Results, relative path to results file or ResultBuffer
         """
+        results_file_path = None if as_buffer else results_path(results_file_path, request_id)
+        if self.result_cache is not None:
+            params = self._results_params(RESULTS_SCHEMA.build(locals()))
+            cached = self._cached_results(params, format_type, results_file_path)
+            if cached is not None:
+                return cached
+
         time.sleep(int(estimated_time))
         status = self.check_submission_status(request_id)
         print('Submission status: ' + status)
@@ -128,19 +201,43 @@ class BlastClient:
             print('Submission status: ' + status)
 
         if status == 'UNKNOWN':
+            self._forget_request_id(request_id)
             raise ValueError("NCBI returned 'UNKNOWN' submition state")
 
         return self.get_results(request_id, format_type=format_type, hitlist_size=hitlist_size,
                                 descriptions=descriptions, alignments=alignments, ncbi_gi=ncbi_gi,
-                                format_object=format_object, results_file_path=results_file_path)
+                                format_object=format_object, results_file_path=results_file_path,
+                                as_buffer=as_buffer)
 
     def __cropp_qblast_info__(self, html):
-        search_results = re.findall('QBlastInfoBegin(.*?)QBlastInfoEnd', html, flags=re.DOTALL)
+        return self._qblast_info_dict(_QBLAST_INFO_PATTERN.findall(html))
+
+    def _read_qblast_info(self, response, keys):
+        r"""Reads QBlastInfo entries from streamed response. Reading stops and connection is closed as soon as all
+        required keys are found, so the rest of the page is never downloaded nor decoded.
+        """
+        buffer = bytearray()
+        result_dict = dict()
+        try:
+            for chunk in response.iter_content(chunk_size=_CHUNK_SIZE):
+                scan_from = max(len(buffer) - len(_QBLAST_INFO_END) + 1, 0)
+                buffer += chunk
+                if buffer.find(_QBLAST_INFO_END, scan_from) >= 0:
+                    result_dict = self._qblast_info_dict(_QBLAST_INFO_BYTES_PATTERN.findall(buffer))
+                    if all(key in result_dict for key in keys):
+                        break
+        finally:
+            response.close()
+        return result_dict
+
+    def _qblast_info_dict(self, search_results):
         if search_results:
             result_dict = dict()
             for search_result in search_results:
+                if isinstance(search_result, bytes):
+                    search_result = search_result.decode('utf-8', errors='replace')
                 search_result = search_result.strip()
-                entries = search_result.split("\n")
+                entries = search_result.splitlines()
                 for entry in entries:
                     key_value_pair = entry.split('=')
                     if len(key_value_pair) > 0:
@@ -152,15 +249,249 @@ class BlastClient:
             return result_dict
         return dict()
 
-    def _get_params(self, frame):
-        arg_names, _, _, values = inspect.getargvalues(frame)
-        arg_names.remove("self")
-        params = {arg_name.upper(): values[arg_name] for arg_name in arg_names if values[arg_name]}
-        if 'REQUEST_ID' in params:
-            params['RID'] = params['REQUEST_ID']
-            del params['REQUEST_ID']
-        if 'GAPCOSTS' in params and isinstance(params['GAPCOSTS'], collections.Iterable) and not isinstance(
-                params['GAPCOSTS'], str):
-            params['GAPCOSTS'] = ' '.join(map(lambda x: str(x), params['GAPCOSTS']))
+    def _request(self, params, *, stream=False, headers=None, endpoint=None):
+        if self.rate_limiter is not None:
+            self.rate_limiter.throttle(params)
+        if self.observer is not None:
+            return self._observed_request(params, stream=stream, headers=headers, endpoint=endpoint)
+        return self._send(params, stream=stream, headers=headers, endpoint=endpoint)
 
+    def _observed_request(self, params, *, stream, headers, endpoint):
+        operation = operation_of(params)
+        self.observer.request_started(operation, params)
+        start = time.perf_counter()
+        try:
+            response = self._send(params, stream=stream, headers=headers, endpoint=endpoint)
+        except Exception as error:
+            self.observer.request_finished(operation, params, elapsed=time.perf_counter() - start, error=error)
+            raise
+        self.observer.request_finished(operation, params, elapsed=time.perf_counter() - start,
+                                       status_code=getattr(response, 'status_code', None),
+                                       size=_response_size(response, stream))
+        return response
+
+    def _send(self, params, *, stream, headers, endpoint):
+        if self.endpoints is None:
+            return self.transport.get(_API_URL, params, stream=stream, headers=headers)
+        if endpoint is None and self.journal is not None and 'RID' in params and \
+                self.endpoints.endpoint_of(params['RID']) is None:
+            # Binding forgotten by the pool (or made by other process) is restored from the journal
+            bind_endpoint(self, self.journal.get(params['RID']))
+        return self.endpoints.request(self.transport, params, stream=stream, headers=headers, endpoint=endpoint)
+
+    def _search_params(self, params):
+        params["CMD"] = "Put"
+
+        errors = self.search_validator.validate_params(params)
+        if errors:
+            raise AttributeError(errors)
         return params
+
+    def _status_params(self, request_id):
+        return {"CMD": "Get", "FORMAT_OBJECT": "SearchInfo", "RID": request_id}
+
+    def _results_params(self, params):
+        params['CMD'] = 'Get'
+
+        errors = self.result_validator.validate_params(params)
+        if errors:
+            raise AttributeError(errors)
+        return params
+
+    def _multi_results_params(self, params, formats, results_file_path):
+        formats = list(dict.fromkeys(formats))
+        if not formats:
+            raise ValueError("Invalid 'formats' parameter")
+        retrievals = []
+        archive_paths = set()
+        for format_type in formats:
+            if results_file_path is None:
+                retrievals.append((format_type, self._results_params(dict(params, FORMAT_TYPE=format_type)), None))
+                continue
+            if isinstance(results_file_path, dict):
+                path = results_file_path.get(format_type) or _MULTI_RESULTS_FILE_PATH
+            else:
+                path = results_file_path
+            # Placeholders are replaced, not formatted, so other braces in user paths are kept as they are
+            path = results_path(path, params['RID']).replace('{format_type}', format_type)
+            if self._is_archive(format_type):
+                # Archives of different formats saved to the same path would overwrite each other
+                if path in archive_paths:
+                    raise ValueError("Invalid 'results_file_path' parameter")
+                archive_paths.add(path)
+            retrievals.append((format_type, self._results_params(dict(params, FORMAT_TYPE=format_type,
+                                                                      RESULTS_FILE_PATH=path)), path))
+        return retrievals
+
+    def _fetch_results(self, params, format_type, results_file_path):
+        # Buffers are owned (read and closed) by the caller, so they are never shared
+        if self.single_flight is not None and results_file_path is not None:
+            results, cached = self.single_flight.do(
+                params, lambda: self._retrieve_results(params, format_type, results_file_path))
+        else:
+            results, cached = self._retrieve_results(params, format_type, results_file_path)
+
+        if self.observer is not None:
+            self.observer.results_retrieved(params['RID'], format_type, _results_size(
+                results, results_file_path is not None and self._is_archive(format_type)), cached=cached)
+
+        if self.journal is not None:
+            self.journal.record_results(params['RID'], results_file_path if self._is_archive(format_type) else None)
+        if self.endpoints is not None:
+            self.endpoints.finish(params['RID'])
+        return results
+
+    def _retrieve_results(self, params, format_type, results_file_path):
+        results = self._cached_results(params, format_type, results_file_path)
+        if results is not None:
+            return results, True
+        failed = []
+        results = self._read_results(params, format_type, results_file_path, failed)
+        # Error responses and status pages (e.g. results requested before the search is READY) are never cached
+        if not failed and not self._is_status_page(results, results_file_path is not None and self._is_archive(
+                format_type)):
+            self._cache_results(params, format_type, results)
+        return results, False
+
+    def _submit(self, params):
+        endpoint = self.endpoints.select() if self.endpoints is not None else None
+        response = self._request(params, stream=True, endpoint=endpoint)
+        status_code = getattr(response, 'status_code', _SUCCESS)
+        if not _SUCCESS <= status_code < _REDIRECT:
+            response.close()
+            raise ValueError("NCBI returned HTTP status {0} to submission".format(status_code))
+        qblast_info = self._read_qblast_info(response, ("RID", "RTOE"))
+        if "RID" not in qblast_info or "RTOE" not in qblast_info:
+            raise ValueError("NCBI returned no request ID to submission")
+        if endpoint is not None:
+            self.endpoints.bind(qblast_info["RID"], endpoint)
+        if self.observer is not None:
+            self.observer.submitted(qblast_info["RID"], qblast_info["RTOE"])
+        if self.journal is not None:
+            self.journal.record_submission(params, qblast_info["RID"], qblast_info["RTOE"],
+                                           endpoint.url if endpoint is not None else None)
+        return qblast_info["RID"], qblast_info["RTOE"]
+
+    def _fetch_status(self, request_id):
+        if self.single_flight is None:
+            return self._check_status(request_id)
+        status = self.single_flight.ready_status(request_id)
+        if status is not None:
+            return status
+        return self.single_flight.do(self._status_params(request_id), lambda: self._check_status(request_id))
+
+    def _check_status(self, request_id):
+        response = self._request(self._status_params(request_id), stream=True)
+        status = self._read_qblast_info(response, ('Status',))['Status']
+        if self.journal is not None:
+            self.journal.record_status(request_id, status)
+        if self.observer is not None:
+            self.observer.status_checked(request_id, status)
+        if status == 'UNKNOWN':
+            self._forget_request_id(request_id)
+            if self.endpoints is not None:
+                self.endpoints.finish(request_id)
+        if self.single_flight is not None:
+            self.single_flight.remember_status(request_id, status)
+        return status
+
+    def _read_results(self, params, format_type, results_file_path, failed):
+        on_retry = None
+        if self.observer is not None:
+            def on_retry(attempt, error):
+                self.observer.retried(RESULTS, params, attempt=attempt, error=error)
+
+        def request(headers=None, stream=True):
+            response = self._request(params, stream=stream, headers=headers)
+            if not _SUCCESS <= getattr(response, 'status_code', _SUCCESS) < _REDIRECT:
+                failed.append(response.status_code)
+            return response
+
+        # No path means results are returned in ResultBuffer
+        if results_file_path is None:
+            return self.download_manager.buffer(request, archive=self._is_archive(format_type), on_retry=on_retry)
+        if self._is_archive(format_type):
+            return self.download_manager.download(request, results_file_path, on_retry=on_retry)
+        return request(stream=False).text
+
+    def _is_status_page(self, results, is_file):
+        if isinstance(results, ResultBuffer):
+            position = results.tell()
+            results.seek(0)
+            head = results.read(_STATUS_PAGE_SIZE)
+            results.seek(position)
+        elif is_file:
+            with open(results, 'rb') as file:
+                head = file.read(_STATUS_PAGE_SIZE)
+        else:
+            head = results[:_STATUS_PAGE_SIZE].encode('utf-8')
+        status = (self._qblast_info_dict(_QBLAST_INFO_BYTES_PATTERN.findall(head)) or dict()).get('Status')
+        return status is not None and status != 'READY'
+
+    def _forget_request_id(self, request_id):
+        if self.result_cache is not None:
+            self.result_cache.forget_request_id(request_id)
+
+    def _cached_submission(self, params):
+        if self.result_cache is None:
+            return None
+        request_id = self.result_cache.get_request_id(params)
+        return (request_id, '0') if request_id is not None else None
+
+    def _cache_submission(self, params, submission):
+        if self.result_cache is not None:
+            self.result_cache.put_request_id(params, submission[0])
+        return submission
+
+    def _cached_results(self, params, format_type, results_file_path):
+        if self.result_cache is None:
+            return None
+        data = self.result_cache.get_results(params)
+        if data is None:
+            return None
+        if results_file_path is None:
+            return ResultBuffer(data, max_size=self.download_manager.spool_size)
+        if self._is_archive(format_type):
+            return self.download_manager.save(data, results_file_path)
+        return data.decode('utf-8')
+
+    def _cache_results(self, params, format_type, results):
+        if self.result_cache is not None:
+            if isinstance(results, ResultBuffer):
+                self.result_cache.put_results(params, results.getvalue())
+            elif self._is_archive(format_type):
+                with open(results, 'rb') as file:
+                    self.result_cache.put_results(params, file.read())
+            else:
+                self.result_cache.put_results(params, results.encode('utf-8'))
+        return results
+
+    @staticmethod
+    def _is_archive(format_type):
+        return format_type == 'XML2' or format_type == 'JSON2'
+
+
+def results_path(results_file_path, request_id):
+    r"""Returns results file path of the request ID, '{rid}' in results_file_path is replaced with the request ID.
+
+    :param results_file_path: Path or template
+    :param request_id: ID of requested submission
+    :return: Path
+    """
+    return results_file_path.replace('{rid}', request_id)
+
+
+def _response_size(response, stream):
+    if not stream:
+        content = getattr(response, 'content', None)
+        return len(content) if content is not None else None
+    length = getattr(response, 'headers', dict()).get('Content-Length')
+    return int(length) if length is not None and length.isdigit() else None
+
+
+def _results_size(results, is_file):
+    if isinstance(results, ResultBuffer):
+        return len(results)
+    if is_file:
+        return os.path.getsize(results)
+    return len(results.encode('utf-8'))
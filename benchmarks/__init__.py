@@ -0,0 +1,51 @@
+import timeit
+
+# Units of measurements which are better when higher, every other measurement is a time
+_THROUGHPUT_UNITS = ('jobs/min', 'MB/s')
+
+
+class Measurement:
+    __slots__ = ('name', 'value', 'unit')
+
+    def __init__(self, name, value, unit='s'):
+        r"""Single benchmark result.
+
+        :param name: Unique name of the scenario, e.g. 'client.search'
+        :param value: Measured value
+        :param unit: Unit of the value. Times are in seconds per operation.
+        """
+        self.name = name
+        self.value = value
+        self.unit = unit
+
+    @property
+    def higher_is_better(self):
+        return self.unit in _THROUGHPUT_UNITS
+
+    def change(self, previous):
+        r"""Returns relative change against previous value, positive when this measurement is worse.
+
+        :param previous: Previous value of the same scenario
+        :return: Relative change (0.1 is 10% worse)
+        """
+        if not previous:
+            return 0.0
+        change = (self.value - previous) / previous
+        return -change if self.higher_is_better else change
+
+    def to_dict(self):
+        return {'name': self.name, 'value': self.value, 'unit': self.unit}
+
+    def __repr__(self):
+        return 'Measurement(name={0}, value={1:.6g}, unit={2})'.format(self.name, self.value, self.unit)
+
+
+def best_time(function, *, number, repeat=5):
+    r"""Measures function with timeit, taking the best of repeated runs to filter out noise.
+
+    :param function: Measured function without arguments
+    :param number: Number of calls per run
+    :param repeat: Number of runs
+    :return: Seconds per call
+    """
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
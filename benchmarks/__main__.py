@@ -0,0 +1,146 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+from benchmarks import Measurement, client_benchmark, qblast_info_benchmark, results_benchmark, throughput_benchmark
+
+_RESULTS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Suite name: (full run, quick run)
+SUITES = {
+    'client': (lambda: client_benchmark.run(), lambda: client_benchmark.run(number=200)),
+    'qblast_info': (lambda: qblast_info_benchmark.measurements(), lambda: qblast_info_benchmark.measurements(20)),
+    'results': (lambda: results_benchmark.run(),
+                lambda: results_benchmark.run(query_count=5, hit_count=10, repeat=2)),
+    'throughput': (lambda: throughput_benchmark.run(), lambda: throughput_benchmark.run((1, 10, 100))),
+}
+
+
+def git_commit():
+    r"""Returns short hash of checked out commit, suffixed with '-dirty' if the working tree has local changes.
+
+    :return: Commit name or 'unknown' outside of git repository
+    """
+    try:
+        commit = _git('rev-parse', '--short', 'HEAD')
+        return commit + '-dirty' if _git('status', '--porcelain', '--untracked-files=no') else commit
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def save_results(measurements, commit, directory=_RESULTS_DIRECTORY):
+    r"""Stores measurements as <directory>/<commit>.json.
+
+    :param measurements: List of Measurement
+    :param commit: Commit name (see git_commit())
+    :param directory: Results directory
+    :return: Path to results file
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, commit + '.json')
+    with open(path, 'w') as file:
+        json.dump({'commit': commit, 'time': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                   'python': platform.python_version(), 'machine': platform.node(),
+                   'measurements': [measurement.to_dict() for measurement in measurements]}, file, indent=2)
+    return path
+
+
+def load_results(commit, directory=_RESULTS_DIRECTORY):
+    r"""Loads measurements stored for the commit.
+
+    :param commit: Commit name
+    :param directory: Results directory
+    :return: Dict of name: Measurement or None if there are no results
+    """
+    path = os.path.join(directory, commit + '.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return {entry['name']: Measurement(entry['name'], entry['value'], entry['unit'])
+                for entry in json.load(file)['measurements']}
+
+
+def previous_commit(commit, directory=_RESULTS_DIRECTORY):
+    r"""Finds the nearest ancestor of the commit with stored results.
+
+    :param commit: Commit name
+    :param directory: Results directory
+    :return: Commit name or None
+    """
+    try:
+        ancestors = _git('rev-list', '--abbrev-commit', '--max-count=200', 'HEAD').split()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    for ancestor in ancestors:
+        if ancestor != commit and os.path.exists(os.path.join(directory, ancestor + '.json')):
+            return ancestor
+    return None
+
+
+def compare(measurements, baseline, threshold):
+    r"""Prints measurements side by side with the baseline.
+
+    :param measurements: List of Measurement
+    :param baseline: Dict of name: Measurement or None
+    :param threshold: Relative change treated as regression
+    :return: List of names of regressed measurements
+    """
+    regressions = []
+    print('{0:<40} {1:>14} {2:>14} {3:>9}  {4}'.format('benchmark', 'value', 'baseline', 'change', 'unit'))
+    for measurement in measurements:
+        previous = (baseline or dict()).get(measurement.name)
+        if previous is None:
+            print('{0:<40} {1:>14.6g} {2:>14} {3:>9}  {4}'.format(measurement.name, measurement.value, '-', '-',
+                                                                  measurement.unit))
+            continue
+        change = measurement.change(previous.value)
+        flag = ''
+        if change > threshold:
+            regressions.append(measurement.name)
+            flag = '  REGRESSION'
+        print('{0:<40} {1:>14.6g} {2:>14.6g} {3:>+8.1%}  {4}{5}'.format(
+            measurement.name, measurement.value, previous.value, change, measurement.unit, flag))
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Runs client benchmarks, stores results '
+                                     'per git commit and compares them with results of the previous commit.')
+    parser.add_argument('suites', nargs='*', help='Suites to run ({0}). Default: all'.format(', '.join(SUITES)))
+    parser.add_argument('--quick', action='store_true', help='Smaller scenarios, for smoke testing')
+    parser.add_argument('--results-dir', default=_RESULTS_DIRECTORY, help='Directory of stored results')
+    parser.add_argument('--baseline', help='Commit to compare with. Default: nearest ancestor with results')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Relative change reported as regression')
+    parser.add_argument('--no-save', action='store_true', help="Don't store results")
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit with status 1 on regression')
+    arguments = parser.parse_args(arguments)
+    unknown = [suite for suite in arguments.suites if suite not in SUITES]
+    if unknown:
+        parser.error('unknown suites: ' + ', '.join(unknown))
+
+    measurements = []
+    for suite in arguments.suites or SUITES:
+        print('Running {0}...'.format(suite), file=sys.stderr)
+        measurements.extend(SUITES[suite][1 if arguments.quick else 0]())
+
+    commit = git_commit()
+    baseline_commit = arguments.baseline or previous_commit(commit, arguments.results_dir)
+    baseline = load_results(baseline_commit, arguments.results_dir) if baseline_commit else None
+    print('Commit: {0}, baseline: {1}'.format(commit, baseline_commit if baseline else 'none'))
+    regressions = compare(measurements, baseline, arguments.threshold)
+    if not arguments.no_save:
+        print('Results saved to ' + save_results(measurements, commit, arguments.results_dir))
+    return 1 if regressions and arguments.fail_on_regression else 0
+
+
+def _git(*arguments):
+    return subprocess.run(('git',) + arguments, cwd=os.path.dirname(os.path.abspath(__file__)), check=True,
+                          stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True).stdout.strip()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+from BlastApi import BlastClient
+from BlastApi.Observer.MetricsObserver import MetricsObserver
+from BlastApi.Transport import BlastTransport
+from BlastApi.Validator.BlastSearchValidator import SEARCH_SCHEMA
+from benchmarks import Measurement, best_time
+from benchmarks.qblast_info_benchmark import StreamedResponse, make_page
+
+_SUBMISSION = b'<!--\nQBlastInfoBegin\n\tRID=BENCH001\n\tRTOE=10\nQBlastInfoEnd\n-->'
+_STATUS = b'<!--\nQBlastInfoBegin\n\tStatus=READY\nQBlastInfoEnd\n-->'
+_PAGE_SIZES = (100 * 1024, 1024 * 1024)
+
+
+class StaticTransport(BlastTransport):
+    def get(self, url, params, *, stream=False, headers=None):
+        return StreamedResponse(_SUBMISSION if params['CMD'] == 'Put' else _STATUS)
+
+
+def run(number=2000):
+    r"""Measures per-call overhead of the client itself: request building, validation and QBlastInfo parsing. HTTP is
+    replaced with in-memory transport returning canned pages.
+
+    :param number: Number of calls per measurement
+    :return: List of Measurement, times in seconds per call
+    """
+    bc = BlastClient(transport=StaticTransport())
+    observed = BlastClient(transport=StaticTransport(), observer=MetricsObserver())
+    search_params = {'QUERY': 'ACGT' * 50, 'DATABASE': 'nt', 'PROGRAM': 'blastn', 'EXPECT': 10,
+                     'GAPCOSTS': '5 2', 'CMD': 'Put'}
+    search_arguments = {'self': bc, 'query': 'ACGT' * 50, 'database': 'nt', 'program': 'blastn', 'expect': 10,
+                        'gapcosts': (5, 2)}
+    results_params = {'RID': 'BENCH001', 'FORMAT_TYPE': 'XML2', 'HITLIST_SIZE': 100, 'CMD': 'Get'}
+    measurements = [
+        Measurement('client.search', best_time(
+            lambda: bc.search('ACGT' * 50, 'nt', 'blastn', expect=10, gapcosts=(5, 2)), number=number)),
+        Measurement('client.check_submission_status', best_time(
+            lambda: bc.check_submission_status('BENCH001'), number=number)),
+        Measurement('client.check_submission_status.metrics', best_time(
+            lambda: observed.check_submission_status('BENCH001'), number=number)),
+        # Building request parameters from method arguments (formerly BlastClient._get_params)
+        Measurement('client.get_params', best_time(
+            lambda: SEARCH_SCHEMA.build(search_arguments), number=number)),
+        Measurement('validator.search', best_time(
+            lambda: bc.search_validator.validate_params(search_params), number=number)),
+        Measurement('validator.results', best_time(
+            lambda: bc.result_validator.validate_params(results_params), number=number)),
+        Measurement('validator.search_many', best_time(
+            lambda: list(bc.search_validator.validate_many([search_params] * 1000)), number=max(number // 100, 5))
+            / 1000),
+    ]
+    for size in _PAGE_SIZES:
+        page = make_page(size)
+        measurements.append(Measurement('client.cropp_qblast_info.{0}kB'.format(size // 1024), best_time(
+            lambda: bc.__cropp_qblast_info__(page), number=max(number // 20, 10))))
+    bc.close()
+    observed.close()
+    return measurements
+
+
+if __name__ == '__main__':
+    for measurement in run():
+        print('{0:<36} {1:>12.2f} us'.format(measurement.name, measurement.value * 1e6))
@@ -0,0 +1,89 @@
+import re
+import timeit
+
+from BlastApi import BlastClient
+from benchmarks import Measurement
+
+_PAGE_SIZES = (10 * 1024, 100 * 1024, 1024 * 1024)
+_QBLAST_INFO = '<!--\nQBlastInfoBegin\n\tStatus=WAITING\nQBlastInfoEnd\n-->'
+
+
+class StreamedResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+def legacy_cropp_qblast_info(html):
+    search_results = re.findall('QBlastInfoBegin(.*?)QBlastInfoEnd', html, flags=re.DOTALL)
+    if search_results:
+        result_dict = dict()
+        for search_result in search_results:
+            search_result = search_result.strip()
+            entries = search_result.split("\n")
+            for entry in entries:
+                key_value_pair = entry.split('=')
+                if len(key_value_pair) > 0:
+                    key = key_value_pair[0].strip()
+                    value = None
+                    if len(key_value_pair) > 1:
+                        value = key_value_pair[1].strip()
+                    result_dict[key] = value
+        return result_dict
+    return dict()
+
+
+def make_page(size):
+    head = '<html><head><title>NCBI Blast</title></head><body>' + _QBLAST_INFO
+    return head + '<p>' + 'x' * (size - len(head) - len('<p></p></body></html>')) + '</p></body></html>'
+
+
+def run(number=200):
+    r"""Compares status parsing of whole decoded page (legacy __cropp_qblast_info__ on response.text) with streamed
+    parsing stopping at the first QBlastInfoEnd. Time of downloading skipped part of the page is not included.
+
+    :param number: Number of parsed pages per measurement
+    :return: List of (page size, legacy time, streamed time) tuples, times in seconds per page
+    """
+    bc = BlastClient()
+    results = []
+    for size in _PAGE_SIZES:
+        page = make_page(size)
+        content = page.encode('utf-8')
+
+        def legacy():
+            # Whole page is downloaded and decoded to response.text before parsing
+            return legacy_cropp_qblast_info(content.decode('utf-8'))['Status']
+
+        def streamed():
+            return bc._read_qblast_info(StreamedResponse(content), ('Status',))['Status']
+
+        assert legacy() == streamed() == 'WAITING'
+        legacy_time = min(timeit.repeat(legacy, number=number, repeat=5)) / number
+        streamed_time = min(timeit.repeat(streamed, number=number, repeat=5)) / number
+        results.append((size, legacy_time, streamed_time))
+    bc.close()
+    return results
+
+
+def measurements(number=200):
+    r"""Runs the benchmark and returns streamed parsing times.
+
+    :param number: Number of parsed pages per measurement
+    :return: List of Measurement, times in seconds per page
+    """
+    return [Measurement('qblast_info.streamed.{0}kB'.format(size // 1024), streamed_time)
+            for size, _, streamed_time in run(number)]
+
+
+if __name__ == '__main__':
+    print('{0:>12} {1:>14} {2:>14} {3:>8}'.format('page bytes', 'legacy [us]', 'streamed [us]', 'speedup'))
+    for size, legacy_time, streamed_time in run():
+        print('{0:>12} {1:>14.1f} {2:>14.1f} {3:>7.1f}x'.format(size, legacy_time * 1e6, streamed_time * 1e6,
+                                                                legacy_time / streamed_time))
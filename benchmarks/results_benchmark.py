@@ -0,0 +1,80 @@
+import os
+import tempfile
+import time
+
+from BlastApi import BlastClient
+from BlastApi.BlastReport import BlastReport
+from BlastApi.Transport.SessionTransport import SessionTransport
+from benchmarks import Measurement
+from tests.FakeBlastServer import FakeBlastServer
+
+FORMAT_TYPES = ('HTML', 'Text', 'XML2', 'JSON2', 'Tabular')
+_PARSED_FORMAT_TYPES = ('XML2', 'JSON2', 'Tabular')
+_ARCHIVE_FORMAT_TYPES = ('XML2', 'JSON2')
+
+
+def run(query_count=20, hit_count=50, repeat=5):
+    r"""Measures download and parse speed of results in every format type served by local fake Blast.cgi.
+
+    :param query_count: Number of queries in reports
+    :param hit_count: Number of hits of every query
+    :param repeat: Number of runs, the best one is reported
+    :return: List of Measurement: seconds per download and per parse, download throughput in MB/s and seconds per
+            download and parse into in-memory buffer
+    """
+    measurements = []
+    with FakeBlastServer(query_count=query_count, hit_count=hit_count, response_size=256 * 1024) as server, \
+            BlastClient(transport=SessionTransport(), endpoints=[server.url]) as bc, \
+            tempfile.TemporaryDirectory() as directory:
+        request_id, _ = bc.search('ACGT', 'nt', 'blastn')
+        for format_type in FORMAT_TYPES:
+            path = os.path.join(directory, 'results.zip')
+            download_times = []
+            parse_times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                results = bc.get_results(request_id, format_type=format_type, results_file_path=path)
+                download_times.append(time.perf_counter() - start)
+                if format_type in _PARSED_FORMAT_TYPES:
+                    start = time.perf_counter()
+                    BlastReport.read(results, format_type)
+                    parse_times.append(time.perf_counter() - start)
+
+            size = os.path.getsize(path) if results == path else len(results.encode('utf-8'))
+            name = 'results.' + format_type
+            measurements.append(Measurement(name + '.download', min(download_times)))
+            measurements.append(Measurement(name + '.download_rate', size / min(download_times) / 1e6, 'MB/s'))
+            if parse_times:
+                measurements.append(Measurement(name + '.parse', min(parse_times)))
+            if format_type in _ARCHIVE_FORMAT_TYPES:
+                measurements.append(Measurement(name + '.parse_parallel', _parallel_parse_time(path, format_type,
+                                                                                               repeat)))
+            measurements.append(Measurement(name + '.buffered', _buffered_time(bc, request_id, format_type, repeat)))
+    return measurements
+
+
+def _parallel_parse_time(path, format_type, repeat):
+    # Archive members parsed in worker processes, pool start up included
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        BlastReport.read(path, format_type, parallel=True)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _buffered_time(bc, request_id, format_type, repeat):
+    # Download (and parse) into in-memory ResultBuffer instead of results_file_path
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with bc.get_results(request_id, format_type=format_type, as_buffer=True) as buffer:
+            if format_type in _PARSED_FORMAT_TYPES:
+                BlastReport.read(buffer.getbuffer() if format_type == 'Tabular' else buffer, format_type)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == '__main__':
+    for measurement in run():
+        print('{0:<36} {1:>12.4g} {2}'.format(measurement.name, measurement.value, measurement.unit))
@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+from BlastApi.AsyncBlastClient import AsyncBlastClient
+from BlastApi.Transport.SessionTransport import SessionTransport
+from benchmarks import Measurement
+from tests.FakeBlastServer import FakeBlastServer
+
+CONCURRENCY = (1, 10, 100, 1000)
+
+
+async def _job(bc):
+    request_id, estimated_time = await bc.search('ACGT', 'nt', 'blastn')
+    return await bc.wait_for_results(request_id, estimated_time, format_type='Text')
+
+
+async def _jobs(bc, count):
+    return await asyncio.gather(*(_job(bc) for _ in range(count)))
+
+
+def run(concurrency=CONCURRENCY, *, latency=0.01, max_workers=32):
+    r"""Measures end-to-end throughput (submission, status check and results retrieval) of AsyncBlastClient with
+    many concurrent request IDs against local fake Blast.cgi answering immediately with READY status.
+
+    :param concurrency: Numbers of concurrent request IDs
+    :param latency: Server response delay in seconds
+    :param max_workers: Number of client HTTP workers and pooled connections
+    :return: List of Measurement in jobs per minute
+    """
+    measurements = []
+    for count in concurrency:
+        with FakeBlastServer(latency=latency) as server:
+            bc = AsyncBlastClient(transport=SessionTransport(pool_maxsize=max_workers), endpoints=[server.url],
+                                  max_workers=max_workers)
+            start = time.perf_counter()
+            asyncio.run(_jobs(bc, count))
+            elapsed = time.perf_counter() - start
+            bc.close()
+        measurements.append(Measurement('throughput.{0}_rids'.format(count), count / elapsed * 60, 'jobs/min'))
+    return measurements
+
+
+if __name__ == '__main__':
+    for measurement in run():
+        print('{0:<36} {1:>12.0f} {2}'.format(measurement.name, measurement.value, measurement.unit))
@@ -38,5 +38,16 @@ def example2():
     print(bc.wait_for_results(rid, format_type='XML2', estimated_time=rtoe))
 
 
+def example3():
+    rid, rtoe = bc.search("u00001", "nt", "blastn")
+    print('Request id: ' + rid)
+    bc.wait_for_results(rid, format_type='Text', estimated_time=rtoe)
+    results = bc.get_results_multi(rid, ['Tabular', 'XML2', 'Text'], results_file_path='ex3_{format_type}.zip')
+    for format_type, result in results.items():
+        print('#########################  ' + format_type + '  #########################')
+        print(result)
+
+
 example1()
 example2()
+example3()
@@ -0,0 +1,61 @@
+import asyncio
+import unittest
+
+from tests import toggle_params
+from tests.ResultsValidatorMock import ResultsValidatorMock
+from tests.SearchValidatorMock import SearchValidatorMock
+from tests.TransportMock import TransportMock
+from BlastApi.AsyncBlastClient import AsyncBlastClient
+
+
+class AsyncBlastClientTest(unittest.TestCase):
+    def setUp(self):
+        self.sv = SearchValidatorMock()
+        self.rv = ResultsValidatorMock()
+        self.bc = AsyncBlastClient(transport=TransportMock())
+        self.bc.search_validator = self.sv
+        self.bc.result_validator = self.rv
+
+    def tearDown(self):
+        self.bc.close()
+
+    def test_search(self):
+        rid, rtoe = asyncio.run(self.bc.search('test123', 'test_db', 'test_prog', gapcosts=(1, 11)))
+        self.assertEqual(rid, '1337')
+        self.assertEqual(rtoe, '17')
+        self.assertEqual(toggle_params(), {'CMD': 'Put', 'QUERY': 'test123', 'DATABASE': 'test_db',
+                                           'PROGRAM': 'test_prog', 'GAPCOSTS': '1 11'})
+        self.assertTrue(self.sv.validator_was_called())
+
+    def test_search_invalid_params(self):
+        self.bc.search_validator.validate_params = lambda params: ['error']
+        with self.assertRaises(AttributeError):
+            asyncio.run(self.bc.search('test123', 'test_db', 'test_prog'))
+
+    def test_check_status(self):
+        statuses = {asyncio.run(self.bc.check_submission_status('123')) for _ in range(2)}
+        self.assertEqual(statuses, {'WAITING', 'READY'})
+
+    def test_get_results(self):
+        content = asyncio.run(self.bc.get_results('126848', format_type='Text'))
+        self.assertEqual(content, 'Text_RESPONSE')
+        self.assertEqual(toggle_params(), {'CMD': 'Get', 'RID': '126848', 'FORMAT_TYPE': 'Text',
+                                           'RESULTS_FILE_PATH': '126848.zip'})
+        self.assertTrue(self.rv.validator_was_called())
+
+    def test_get_results_multi(self):
+        results = asyncio.run(self.bc.get_results_multi('126848', ['Text', 'Tabular']))
+        self.assertEqual(results, {'Text': 'Text_RESPONSE', 'Tabular': 'Tabular_RESPONSE'})
+        self.assertEqual(list(results), ['Text', 'Tabular'])
+
+    def test_wait_for_many_results(self):
+        async def wait_all():
+            return await asyncio.gather(*[self.bc.wait_for_results(str(rid), 0, format_type='XML')
+                                          for rid in range(100)])
+
+        results = asyncio.run(wait_all())
+        self.assertEqual(results, ['XML_RESPONSE'] * 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
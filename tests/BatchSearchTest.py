@@ -0,0 +1,119 @@
+import unittest
+
+from BlastApi.BatchSearch import BatchSearch, BatchSubmission, QueryDeduplicator, as_query, to_fasta
+from BlastApi.BlastReport import BlastReport, QueryResult
+
+_TABULAR_ROW = '{0}\tNM_1.1\t100.000\t10\t0\t0\t1\t10\t1\t10\t1e-5\t20.1\n'
+
+
+class BatchClientMock:
+    def __init__(self) -> None:
+        self.queries = []
+
+    def search(self, query, database, program, **search_params):
+        self.queries.append(query)
+        return str(len(self.queries)), '0'
+
+    def wait_for_results(self, request_id, estimated_time=2, *, format_type='HTML', results_file_path=None):
+        query_ids = [line[1:] for line in self.queries[int(request_id) - 1].splitlines() if line.startswith('>')]
+        return ''.join(_TABULAR_ROW.format(query_id) for query_id in query_ids if query_id != 'no_hits')
+
+
+class BatchSearchTest(unittest.TestCase):
+    def test_pack(self):
+        batch_search = BatchSearch(None, max_residues=10, max_sequences=3)
+        batches = list(batch_search.pack([('a', 'ACGT'), ('b', 'AC GT\n'), ('c', 'AC'), ('d', 'A' * 20), ('e', 'A'),
+                                          ('f', 'A'), ('g', 'A'), ('h', 'A')]))
+        self.assertEqual([[query_id for query_id, _ in batch] for batch in batches],
+                         [['a', 'b', 'c'], ['d'], ['e', 'f', 'g'], ['h']])
+        self.assertEqual(batches[0][1], ('b', 'ACGT'))
+        self.assertEqual(list(batch_search.pack(['ACGT']))[0], [('query_1', 'ACGT')])
+
+        with self.assertRaises(ValueError):
+            BatchSearch(None, max_sequences=0)
+
+    def test_submit(self):
+        client = BatchClientMock()
+        submissions = list(BatchSearch(client, max_sequences=2).submit([('a', 'AC'), ('b', 'GT'), ('c', 'TT')],
+                                                                       'nt', 'blastn'))
+        self.assertEqual([(s.request_id, s.query_ids) for s in submissions], [('1', ['a', 'b']), ('2', ['c'])])
+        self.assertEqual(client.queries, ['>a\nAC\n>b\nGT\n', '>c\nTT\n'])
+        self.assertEqual(to_fasta([('x', 'A')]), '>x\nA\n')
+
+    def test_demultiplex(self):
+        batch_search = BatchSearch(None)
+        submission = BatchSubmission('1', '0', ['a', 'b', 'c'])
+
+        report = BlastReport([QueryResult(query_id='Query_1', query_title='b description'),
+                              QueryResult(query_id='Query_2', query_title='a')])
+        results = batch_search.demultiplex(submission, report)
+        self.assertEqual({query_id: query and query.query_id for query_id, query in results.items()},
+                         {'a': 'Query_2', 'b': 'Query_1', 'c': None})
+
+        report = BlastReport([QueryResult(query_id='Query_{0}'.format(number)) for number in range(1, 4)])
+        results = batch_search.demultiplex(submission, report)
+        self.assertEqual({query_id: query.query_id for query_id, query in results.items()},
+                         {'a': 'Query_1', 'b': 'Query_2', 'c': 'Query_3'})
+
+        # Queries matched by ID keep their results, only the unmatched ones are matched by position
+        report = BlastReport([QueryResult(query_id='Query_1', query_title='c'), QueryResult(query_id='Query_2'),
+                              QueryResult(query_id='Query_3', query_title='a')])
+        results = batch_search.demultiplex(submission, report)
+        self.assertEqual({query_id: query.query_id for query_id, query in results.items()},
+                         {'a': 'Query_3', 'b': 'Query_2', 'c': 'Query_1'})
+
+    def test_search(self):
+        batch_search = BatchSearch(BatchClientMock(), max_sequences=2)
+        results = dict(batch_search.search([('a', 'AC'), ('no_hits', 'GT'), ('c', 'TT')], 'nt', 'blastn',
+                                           format_type='Tabular'))
+        self.assertEqual(set(results), {'a', 'no_hits', 'c'})
+        self.assertIsNone(results['no_hits'])
+        self.assertEqual(results['c'].hits[0].accession, 'NM_1.1')
+
+    def test_search_deduplicate(self):
+        client = BatchClientMock()
+        batch_search = BatchSearch(client, max_sequences=2, deduplicate=True)
+        queries = [('a', 'ACGT'), ('b', 'acgt'), ('c', 'TT'), ('d', 'AC GT\n'), ('e', 'tt')]
+        results = list(batch_search.search(queries, 'nt', 'blastn', format_type='Tabular'))
+        self.assertEqual(client.queries, ['>a\nACGT\n>c\nTT\n'])
+        self.assertEqual(sorted(query_id for query_id, _ in results), ['a', 'b', 'c', 'd', 'e'])
+        results = dict(results)
+        self.assertIs(results['b'], results['a'])
+        self.assertIs(results['d'], results['a'])
+        self.assertIs(results['e'], results['c'])
+        self.assertEqual(results['a'].hits[0].accession, 'NM_1.1')
+
+
+class QueryDeduplicatorTest(unittest.TestCase):
+    def test_key(self):
+        deduplicator = QueryDeduplicator('nt', 'blastn', expect=10)
+        self.assertEqual(deduplicator.key('ACGT'), deduplicator.key(' acg\nt '))
+        self.assertNotEqual(deduplicator.key('ACGT'), deduplicator.key('ACGA'))
+        self.assertNotEqual(deduplicator.key('ACGT'), QueryDeduplicator('nt', 'blastn', expect=1).key('ACGT'))
+        self.assertNotEqual(deduplicator.key('ACGT'), QueryDeduplicator('nr', 'blastn', expect=10).key('ACGT'))
+        self.assertEqual(deduplicator.key('ACGT'), QueryDeduplicator('nt', 'blastn', expect=10).key('ACGT'))
+
+    def test_unique(self):
+        deduplicator = QueryDeduplicator('nt', 'blastn')
+        unique = list(deduplicator.unique(['ACGT', ('x', 'acgt'), ('y', 'TT'), 'TT']))
+        self.assertEqual(unique, [('query_1', 'ACGT'), ('y', 'TT')])
+        self.assertEqual((deduplicator.query_count, deduplicator.unique_count), (4, 2))
+        self.assertEqual(deduplicator.duplicates('query_1'), ['query_1', 'x'])
+        self.assertEqual(deduplicator.duplicates('y'), ['y', 'query_4'])
+        self.assertEqual(list(deduplicator.fan_out([('y', 1), ('query_1', 2)])),
+                         [('y', 1), ('query_4', 1), ('query_1', 2), ('x', 2)])
+        self.assertEqual(as_query('A', 3), ('query_3', 'A'))
+
+    def test_duplicate_query_ids(self):
+        deduplicator = QueryDeduplicator('nt', 'blastn')
+        self.assertEqual(deduplicator.add('x', 'ACGT'), 'x')
+        with self.assertRaises(ValueError):
+            deduplicator.add('x', 'ACGT')
+        with self.assertRaises(ValueError):
+            list(deduplicator.unique([('y', 'TT'), ('y', 'TT')]))
+        self.assertEqual(deduplicator.duplicates('x'), ['x'])
+        self.assertEqual((deduplicator.query_count, deduplicator.unique_count), (2, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
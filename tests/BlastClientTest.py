@@ -1,20 +1,24 @@
-import sys
+import concurrent.futures
+import os
+import tempfile
 import unittest
+import zipfile
 
 import time
 
-from tests import toggle_params
-
-sys.modules['requests'] = __import__('tests.__init__')
+from tests import toggle_params, Response
 from tests.ResultsValidatorMock import ResultsValidatorMock
 from tests.SearchValidatorMock import SearchValidatorMock
+from tests.TransportMock import TransportMock
 from BlastApi import BlastClient
+from BlastApi.Transport.SessionTransport import SessionTransport
+from tests.FakeBlastServer import FakeBlastServer
 
 
 class BlastClientTest(unittest.TestCase):
     sv = SearchValidatorMock()
     rv = ResultsValidatorMock()
-    bc = BlastClient()
+    bc = BlastClient(transport=TransportMock())
     bc.search_validator = sv
     bc.result_validator = rv
 
@@ -96,7 +100,7 @@ class BlastClientTest(unittest.TestCase):
         self.bc.get_results('15468')
         passed_results_params = toggle_params()
         expected_results_params = {'CMD': 'Get', 'RID': '15468', 'FORMAT_TYPE': 'HTML',
-                                   'RESULTS_FILE_PATH': 'results.zip'}
+                                   'RESULTS_FILE_PATH': '15468.zip'}
         self.assertEqual(passed_results_params, expected_results_params)
         self.assertTrue(self.rv.validator_was_called())
 
@@ -124,6 +128,42 @@ class BlastClientTest(unittest.TestCase):
         content = self.bc.get_results('126848', format_type='Tabular')
         self.assertEqual(content, 'Tabular_RESPONSE')
 
+    def test_get_results_multi(self):
+        self.bc.transport.requests.clear()
+        results = self.bc.get_results_multi('126848', ['Tabular', 'Text', 'HTML', 'Text'], hitlist_size=10)
+        self.assertEqual(list(results.items()), [('Tabular', 'Tabular_RESPONSE'), ('Text', 'Text_RESPONSE'),
+                                                 ('HTML', 'HTML_RESPONSE')])
+        self.assertTrue(self.rv.validator_was_called())
+        self.assertEqual(sorted(self.bc.transport.requests, key=lambda params: params['FORMAT_TYPE']), [
+            {'CMD': 'Get', 'RID': '126848', 'FORMAT_TYPE': format_type, 'HITLIST_SIZE': 10,
+             'RESULTS_FILE_PATH': '126848_{0}.zip'.format(format_type)} for format_type in ('HTML', 'Tabular', 'Text')])
+
+        self.assertRaises(ValueError, self.bc.get_results_multi, '126848', [])
+        self.assertEqual(self.bc._multi_results_params({'RID': '1'}, ['XML2', 'JSON2'], {'XML2': 'a.zip'})[1][2],
+                         '1_JSON2.zip')
+        # Both archives to the same path would overwrite each other
+        self.assertRaises(ValueError, self.bc._multi_results_params, {'RID': '1'}, ['XML2', 'JSON2'], 'results.zip')
+        self.assertRaises(ValueError, self.bc._multi_results_params, {'RID': '1'}, ['XML2', 'JSON2'],
+                          {'XML2': 'a.zip', 'JSON2': 'a.zip'})
+        self.assertEqual(self.bc._multi_results_params({'RID': '1'}, ['XML2', 'Text'], 'r{0}{x}.zip')[0][2],
+                         'r{0}{x}.zip')
+        retrievals = self.bc._multi_results_params({'RID': '1'}, ['XML2', 'JSON2'], '{rid}-{format_type}.zip')
+        self.assertEqual([path for _, _, path in retrievals], ['1-XML2.zip', '1-JSON2.zip'])
+        self.assertTrue(self.rv.validator_was_called())
+
+    def test_results_buffer(self):
+        self.bc.transport.requests.clear()
+        with self.bc.get_results('126848', format_type='Tabular', as_buffer=True) as buffer:
+            self.assertEqual(buffer.read(), b'Tabular_RESPONSE')
+            self.assertEqual(bytes(buffer.getbuffer()), b'Tabular_RESPONSE')
+        self.assertNotIn('RESULTS_FILE_PATH', self.bc.transport.requests[-1])
+
+        results = self.bc.get_results_multi('126848', ['Text', 'HTML'], as_buffer=True)
+        self.assertEqual({format_type: buffer.text() for format_type, buffer in results.items()},
+                         {'Text': 'Text_RESPONSE', 'HTML': 'HTML_RESPONSE'})
+        self.assertTrue(all('RESULTS_FILE_PATH' not in params for params in self.bc.transport.requests))
+        self.assertTrue(self.rv.validator_was_called())
+
     def test_check_status(self):
         response = self.bc.check_submission_status('123')
         self.assertEqual(response, 'WAITING')
@@ -148,5 +188,62 @@ class BlastClientTest(unittest.TestCase):
         self.assertTrue((stop - start) >= 23)
         self.assertEqual(content, 'JSON_RESPONSE')
 
+    def test_streamed_qblast_info(self):
+        page = '<html><!--\nQBlastInfoBegin\n\tStatus=READY\nQBlastInfoEnd\n-->' + 'x' * 100000 + \
+               '<!--\nQBlastInfoBegin\n\tThereAreHits=yes\nQBlastInfoEnd\n--></html>'
+        chunks = []
+        response = self._recording_response(page, chunks)
+        self.assertEqual(self.bc._read_qblast_info(response, ('Status',)), {'Status': 'READY'})
+        self.assertTrue(response.closed)
+        self.assertLess(len(b''.join(chunks)), 10000)
+
+        chunks = []
+        response = self._recording_response(page, chunks)
+        self.assertEqual(self.bc._read_qblast_info(response, ('Status', 'ThereAreHits')),
+                         {'Status': 'READY', 'ThereAreHits': 'yes'})
+        self.assertEqual(b''.join(chunks), page.encode('utf-8'))
+
+        response = Response('QBlastInfoBegin\n\tRID=1337\n\tRTOE=17\nQBlastInfoEnd' + 'x' * 100000)
+        self.assertEqual(self.bc._read_qblast_info(response, ('RID', 'RTOE')), {'RID': '1337', 'RTOE': '17'})
+        self.assertEqual(self.bc.__cropp_qblast_info__(page), {'Status': 'READY', 'ThereAreHits': 'yes'})
+
+    @staticmethod
+    def _recording_response(text, chunks):
+        response = Response(text)
+        response.iter_content = lambda chunk_size: (chunks.append(chunk) or chunk
+                                                    for chunk in Response.iter_content(response, chunk_size))
+        return response
+
+    def test_close(self):
+        transport = TransportMock()
+        with BlastClient(transport=transport) as bc:
+            self.assertFalse(transport.closed)
+            self.assertIs(bc.transport, transport)
+        self.assertTrue(transport.closed)
+
+    def test_failed_submission(self):
+        transport = TransportMock()
+        transport.get = lambda url, params, stream=False, headers=None: Response('<p>Error: query is empty</p>')
+        bc = BlastClient(transport=transport)
+        with self.assertRaisesRegex(ValueError, 'no request ID'):
+            bc.search('ACGT', 'nt', 'blastn')
+
+    def test_concurrent_downloads(self):
+        with FakeBlastServer(query_count=1) as server, tempfile.TemporaryDirectory() as directory, \
+                BlastClient(transport=SessionTransport(), endpoints=[server.url]) as bc:
+            request_ids = [bc.search('ACGT', 'nt', 'blastn')[0] for _ in range(4)]
+            cwd = os.getcwd()
+            os.chdir(directory)
+            try:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+                    paths = list(executor.map(lambda request_id: bc.get_results(request_id, format_type='XML2'),
+                                              request_ids))
+                self.assertEqual(paths, [request_id + '.zip' for request_id in request_ids])
+                for request_id, path in zip(request_ids, paths):
+                    with zipfile.ZipFile(path) as archive:
+                        self.assertIn(request_id + '.xml', archive.namelist())
+            finally:
+                os.chdir(cwd)
+
     if __name__ == '__main__':
         unittest.main()
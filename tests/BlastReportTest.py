@@ -0,0 +1,123 @@
+import io
+import unittest
+
+from BlastApi.BlastReport import BlastReport, Hsp, Hit, QueryResult
+from tests.Parser.TabularParserTest import _REPORT as _TABULAR_REPORT
+from tests.ReportFixtures import make_queries, json2_archive, xml2_archive
+
+_XML_REPORT = """<?xml version="1.0"?>
+<!DOCTYPE BlastOutput PUBLIC "-//NCBI//NCBI BlastOutput/EN" "http://www.ncbi.nlm.nih.gov/dtd/NCBI_BlastOutput.dtd">
+<BlastOutput>
+  <BlastOutput_program>blastn</BlastOutput_program>
+  <BlastOutput_db>nt</BlastOutput_db>
+  <BlastOutput_iterations>
+    <Iteration>
+      <Iteration_iter-num>1</Iteration_iter-num>
+      <Iteration_query-ID>Query_1</Iteration_query-ID>
+      <Iteration_query-def>seq1 test sequence</Iteration_query-def>
+      <Iteration_query-len>12</Iteration_query-len>
+      <Iteration_hits>
+        <Hit>
+          <Hit_num>1</Hit_num>
+          <Hit_id>gi|1|ref|NM_1.1|</Hit_id>
+          <Hit_def>Hit 1 of query 1</Hit_def>
+          <Hit_accession>NM_1</Hit_accession>
+          <Hit_len>1001</Hit_len>
+          <Hit_hsps>
+            <Hsp>
+              <Hsp_num>1</Hsp_num>
+              <Hsp_bit-score>24.308</Hsp_bit-score>
+              <Hsp_score>12</Hsp_score>
+              <Hsp_evalue>0.5</Hsp_evalue>
+              <Hsp_query-from>1</Hsp_query-from>
+              <Hsp_query-to>12</Hsp_query-to>
+              <Hsp_hit-from>100</Hsp_hit-from>
+              <Hsp_hit-to>111</Hsp_hit-to>
+              <Hsp_query-frame>1</Hsp_query-frame>
+              <Hsp_hit-frame>-1</Hsp_hit-frame>
+              <Hsp_identity>11</Hsp_identity>
+              <Hsp_positive>11</Hsp_positive>
+              <Hsp_gaps>0</Hsp_gaps>
+              <Hsp_align-len>12</Hsp_align-len>
+              <Hsp_qseq>ACGTACGTACGT</Hsp_qseq>
+              <Hsp_hseq>ACGTACGAACGT</Hsp_hseq>
+              <Hsp_midline>||||||| ||||</Hsp_midline>
+            </Hsp>
+          </Hit_hsps>
+        </Hit>
+      </Iteration_hits>
+    </Iteration>
+    <Iteration>
+      <Iteration_iter-num>2</Iteration_iter-num>
+      <Iteration_query-ID>Query_2</Iteration_query-ID>
+      <Iteration_query-def>seq2 test sequence</Iteration_query-def>
+      <Iteration_query-len>20</Iteration_query-len>
+      <Iteration_hits></Iteration_hits>
+      <Iteration_message>No hits found</Iteration_message>
+    </Iteration>
+  </BlastOutput_iterations>
+</BlastOutput>
+"""
+
+
+class BlastReportTest(unittest.TestCase):
+    queries = make_queries(query_count=2, hit_count=3, hsp_count=2)
+
+    def _assert_matches_fixture(self, report):
+        self.assertEqual(len(report), 2)
+        for query_result, query in zip(report, self.queries):
+            self.assertEqual(query_result.query_id, query['query_id'])
+            self.assertEqual(query_result.query_title, query['query_title'])
+            self.assertEqual(query_result.query_len, query['query_len'])
+            self.assertEqual(len(query_result.hits), len(query['hits']))
+            for hit, expected_hit in zip(query_result.hits, query['hits']):
+                self.assertEqual(hit.accession, expected_hit['description'][0]['accession'])
+                self.assertEqual(hit.taxid, 9606)
+                self.assertEqual(hit.len, expected_hit['len'])
+                for hsp, expected_hsp in zip(hit.hsps, expected_hit['hsps']):
+                    for field in ('num', 'bit_score', 'score', 'evalue', 'identity', 'query_from', 'hit_to',
+                                  'hit_strand', 'qseq', 'hseq', 'midline'):
+                        self.assertEqual(getattr(hsp, field), expected_hsp[field])
+
+    def test_from_archive(self):
+        self._assert_matches_fixture(BlastReport.read(io.BytesIO(xml2_archive('RID', self.queries)), 'XML2'))
+        self._assert_matches_fixture(BlastReport.read(io.BytesIO(json2_archive('RID', self.queries)), 'JSON2'))
+
+    def test_from_xml(self):
+        report = BlastReport.read(_XML_REPORT, 'XML')
+        self.assertEqual([query.query_id for query in report], ['Query_1', 'Query_2'])
+        self.assertEqual(report.queries[1].hits, [])
+        hit = report.queries[0].hits[0]
+        self.assertEqual((hit.id, hit.title, hit.accession, hit.len), ('gi|1|ref|NM_1.1|', 'Hit 1 of query 1', 'NM_1',
+                                                                       1001))
+        hsp = hit.hsps[0]
+        self.assertEqual((hsp.bit_score, hsp.evalue, hsp.hit_frame, hsp.align_len), (24.308, 0.5, -1, 12))
+        self.assertEqual(hsp.midline, '||||||| ||||')
+        self.assertAlmostEqual(hsp.percent_identity, 100 * 11 / 12)
+        self.assertEqual(len(BlastReport.from_xml(_XML_REPORT.encode('utf-8'))), 2)
+
+    def test_from_tabular(self):
+        report = BlastReport.read(_TABULAR_REPORT, 'Tabular')
+        self.assertEqual([query.query_id for query in report], ['seq1', 'seq2'])
+        self.assertEqual([hit.accession for hit in report.queries[0].hits], ['NM_1.1', 'NM_2.1'])
+        hsp = report.queries[1].hits[0].hsps[0]
+        self.assertEqual((hsp.query_from, hsp.query_to, hsp.hit_from, hsp.hit_to), (2, 50, 1, 49))
+        self.assertEqual(hsp.identity, 45)
+        self.assertAlmostEqual(hsp.percent_identity, 91.837, places=3)
+        self.assertIsNone(hsp.qseq)
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            BlastReport.read('results', 'HTML')
+
+    def test_compact_objects(self):
+        hsp = Hsp(num=1, qseq='ACGT', hseq='ACG-', midline='||| ')
+        for value in (hsp, Hit(), QueryResult(), BlastReport()):
+            self.assertFalse(hasattr(value, '__dict__'))
+        self.assertIsInstance(hsp._alignment, bytes)
+        self.assertEqual((hsp.qseq, hsp.hseq, hsp.midline), ('ACGT', 'ACG-', '||| '))
+        self.assertIsNone(Hsp().qseq)
+
+
+if __name__ == '__main__':
+    unittest.main()
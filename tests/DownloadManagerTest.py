@@ -0,0 +1,140 @@
+import concurrent.futures
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+
+from BlastApi import BlastClient
+from BlastApi.BlastReport import BlastReport
+from BlastApi.DownloadManager import DownloadManager, verify_archive
+from BlastApi.Transport.SessionTransport import SessionTransport
+from tests.FakeBlastServer import FakeBlastServer
+
+
+class DownloadManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'results.zip')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def download(self, server, download_manager, format_type='XML2'):
+        with BlastClient(transport=SessionTransport(), endpoints=[server.url],
+                         download_manager=download_manager) as bc:
+            request_id, _ = bc.search('ACGT', 'nt', 'blastn')
+            return bc.get_results(request_id, format_type=format_type, results_file_path=self.path)
+
+    def assertCompleteArchive(self, path, format_type='XML2', query_count=2):
+        self.assertEqual(len(BlastReport.read(path, format_type)), query_count)
+        self.assertEqual(os.listdir(self.directory.name), ['results.zip'])
+
+    def test_download(self):
+        with FakeBlastServer() as server:
+            self.assertEqual(self.download(server, DownloadManager()), self.path)
+            self.assertCompleteArchive(self.path)
+            self.assertEqual(server.range_requests, 0)
+
+    def test_resume(self):
+        with FakeBlastServer(drop_after=500, drops=2) as server:
+            self.download(server, DownloadManager(chunk_size=100), 'JSON2')
+            self.assertCompleteArchive(self.path, 'JSON2')
+            self.assertEqual(server.range_requests, 2)
+
+    def test_restart_without_ranges(self):
+        with FakeBlastServer(ranges=False, drop_after=500, drops=1) as server:
+            self.download(server, DownloadManager(chunk_size=100))
+            self.assertCompleteArchive(self.path)
+            self.assertEqual(server.requests['Get'], 2)
+            self.assertEqual(server.range_requests, 0)
+
+    def test_too_many_drops(self):
+        with FakeBlastServer(drop_after=500, drops=3) as server:
+            with self.assertRaises(OSError):
+                self.download(server, DownloadManager(max_resumes=1))
+            self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_parallel_parts(self):
+        with FakeBlastServer(query_count=20, hit_count=10) as server:
+            self.download(server, DownloadManager(parallel_parts=4, min_part_size=1024))
+            self.assertCompleteArchive(self.path, query_count=20)
+            self.assertEqual(server.range_requests, 3)
+
+    def test_parallel_parts_resume(self):
+        with FakeBlastServer(query_count=20, hit_count=10, drop_after=200, drops=3) as server:
+            self.download(server, DownloadManager(parallel_parts=4, min_part_size=1024))
+            self.assertCompleteArchive(self.path, query_count=20)
+            self.assertEqual(server.range_requests, 6)
+
+    def test_parts(self):
+        download_manager = DownloadManager(parallel_parts=4, min_part_size=100)
+        self.assertEqual(download_manager._parts(99), [(0, 99)])
+        self.assertEqual(download_manager._parts(250), [(0, 125), (125, 250)])
+        self.assertEqual(download_manager._parts(1000), [(0, 250), (250, 500), (500, 750), (750, 1000)])
+        self.assertEqual(DownloadManager(parallel_parts=1)._parts(10 ** 9), [(0, 10 ** 9)])
+
+    def test_invalid_archive(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'PK\x03\x04 truncated')
+        with self.assertRaises(ValueError):
+            verify_archive(self.path)
+
+        data = io.BytesIO()
+        with zipfile.ZipFile(data, 'w') as archive:
+            archive.writestr('member.xml', 'content' * 10)
+        corrupted = data.getvalue().replace(b'content', b'CONTENT', 1)
+        with open(self.path, 'wb') as file:
+            file.write(corrupted)
+        with self.assertRaises(ValueError):
+            verify_archive(self.path)
+
+    def test_failed_verification(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'previous results')
+        download_manager = DownloadManager()
+        with self.assertRaises(ValueError):
+            download_manager.download(lambda headers: _Response(b'not an archive'), self.path)
+        with open(self.path, 'rb') as file:
+            self.assertEqual(file.read(), b'previous results')
+        self.assertEqual(os.listdir(self.directory.name), ['results.zip'])
+
+    def test_save(self):
+        self.assertEqual(DownloadManager().save(b'archive', self.path), self.path)
+        with open(self.path, 'rb') as file:
+            self.assertEqual(file.read(), b'archive')
+        self.assertEqual(os.listdir(self.directory.name), ['results.zip'])
+
+    def test_concurrent_downloads(self):
+        archives = []
+        for query_count in range(1, 9):
+            data = io.BytesIO()
+            with zipfile.ZipFile(data, 'w') as archive:
+                archive.writestr('member.xml', 'query' * 10000 * query_count)
+            archives.append(data.getvalue())
+
+        download_manager = DownloadManager(chunk_size=1024)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda archive: download_manager.download(lambda headers: _Response(archive), self.path),
+                              archives))
+        with open(self.path, 'rb') as file:
+            self.assertIn(file.read(), archives)
+        self.assertEqual(os.listdir(self.directory.name), ['results.zip'])
+
+
+class _Response:
+    def __init__(self, content):
+        self.content = content
+        self.status_code = 200
+        self.headers = {'Content-Length': str(len(content))}
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
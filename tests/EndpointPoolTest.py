@@ -0,0 +1,119 @@
+import itertools
+import time
+import unittest
+
+import tests
+from BlastApi import BlastClient
+from BlastApi.EndpointPool import Endpoint, EndpointPool
+from tests.ResultsValidatorMock import ResultsValidatorMock
+from tests.SearchValidatorMock import SearchValidatorMock
+from tests.TransportMock import TransportMock
+
+
+class MultiEndpointTransportMock(TransportMock):
+    def __init__(self, failing=()) -> None:
+        super().__init__()
+        self.failing = set(failing)
+        self._request_ids = itertools.count(1)
+
+    def get(self, url, params, *, stream=False, headers=None):
+        self.requests.append(dict(params))
+        self.urls.append(url)
+        if url in self.failing:
+            raise ConnectionError(url)
+        if params['CMD'] == 'Put':
+            return tests.Response('QBlastInfoBegin\nRID={0}-{1}\nRTOE=5\nQBlastInfoEnd'.format(
+                url, next(self._request_ids)))
+        return tests.get(url, params)
+
+
+class EndpointPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.transport = MultiEndpointTransportMock()
+        self.bc = BlastClient(transport=self.transport, endpoints=[('a', 1), ('b', 2)])
+        self.bc.search_validator = SearchValidatorMock()
+        self.bc.result_validator = ResultsValidatorMock()
+
+    def test_endpoints(self):
+        pool = EndpointPool(['a', ('b', 3), Endpoint('c', 0.5)])
+        self.assertEqual([(endpoint.url, endpoint.weight) for endpoint in pool.endpoints],
+                         [('a', 1), ('b', 3), ('c', 0.5)])
+        self.assertRaises(ValueError, EndpointPool, [])
+        self.assertRaises(ValueError, Endpoint, 'a', 0)
+
+    def test_weighted_least_loaded(self):
+        request_ids = [self.bc.search('query', 'nt', 'blastn')[0] for _ in range(6)]
+        self.assertEqual(sorted(url[0] for url in request_ids), ['a', 'a', 'b', 'b', 'b', 'b'])
+        self.assertEqual([endpoint.searches for endpoint in self.bc.endpoints.endpoints], [2, 4])
+        self.assertEqual([endpoint.in_flight for endpoint in self.bc.endpoints.endpoints], [0, 0])
+
+    def test_request_id_stickiness(self):
+        request_ids = [self.bc.search('query', 'nt', 'blastn')[0] for _ in range(3)]
+        for request_id in request_ids:
+            self.transport.urls.clear()
+            self.bc.check_submission_status(request_id)
+            self.bc.get_results(request_id)
+            self.bc.get_results(request_id, format_type='Text')
+            self.assertEqual(self.transport.urls, [request_id[0]] * 3)
+            self.assertEqual(self.bc.endpoints.endpoint_of(request_id).url, request_id[0])
+        self.assertEqual([endpoint.searches for endpoint in self.bc.endpoints.endpoints], [0, 0])
+
+    def test_forget_oldest_request_ids(self):
+        pool = EndpointPool(['a', 'b'], max_request_ids=2)
+        for request_id in '123':
+            pool.bind(request_id, pool.endpoints[0])
+        pool.finish('2')
+        self.assertIsNone(pool.endpoint_of('1'))
+        self.assertIs(pool.endpoint_of('2'), pool.endpoints[0])
+        self.assertEqual(pool.endpoints[0].searches, 1)
+        pool.bind('3', pool.endpoints[1])
+        self.assertEqual([endpoint.searches for endpoint in pool.endpoints], [0, 1])
+
+    def test_unknown_request_id(self):
+        pool = EndpointPool(['a', 'b'])
+        # Forgotten request ID isn't sent to an endpoint which didn't issue it
+        self.assertRaises(ValueError, pool.select, '1')
+        self.assertEqual([endpoint.in_flight for endpoint in pool.endpoints], [0, 0])
+        self.assertIs(pool.find('b'), pool.endpoints[1])
+        self.assertIsNone(pool.find('c'))
+
+        pool = EndpointPool(['a'])
+        self.assertIs(pool.select('1'), pool.endpoints[0])
+
+    def test_ejection(self):
+        pool = EndpointPool(['a', 'b'], max_failures=2, eject_time=0.2)
+        bc = BlastClient(transport=MultiEndpointTransportMock(failing=['a']), endpoints=pool)
+        bc.search_validator = SearchValidatorMock()
+
+        failures = 0
+        request_ids = []
+        for _ in range(6):
+            try:
+                request_ids.append(bc.search('query', 'nt', 'blastn')[0])
+            except ConnectionError:
+                failures += 1
+        self.assertEqual(failures, 2)
+        self.assertTrue(all(request_id.startswith('b') for request_id in request_ids))
+        self.assertFalse(pool.endpoints[0].is_healthy())
+
+        time.sleep(0.25)
+        self.assertTrue(pool.endpoints[0].is_healthy())
+        self.assertIs(pool.select(), pool.endpoints[0])
+
+    def test_all_ejected(self):
+        pool = EndpointPool(['a', 'b'], max_failures=1, eject_time=60)
+        for endpoint in pool.endpoints:
+            pool.release_request(pool.select(), failed=True)
+        pool.endpoints[1].ejected_until -= 1
+        self.assertIs(pool.select(), pool.endpoints[1])
+
+    def test_default_endpoint(self):
+        transport = TransportMock()
+        bc = BlastClient(transport=transport)
+        bc.check_submission_status('1337')
+        self.assertIsNone(bc.endpoints)
+        self.assertEqual(transport.urls, ['https://blast.ncbi.nlm.nih.gov/Blast.cgi'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,221 @@
+import http.server
+import itertools
+import random
+import sys
+import threading
+import time
+import urllib.parse
+
+from tests.ReportFixtures import json2_archive, make_queries, tabular_report, xml2_archive
+
+_QBLAST_INFO = '<!--\nQBlastInfoBegin\n{0}\nQBlastInfoEnd\n-->\n'
+_PAGE = '<!DOCTYPE html>\n<html><head><title>NCBI Blast</title></head><body>\n{0}{1}</body></html>\n'
+_PADDING_LINE = '<p>' + 'x' * 76 + '</p>\n'
+
+
+class FakeBlastServer:
+    def __init__(self, *, rtoe=0, queue_delay=0.0, failure_rate=0.0, response_size=0, latency=0.0, query_count=2,
+                 hit_count=3, hsp_count=2, ranges=True, drop_after=None, drops=0, stall_rate=0.0, stall_time=0.0,
+                 request_id_prefix='FAKE', seed=None):
+        r"""Local HTTP server emulating Blast.cgi (CMD=Put, CMD=Get with SearchInfo and report formatting). Used as
+        realistic offline target of throughput and latency tests, the whole network stack of the client is exercised.
+
+        :param rtoe: RTOE returned for submissions
+        :param queue_delay: Number of seconds after submission the search stays 'WAITING'
+        :param failure_rate: Fraction of requests answered with '503 Service Unavailable'
+        :param response_size: Minimal size in bytes of HTML pages (submission, status and HTML/Text reports)
+        :param latency: Number of seconds every response is delayed
+        :param query_count: Number of queries in reports
+        :param hit_count: Number of hits of every query
+        :param hsp_count: Number of HSPs of every hit
+        :param ranges: If True, Range requests of archives are supported
+        :param drop_after: Number of bytes of archive sent before the connection is dropped
+        :param drops: Number of archive responses which are dropped after drop_after bytes
+        :param stall_rate: Fraction of requests delayed by stall_time (e.g. to emulate tail latency)
+        :param stall_time: Number of seconds stalled requests are delayed
+        :param request_id_prefix: Prefix of issued request IDs (e.g. to tell several servers apart)
+        :param seed: Seed of failures and stalls generator
+        """
+        self.rtoe = rtoe
+        self.queue_delay = queue_delay
+        self.failure_rate = failure_rate
+        self.response_size = response_size
+        self.latency = latency
+        self.ranges = ranges
+        self.drop_after = drop_after
+        self.drops = drops
+        self.range_requests = 0
+        self.stall_rate = stall_rate
+        self.stall_time = stall_time
+        self.stalls = 0
+        self.request_id_prefix = request_id_prefix
+        self.queries = make_queries(query_count, hit_count, hsp_count)
+        self.requests = {'Put': 0, 'SearchInfo': 0, 'Get': 0}
+        self.failures = 0
+        self.connections = 0
+        self._submissions = dict()
+        self._reports = dict()
+        self._request_ids = itertools.count(1)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _HTTPServer(('127.0.0.1', 0), _handler(self))
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return 'http://{0}:{1}/Blast.cgi'.format(host, port)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='FakeBlastServer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def respond(self, params):
+        r"""Builds response to Blast.cgi request.
+
+        :param params: Dict of query string parameters
+        :return: Tuple of status code, content type and body
+        """
+        command = params.get('CMD')
+        with self._lock:
+            key = 'SearchInfo' if params.get('FORMAT_OBJECT') == 'SearchInfo' else command
+            if key in self.requests:
+                self.requests[key] += 1
+            if self.failure_rate and self._random.random() < self.failure_rate:
+                self.failures += 1
+                return 503, 'text/html', b'Service Unavailable'
+
+        if command == 'Put':
+            return self._page(self._submit())
+        if command != 'Get':
+            return 400, 'text/html', b'Invalid CMD'
+
+        status = self._status(params.get('RID'))
+        if params.get('FORMAT_OBJECT') == 'SearchInfo' or status != 'READY':
+            return self._page('Status={0}'.format(status))
+        return self._report(params['RID'], params.get('FORMAT_TYPE', 'HTML'))
+
+    def _submit(self):
+        with self._lock:
+            request_id = '{0}{1:08d}'.format(self.request_id_prefix, next(self._request_ids))
+            self._submissions[request_id] = time.monotonic()
+        return 'RID={0}\nRTOE={1}'.format(request_id, self.rtoe)
+
+    def _status(self, request_id):
+        with self._lock:
+            submitted = self._submissions.get(request_id)
+        if submitted is None:
+            return 'UNKNOWN'
+        return 'READY' if time.monotonic() - submitted >= self.queue_delay else 'WAITING'
+
+    def _report(self, request_id, format_type):
+        with self._lock:
+            report = self._reports.get((request_id, format_type))
+        if report is not None:
+            return report
+        if format_type == 'XML2':
+            report = 200, 'application/zip', xml2_archive(request_id, self.queries)
+        elif format_type == 'JSON2':
+            report = 200, 'application/zip', json2_archive(request_id, self.queries)
+        elif format_type == 'Tabular':
+            report = 200, 'text/plain', tabular_report(request_id, self.queries).encode('utf-8')
+        else:
+            report = self._page('', format_type + '_RESPONSE\n')
+        with self._lock:
+            self._reports[(request_id, format_type)] = report
+        return report
+
+    def _page(self, qblast_info, content=''):
+        qblast_info = _QBLAST_INFO.format(qblast_info) if qblast_info else ''
+        missing = self.response_size - len(_PAGE.format(qblast_info, content))
+        if missing > 0:
+            content += _PADDING_LINE * (missing // len(_PADDING_LINE) + 1)
+        return 200, 'text/html', _PAGE.format(qblast_info, content).encode('utf-8')
+
+    def _stall(self):
+        with self._lock:
+            if not self.stall_rate or self._random.random() >= self.stall_rate:
+                return False
+            self.stalls += 1
+            return True
+
+
+class _HTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients stop reading pages as soon as QBlastInfo is found and drop the connection
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def _handler(server):
+    class BlastHandler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body are written separately, small bodies would wait for delayed ACK otherwise
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            with server._lock:
+                server.connections += 1
+
+        def do_GET(self):
+            url = urllib.parse.urlsplit(self.path)
+            params = dict(urllib.parse.parse_qsl(url.query))
+            if server.latency:
+                time.sleep(server.latency)
+            if server._stall():
+                time.sleep(server.stall_time)
+            status, content_type, body = server.respond(params)
+            archive = content_type == 'application/zip'
+            content_range = None
+            if archive and server.ranges and self.headers.get('Range'):
+                start, end = _parse_range(self.headers['Range'], len(body))
+                status, content_range = 206, 'bytes {0}-{1}/{2}'.format(start, end - 1, len(body))
+                body = body[start:end]
+                with server._lock:
+                    server.range_requests += 1
+
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            if archive and server.ranges:
+                self.send_header('Accept-Ranges', 'bytes')
+            if content_range is not None:
+                self.send_header('Content-Range', content_range)
+            self.end_headers()
+            if archive and self._drop():
+                self.wfile.write(body[:server.drop_after])
+                self.close_connection = True
+                return
+            self.wfile.write(body)
+
+        def _drop(self):
+            with server._lock:
+                if server.drop_after is None or server.drops <= 0:
+                    return False
+                server.drops -= 1
+                return True
+
+        def log_message(self, format, *args):
+            pass
+
+    return BlastHandler
+
+
+def _parse_range(header, size):
+    start, _, end = header.partition('=')[2].partition('-')
+    return int(start), min(int(end) + 1, size) if end else size
@@ -0,0 +1,115 @@
+import concurrent.futures
+import os
+import tempfile
+import time
+import unittest
+
+import requests
+
+from BlastApi import BlastClient
+from BlastApi.BlastReport import BlastReport
+from BlastApi.DownloadManager import DownloadManager
+from BlastApi.Transport.SessionTransport import SessionTransport
+from tests.FakeBlastServer import FakeBlastServer
+
+
+class FakeBlastServerTest(unittest.TestCase):
+    def test_search_round_trip(self):
+        with FakeBlastServer(rtoe=7, queue_delay=0.3) as server, \
+                BlastClient(transport=SessionTransport(), endpoints=[server.url]) as bc:
+            request_id, estimated_time = bc.search('ACGT', 'nt', 'blastn')
+            self.assertEqual((request_id, estimated_time), ('FAKE00000001', '7'))
+            self.assertEqual(bc.check_submission_status(request_id), 'WAITING')
+            self.assertEqual(bc.check_submission_status('unknown_rid'), 'UNKNOWN')
+
+            results = bc.wait_for_results(request_id, 0.3, format_type='Text')
+            self.assertIn('Text_RESPONSE', results)
+            self.assertEqual(server.requests, {'Put': 1, 'SearchInfo': 4, 'Get': 1})
+            self.assertEqual(server.connections, 1)
+
+    def test_response_size(self):
+        with FakeBlastServer(response_size=50000) as server, \
+                BlastClient(transport=SessionTransport(), endpoints=[server.url]) as bc:
+            request_id, _ = bc.search('ACGT', 'nt', 'blastn')
+            self.assertEqual(bc.check_submission_status(request_id), 'READY')
+            results = bc.get_results(request_id, format_type='HTML')
+            self.assertIn('HTML_RESPONSE', results)
+            self.assertGreaterEqual(len(results), 50000)
+
+    def test_report_formats(self):
+        with FakeBlastServer(query_count=3, hit_count=2) as server, tempfile.TemporaryDirectory() as directory, \
+                BlastClient(transport=SessionTransport(), endpoints=[server.url]) as bc:
+            request_id, _ = bc.search('ACGT', 'nt', 'blastn')
+            for format_type in ('XML2', 'JSON2', 'Tabular'):
+                path = os.path.join(directory, format_type + '.zip')
+                results = bc.get_results(request_id, format_type=format_type, results_file_path=path)
+                report = BlastReport.read(results, format_type)
+                self.assertEqual(len(report), 3)
+                self.assertEqual([len(query.hits) for query in report], [2, 2, 2])
+
+    def test_results_buffer(self):
+        with FakeBlastServer(query_count=3) as server, tempfile.TemporaryDirectory() as directory, \
+                BlastClient(transport=SessionTransport(), endpoints=[server.url],
+                            download_manager=DownloadManager(spool_size=1024)) as bc:
+            request_id, _ = bc.search('ACGT', 'nt', 'blastn')
+            for format_type in ('XML2', 'JSON2'):
+                with bc.get_results(request_id, format_type=format_type, as_buffer=True,
+                                    results_file_path=os.path.join(directory, 'results.zip')) as buffer:
+                    self.assertFalse(buffer.in_memory)
+                    self.assertEqual(len(BlastReport.read(buffer, format_type)), 3)
+            self.assertEqual(os.listdir(directory), [])
+
+            with bc.get_results(request_id, format_type='Tabular', as_buffer=True) as buffer:
+                self.assertEqual(len(BlastReport.read(buffer.getbuffer(), 'Tabular')), 3)
+
+    def test_parallel_formats(self):
+        with FakeBlastServer(latency=0.3) as server, tempfile.TemporaryDirectory() as directory, \
+                BlastClient(transport=SessionTransport(), endpoints=[server.url]) as bc:
+            request_id, _ = bc.search('ACGT', 'nt', 'blastn')
+            start = time.monotonic()
+            results = bc.get_results_multi(request_id, ['Tabular', 'XML2', 'JSON2', 'Text'],
+                                           results_file_path=os.path.join(directory, '{rid}.{format_type}.zip'))
+            self.assertLess(time.monotonic() - start, 0.9)
+            self.assertEqual(server.requests['Get'], 4)
+            self.assertEqual(results['XML2'], os.path.join(directory, request_id + '.XML2.zip'))
+            for format_type in ('Tabular', 'XML2', 'JSON2'):
+                self.assertEqual(len(BlastReport.read(results[format_type], format_type)), 2)
+            self.assertIn('Text_RESPONSE', results['Text'])
+
+    def test_concurrent_clients(self):
+        with FakeBlastServer(latency=0.05) as server, \
+                BlastClient(transport=SessionTransport(pool_maxsize=8), endpoints=[server.url]) as bc:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+                request_ids = list(executor.map(lambda _: bc.search('ACGT', 'nt', 'blastn')[0], range(32)))
+            self.assertEqual(len(set(request_ids)), 32)
+            self.assertEqual(server.requests['Put'], 32)
+            self.assertLessEqual(server.connections, 8)
+
+    def test_failures(self):
+        with FakeBlastServer(failure_rate=1) as server:
+            response = requests.get(server.url, params={'CMD': 'Put'})
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(server.failures, 1)
+
+        with FakeBlastServer(failure_rate=0.5, seed=1) as server, \
+                BlastClient(transport=SessionTransport(max_retries=10, backoff_factor=0), endpoints=[server.url]) as bc:
+            for _ in range(10):
+                bc.check_submission_status('FAKE00000001')
+            self.assertGreater(server.failures, 0)
+            self.assertEqual(server.requests['SearchInfo'], 10 + server.failures)
+
+            # Submissions aren't retried, failed one isn't sent again
+            failures = server.failures
+            submitted = 0
+            for _ in range(10):
+                try:
+                    bc.search('ACGT', 'nt', 'blastn')
+                    submitted += 1
+                except ValueError as e:
+                    self.assertEqual(str(e), 'NCBI returned HTTP status 503 to submission')
+            self.assertEqual(server.requests['Put'], 10)
+            self.assertEqual(server.failures - failures, 10 - submitted)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from BlastApi.BatchSearch import BatchSearch
+from BlastApi.FastaReader import FastaReader
+
+_FASTA = (b'>seq1 first test sequence\nACGTACGT\nACGT\n'
+          b'>seq2\r\nTTGG\r\n'
+          b'>seq3 third\n\n'
+          b'>seq4 fourth\nAAAA\nCC')
+
+
+class FastaReaderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'queries.fasta')
+        with open(self.path, 'wb') as file:
+            file.write(_FASTA)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_iterate(self):
+        with FastaReader(self.path) as reader:
+            records = list(reader)
+            self.assertEqual([record.id for record in records], ['seq1', 'seq2', 'seq3', 'seq4'])
+            self.assertEqual([record.sequence for record in records], ['ACGTACGTACGT', 'TTGG', '', 'AAAACC'])
+            self.assertEqual(records[0].description, 'first test sequence')
+            self.assertEqual(records[1].header, 'seq2')
+            self.assertEqual(records[0].to_fasta(), '>seq1 first test sequence\nACGTACGTACGT\n')
+            self.assertEqual(records[3].to_query(), ('seq4', 'AAAACC'))
+            raw = records[1].raw
+            self.assertEqual(raw.tobytes(), b'>seq2\r\nTTGG\r\n')
+            raw.release()
+
+    def test_index(self):
+        with FastaReader(self.path) as reader:
+            self.assertIsNone(reader.load_index())
+            index = reader.build_index()
+            expected = [_FASTA.index(name) for name in (b'>seq1', b'>seq2', b'>seq3', b'>seq4')] + [len(_FASTA)]
+            self.assertEqual(list(index), expected)
+            self.assertTrue(os.path.exists(self.path + '.bfi'))
+
+        with FastaReader(self.path) as reader:
+            self.assertEqual(list(reader.load_index()), list(index))
+            self.assertEqual(len(reader), 4)
+            self.assertEqual(reader[2].id, 'seq3')
+            self.assertEqual(reader[-1].id, 'seq4')
+            with self.assertRaises(IndexError):
+                reader[4]
+            self.assertEqual([record.id for record in reader.records(1, 3)], ['seq2', 'seq3'])
+
+        with open(self.path, 'ab') as file:
+            file.write(b'\n>seq5\nGG\n')
+        with FastaReader(self.path) as reader:
+            self.assertIsNone(reader.load_index())
+            self.assertEqual(len(reader), 5)
+
+        # Edit keeping the file size invalidates the index too
+        with open(self.path, 'r+b') as file:
+            file.write(b'>seq0')
+        status = os.stat(self.path)
+        os.utime(self.path, ns=(status.st_atime_ns, status.st_mtime_ns + 1000))
+        with FastaReader(self.path) as reader:
+            self.assertIsNone(reader.load_index())
+            self.assertEqual(reader[0].id, 'seq0')
+
+    def test_concurrent_index(self):
+        with FastaReader(self.path) as reader:
+            expected = list(reader.build_index(save=False))
+
+        loaded = []
+
+        def build():
+            for _ in range(50):
+                with FastaReader(self.path) as worker:
+                    index = worker.load_index()
+                    loaded.append(list(index) if index is not None else expected)
+                    worker.build_index()
+
+        threads = [threading.Thread(target=build) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(loaded), 200)
+        self.assertTrue(all(index == expected for index in loaded))
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ['queries.fasta', 'queries.fasta.bfi'])
+
+    def test_shards(self):
+        with FastaReader(self.path) as reader:
+            shards = [[record.id for record in reader.shard(worker, 3)] for worker in range(3)]
+            self.assertEqual(shards, [['seq1'], ['seq2'], ['seq3', 'seq4']])
+            with self.assertRaises(ValueError):
+                list(reader.shard(3, 3))
+
+            batches = list(BatchSearch(None, max_sequences=2).pack(reader.shard(0, 1)))
+            self.assertEqual(batches[0], [('seq1', 'ACGTACGTACGT'), ('seq2', 'TTGG')])
+
+    def test_empty_file(self):
+        open(self.path, 'wb').close()
+        with FastaReader(self.path) as reader:
+            self.assertEqual(list(reader), [])
+            self.assertEqual(len(reader), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from BlastApi import BlastClient
+from BlastApi.JobJournal import JobJournal, SUBMITTED, FETCHED
+from BlastApi.PollScheduler import PollScheduler
+from BlastApi.ResultCache import params_hash
+from BlastApi.Transport.SessionTransport import SessionTransport
+from tests.FakeBlastServer import FakeBlastServer
+from tests.PollSchedulerTest import StatusClientMock
+from tests.ResultsValidatorMock import ResultsValidatorMock
+from tests.SearchValidatorMock import SearchValidatorMock
+from tests.TransportMock import TransportMock
+
+
+class ResumeClientMock(StatusClientMock):
+    def __init__(self, statuses) -> None:
+        super().__init__(statuses)
+        self.fetched = []
+
+    def get_results(self, request_id, *, format_type='HTML', results_file_path=None):
+        self.fetched.append(request_id)
+        return results_file_path if format_type == 'XML2' else format_type + '_RESPONSE'
+
+
+class JobJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.database_path = os.path.join(self.directory.name, 'journal.sqlite')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_record_job(self):
+        params = {'CMD': 'Put', 'QUERY': 'u00001', 'DATABASE': 'nt', 'PROGRAM': 'blastn'}
+        with JobJournal(self.database_path, batch_size=1000, flush_interval=60) as journal:
+            journal.record_submission(params, '1337', '17')
+            journal.record_status('1337', 'WAITING')
+            journal.record_status('1337', 'WAITING')
+            journal.record_status('1337', 'READY')
+            journal.record_results('1337', 'results.zip')
+            journal.record_status('1337', 'READY')
+            journal.record_status('unknown_rid', 'READY')
+            self.assertEqual(len(journal._pending), 12)
+
+        with JobJournal(self.database_path) as journal:
+            entry = journal.get('1337')
+            self.assertEqual((entry.request_id, entry.estimated_time, entry.status, entry.results_location),
+                             ('1337', 17, FETCHED, 'results.zip'))
+            self.assertEqual(entry.params_hash, params_hash(params))
+            self.assertEqual(entry.params, {'QUERY': 'u00001', 'DATABASE': 'nt', 'PROGRAM': 'blastn'})
+            self.assertEqual([status for status, _ in journal.transitions('1337')],
+                             [SUBMITTED, 'WAITING', 'READY', FETCHED])
+            self.assertEqual(journal.transitions('unknown_rid'), [])
+            self.assertIsNone(journal.get('unknown_rid'))
+            self.assertEqual(journal._connection.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+
+    def test_batched_writes(self):
+        with JobJournal(self.database_path, batch_size=3, flush_interval=60) as journal:
+            journal.record_submission({'QUERY': 'a'}, '1', 10)
+            self.assertEqual(journal._pending, [])
+            journal.record_status('1', 'WAITING')
+            self.assertEqual(len(journal._pending), 2)
+            journal.record_status('1', 'READY')
+            self.assertEqual(journal._pending, [])
+
+        with JobJournal(self.database_path, flush_interval=0.01) as journal:
+            journal.record_status('1', 'UNKNOWN')
+            time.sleep(0.2)
+            self.assertEqual(journal._pending, [])
+
+    def test_pending_jobs(self):
+        with JobJournal(self.database_path) as journal:
+            for request_id in '1234':
+                journal.record_submission({'QUERY': request_id}, request_id, 0)
+            journal.record_status('2', 'WAITING')
+            journal.record_status('3', 'UNKNOWN')
+            journal.record_results('4')
+            self.assertEqual([entry.request_id for entry in journal.pending_jobs()], ['1', '2'])
+            self.assertEqual(journal.pending_jobs()[0].remaining_time(), 0)
+
+    def test_resume(self):
+        with JobJournal(self.database_path) as journal:
+            for request_id in '123':
+                journal.record_submission({'QUERY': request_id}, request_id, 0)
+
+        client = ResumeClientMock({'1': ['WAITING', 'READY'], '2': ['UNKNOWN'], '3': ['READY']})
+        with JobJournal(self.database_path) as journal, PollScheduler(client, min_interval=0.01) as scheduler:
+            results = dict(journal.resume(client, format_type='XML2', results_file_path='{rid}.zip',
+                                          scheduler=scheduler))
+            self.assertEqual(results, {'1': '1.zip', '2': None, '3': '3.zip'})
+            self.assertEqual(sorted(client.fetched), ['1', '3'])
+            self.assertEqual(journal.pending_jobs(), [])
+            self.assertEqual(journal.get('3').results_location, '3.zip')
+            self.assertEqual(journal.get('2').status, 'UNKNOWN')
+
+    def test_resume_errors(self):
+        with JobJournal(self.database_path) as journal:
+            for request_id in '123':
+                journal.record_submission({'QUERY': request_id}, request_id, 0)
+
+        client = ResumeClientMock({'1': ['READY'], '2': [ValueError('Invalid RID')] * 10, '3': ['WAITING', 'READY']})
+        with JobJournal(self.database_path) as journal, PollScheduler(client, min_interval=0.01) as scheduler:
+            results = dict(journal.resume(client, format_type='Text', scheduler=scheduler))
+            self.assertEqual(sorted(results), ['1', '2', '3'])
+            self.assertIsInstance(results['2'], ValueError)
+            self.assertEqual(results['3'], 'Text_RESPONSE')
+            self.assertEqual([entry.request_id for entry in journal.pending_jobs()], ['2'])
+
+    def test_endpoint_binding(self):
+        with FakeBlastServer() as first, FakeBlastServer(request_id_prefix='SECOND') as second, \
+                JobJournal(self.database_path) as journal:
+            with BlastClient(transport=SessionTransport(), endpoints=[first.url, second.url], journal=journal) as bc:
+                request_ids = [bc.search('ACGT', 'nt', 'blastn')[0] for _ in range(2)]
+            self.assertEqual((first.requests['Put'], second.requests['Put']), (1, 1))
+            self.assertEqual(journal.get(request_ids[0]).endpoint, first.url)
+
+            # New process: bindings are restored from the journal
+            with BlastClient(transport=SessionTransport(), endpoints=[second.url, first.url], journal=journal) as bc:
+                for request_id in request_ids:
+                    self.assertEqual(bc.check_submission_status(request_id), 'READY')
+                self.assertEqual((first.requests['SearchInfo'], second.requests['SearchInfo']), (1, 1))
+                results = dict(journal.resume(bc, format_type='Text'))
+                self.assertEqual(sorted(results), sorted(request_ids))
+                self.assertEqual((first.requests['Get'], second.requests['Get']), (1, 1))
+
+            with BlastClient(transport=SessionTransport(), endpoints=[second.url, first.url]) as bc:
+                self.assertRaises(ValueError, bc.check_submission_status, request_ids[0])
+
+    def test_schema_migration(self):
+        connection = sqlite3.connect(self.database_path)
+        connection.execute('CREATE TABLE jobs (request_id TEXT PRIMARY KEY, params_hash TEXT NOT NULL, params TEXT '
+                           'NOT NULL, estimated_time INTEGER, submitted_at REAL NOT NULL, status TEXT NOT NULL, '
+                           'updated_at REAL NOT NULL, results_location TEXT)')
+        connection.execute("INSERT INTO jobs VALUES ('1', 'hash', '{}', 0, 0, 'SUBMITTED', 0, NULL)")
+        connection.commit()
+        connection.close()
+        with JobJournal(self.database_path) as journal:
+            self.assertIsNone(journal.get('1').endpoint)
+            journal.record_submission({'QUERY': 'A'}, '2', 0, 'https://blast.example.org/Blast.cgi')
+            self.assertEqual(journal.get('2').endpoint, 'https://blast.example.org/Blast.cgi')
+
+    def test_client_journal(self):
+        with JobJournal(self.database_path) as journal:
+            bc = BlastClient(transport=TransportMock(), journal=journal)
+            bc.search_validator = SearchValidatorMock()
+            bc.result_validator = ResultsValidatorMock()
+            request_id, _ = bc.search('u00001', 'nt', 'blastn')
+            bc.check_submission_status(request_id)
+            bc.get_results(request_id, format_type='Text')
+            entry = journal.get(request_id)
+            self.assertEqual((entry.status, entry.results_location), (FETCHED, None))
+            self.assertEqual(entry.params['QUERY'], 'u00001')
+            self.assertEqual(len(journal.transitions(request_id)), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import tempfile
+import time
+import unittest
+
+from BlastApi import BlastClient
+from BlastApi.Observer import BlastObserver, RESULTS, STATUS, SUBMIT
+from BlastApi.Observer.MetricsObserver import MetricsObserver
+from BlastApi.Transport import BlastTransport
+from BlastApi.Transport.HedgedTransport import HedgedTransport
+from BlastApi.Transport.SessionTransport import SessionTransport
+from tests.FakeBlastServer import FakeBlastServer
+from tests.TransportMock import TransportMock
+
+
+class RecordingObserver(BlastObserver):
+    def __init__(self):
+        self.events = []
+
+    def request_started(self, operation, params):
+        self.events.append(('started', operation))
+
+    def request_finished(self, operation, params, *, elapsed, status_code=None, size=None, error=None):
+        self.events.append(('finished', operation, size, type(error).__name__ if error is not None else None))
+
+    def submitted(self, request_id, estimated_time):
+        self.events.append(('submitted', request_id, estimated_time))
+
+    def status_checked(self, request_id, status):
+        self.events.append(('status', request_id, status))
+
+    def results_retrieved(self, request_id, format_type, size, *, cached=False):
+        self.events.append(('results', request_id, format_type, size))
+
+
+class FailingTransport(BlastTransport):
+    def get(self, url, params, *, stream=False, headers=None):
+        raise ConnectionError('Connection refused')
+
+
+class MetricsObserverTest(unittest.TestCase):
+    def test_events(self):
+        observer = RecordingObserver()
+        bc = BlastClient(transport=TransportMock(), observer=observer)
+        request_id, _ = bc.search('ACGT', 'nt', 'blastn')
+        status = bc.check_submission_status(request_id)
+        bc.get_results(request_id, format_type='Tabular')
+        self.assertEqual(observer.events, [
+            ('started', SUBMIT), ('finished', SUBMIT, None, None), ('submitted', '1337', '17'),
+            ('started', STATUS), ('finished', STATUS, None, None), ('status', '1337', status),
+            ('started', RESULTS), ('finished', RESULTS, 16, None), ('results', '1337', 'Tabular', 16)])
+
+        observer.events.clear()
+        bc = BlastClient(transport=FailingTransport(), observer=observer)
+        self.assertRaises(ConnectionError, bc.check_submission_status, '1337')
+        self.assertEqual(observer.events, [('started', STATUS), ('finished', STATUS, None, 'ConnectionError')])
+
+    def test_metrics(self):
+        observer = MetricsObserver()
+        with FakeBlastServer(rtoe=5, queue_delay=0.2, drop_after=300, drops=1) as server, \
+                tempfile.TemporaryDirectory() as directory, \
+                BlastClient(transport=SessionTransport(), endpoints=[server.url], observer=observer) as bc:
+            request_id, _ = bc.search('ACGT', 'nt', 'blastn')
+            self.assertEqual(bc.check_submission_status(request_id), 'WAITING')
+            time.sleep(0.2)
+            self.assertEqual(bc.check_submission_status(request_id), 'READY')
+            path = bc.get_results(request_id, format_type='XML2', results_file_path=os.path.join(directory, 'r.zip'))
+            size = os.path.getsize(path)
+            bc.get_results(request_id, format_type='Tabular')
+
+        self.assertEqual(observer.requests.value(SUBMIT, '200'), 1)
+        self.assertEqual(observer.requests.value(STATUS, '200'), 2)
+        self.assertEqual(observer.requests.value(RESULTS, '200'), 2)
+        self.assertEqual(observer.requests.value(RESULTS, '206'), 1)
+        self.assertEqual(observer.retries.value(RESULTS), 1)
+        self.assertEqual(observer.in_flight.value(STATUS), 0)
+        self.assertEqual(observer.request_duration.value(STATUS)[0], 2)
+        self.assertEqual(observer.status_checks.value('WAITING'), 1)
+        self.assertEqual(observer.transitions.value('SUBMITTED', 'WAITING'), 1)
+        self.assertEqual(observer.transitions.value('WAITING', 'READY'), 1)
+        self.assertEqual(observer.polls.value(), (1, 2))
+        self.assertGreaterEqual(observer.search_duration.value('READY')[1], 0.2)
+        self.assertEqual(observer.estimated_duration.value(), (1, 5))
+        self.assertEqual(observer.searches_in_progress.value(), 0)
+        self.assertEqual(observer.results.value('XML2', 'api'), 1)
+        self.assertEqual(observer.results_bytes.value('XML2'), (1, size))
+
+        metrics = observer.render()
+        self.assertIn('# TYPE blast_request_duration_seconds histogram\n', metrics)
+        self.assertIn('blast_status_transitions_total{from="WAITING",to="READY"} 1\n', metrics)
+        self.assertIn('blast_polls_per_search_bucket{le="2"} 1\n', metrics)
+
+    def test_transport_retries(self):
+        observer = MetricsObserver()
+        with FakeBlastServer(failure_rate=1.0) as server, \
+                BlastClient(transport=SessionTransport(backoff_factor=0), endpoints=[server.url],
+                            observer=observer) as bc:
+            self.assertRaises(Exception, bc.search, 'ACGT', 'nt', 'blastn')
+            self.assertRaises(Exception, bc.check_submission_status, 'R1')
+        self.assertEqual(observer.retries.value(SUBMIT), 0)
+        self.assertEqual(observer.retries.value(STATUS), 3)
+        self.assertEqual(observer.requests.value(STATUS, '503'), 1)
+
+        observer = MetricsObserver()
+        with FakeBlastServer(latency=0.3) as server, \
+                BlastClient(transport=HedgedTransport(SessionTransport(), max_delay=0.1), endpoints=[server.url],
+                            observer=observer) as bc:
+            request_id, _ = bc.search('ACGT', 'nt', 'blastn')
+            bc.check_submission_status(request_id)
+        self.assertEqual(observer.retries.value(SUBMIT), 0)
+        self.assertEqual(observer.retries.value(STATUS), 1)
+
+    def test_forgotten_searches(self):
+        observer = MetricsObserver(max_request_ids=2)
+        for request_id in ('RID1', 'RID2', 'RID3'):
+            observer.submitted(request_id, '10')
+        self.assertEqual(observer.searches_in_progress.value(), 2)
+        observer.status_checked('RID1', 'READY')
+        observer.status_checked('RID3', 'UNKNOWN')
+        self.assertEqual(observer.searches_in_progress.value(), 1)
+        self.assertEqual(observer.search_duration.value('UNKNOWN')[0], 1)
+        self.assertEqual(observer.status_checks.value('READY'), 1)
+        self.assertEqual(observer.transitions.value('SUBMITTED', 'READY'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from BlastApi.Observer.MetricsRegistry import MetricsRegistry
+
+
+class MetricsRegistryTest(unittest.TestCase):
+    def test_counter(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('blast_requests_total', 'HTTP requests.', ('operation', 'code'))
+        counter.inc('submit', '200')
+        counter.inc('status', '200', amount=2)
+        counter.inc('submit', '200')
+        self.assertEqual(counter.value('submit', '200'), 2)
+        self.assertEqual(counter.value('results', '200'), 0)
+        self.assertIs(registry.get('blast_requests_total'), counter)
+        self.assertEqual(registry.render(), '# HELP blast_requests_total HTTP requests.\n'
+                                            '# TYPE blast_requests_total counter\n'
+                                            'blast_requests_total{operation="status",code="200"} 2\n'
+                                            'blast_requests_total{operation="submit",code="200"} 2\n')
+
+    def test_gauge(self):
+        registry = MetricsRegistry()
+        gauge = registry.gauge('blast_searches_in_progress', 'Searches.')
+        gauge.inc()
+        gauge.inc(amount=3)
+        gauge.dec()
+        self.assertEqual(gauge.value(), 3)
+        gauge.set(0.5)
+        self.assertEqual(registry.render().splitlines()[-1], 'blast_searches_in_progress 0.5')
+
+    def test_histogram(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram('blast_request_duration_seconds', 'Latency.', ('operation',),
+                                       buckets=(0.1, 1, 10))
+        for value in (0.05, 0.1, 0.5, 20):
+            histogram.observe(value, 'status')
+        self.assertEqual(histogram.value('status'), (4, 20.65))
+        self.assertEqual(registry.render().splitlines()[2:], [
+            'blast_request_duration_seconds_bucket{operation="status",le="0.1"} 2',
+            'blast_request_duration_seconds_bucket{operation="status",le="1"} 3',
+            'blast_request_duration_seconds_bucket{operation="status",le="10"} 3',
+            'blast_request_duration_seconds_bucket{operation="status",le="+Inf"} 4',
+            'blast_request_duration_seconds_sum{operation="status"} 20.65',
+            'blast_request_duration_seconds_count{operation="status"} 4'])
+
+    def test_escaping(self):
+        registry = MetricsRegistry()
+        registry.counter('errors_total', 'Errors\nby "kind".', ('kind',)).inc('a "b"\\c\n')
+        self.assertEqual(registry.render().splitlines(), ['# HELP errors_total Errors\\nby "kind".',
+                                                          '# TYPE errors_total counter',
+                                                          'errors_total{kind="a \\"b\\"\\\\c\\n"} 1'])
+
+    def test_duplicate(self):
+        registry = MetricsRegistry()
+        registry.counter('requests_total', 'Requests.')
+        self.assertRaises(ValueError, registry.gauge, 'requests_total', 'Requests.')
+
+
+if __name__ == '__main__':
+    unittest.main()
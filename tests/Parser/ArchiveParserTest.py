@@ -0,0 +1,64 @@
+import io
+import unittest
+from unittest import mock
+
+from BlastApi.Parser import QUERY, HIT, HSP, report_members
+from BlastApi.Parser import ArchiveParser as archive_parser_module
+from BlastApi.Parser.ArchiveParser import ArchiveParser
+from tests.ReportFixtures import make_queries, json2_archive, xml2_archive
+
+
+def expected_records(queries):
+    records = []
+    for query in queries:
+        records.append((QUERY, {'query_id': query['query_id'], 'query_title': query['query_title'],
+                                'query_len': query['query_len']}))
+        for hit in query['hits']:
+            records.append((HIT, dict({'query_id': query['query_id'], 'num': hit['num']}, **hit['description'][0],
+                                      len=hit['len'])))
+            for hsp in hit['hsps']:
+                records.append((HSP, dict({'query_id': query['query_id'], 'hit_num': hit['num']}, **hsp)))
+    return records
+
+
+class ArchiveParserTest(unittest.TestCase):
+    queries = make_queries(query_count=3, hit_count=2, hsp_count=2)
+
+    def test_report_members(self):
+        names = ['RID_10.xml', 'RID.xml', 'RID_2.xml', 'RID_1.xml']
+        self.assertEqual(report_members(names), ['RID_1.xml', 'RID_2.xml', 'RID_10.xml'])
+        self.assertEqual(report_members(['RID.json']), ['RID.json'])
+
+    def test_xml2(self):
+        parser = ArchiveParser(io.BytesIO(xml2_archive('RID', self.queries)))
+        self.assertEqual(parser.members(), ['RID_1.xml', 'RID_2.xml', 'RID_3.xml'])
+        self.assertEqual(list(parser), expected_records(self.queries))
+
+    @unittest.skipUnless(archive_parser_module.ijson, 'ijson is not installed')
+    def test_json2(self):
+        parser = ArchiveParser(io.BytesIO(json2_archive('RID', self.queries)))
+        self.assertEqual(parser.members(), ['RID_1.json', 'RID_2.json', 'RID_3.json'])
+        # Members are parsed incrementally, never loaded at once
+        with mock.patch.object(ArchiveParser, '_parse_json', side_effect=AssertionError('member loaded at once')):
+            self.assertEqual(list(parser), expected_records(self.queries))
+
+    def test_json2_without_ijson(self):
+        with mock.patch.object(archive_parser_module, 'ijson', None):
+            parser = ArchiveParser(io.BytesIO(json2_archive('RID', self.queries)))
+            self.assertEqual(list(parser), expected_records(self.queries))
+
+    def test_query_without_hits(self):
+        queries = make_queries(query_count=2, hit_count=0)
+        expected = expected_records(queries)
+        self.assertEqual(list(ArchiveParser(io.BytesIO(xml2_archive('RID', queries)))), expected)
+        self.assertEqual(list(ArchiveParser(io.BytesIO(json2_archive('RID', queries)))), expected)
+
+    def test_lazy_iteration(self):
+        parser = iter(ArchiveParser(io.BytesIO(xml2_archive('RID', make_queries(query_count=50)))))
+        self.assertEqual(next(parser)[0], QUERY)
+        self.assertEqual(next(parser)[0], HIT)
+        self.assertEqual(next(parser)[0], HSP)
+
+
+if __name__ == '__main__':
+    unittest.main()
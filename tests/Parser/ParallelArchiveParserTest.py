@@ -0,0 +1,94 @@
+import concurrent.futures
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+from BlastApi.BlastReport import BlastReport
+from BlastApi.Parser import QUERY
+from BlastApi.Parser.ParallelArchiveParser import ParallelArchiveParser
+from BlastApi.ResultBuffer import ResultBuffer
+from tests.Parser.ArchiveParserTest import expected_records
+from tests.ReportFixtures import make_queries, json2_archive, xml2_archive
+
+
+def group_by_query(records):
+    groups = []
+    for kind, record in records:
+        if kind == QUERY:
+            groups.append([])
+        groups[-1].append((kind, record))
+    return groups
+
+
+class ParallelArchiveParserTest(unittest.TestCase):
+    queries = make_queries(query_count=7, hit_count=2, hsp_count=2)
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = concurrent.futures.ProcessPoolExecutor(max_workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def test_file_like(self):
+        for archive in (xml2_archive('RID', self.queries), json2_archive('RID', self.queries)):
+            parser = ParallelArchiveParser(io.BytesIO(archive), chunk_size=2, executor=self.executor)
+            self.assertEqual(len(parser.members()), 7)
+            self.assertEqual(list(parser), expected_records(self.queries))
+            self.assertEqual(list(ParallelArchiveParser(archive, chunk_size=3, executor=self.executor)),
+                             expected_records(self.queries))
+            with ResultBuffer(archive, max_size=100) as buffer:
+                self.assertEqual(list(ParallelArchiveParser(buffer, chunk_size=1, executor=self.executor)),
+                                 expected_records(self.queries))
+
+    def test_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.zip')
+            for archive in (xml2_archive('RID', self.queries), json2_archive('RID', self.queries)):
+                # Workers reopen the archive replaced under the same path
+                with open(path, 'wb') as file:
+                    file.write(archive)
+                self.assertEqual(list(ParallelArchiveParser(path, chunk_size=2, executor=self.executor)),
+                                 expected_records(self.queries))
+
+    def test_unordered(self):
+        records = list(ParallelArchiveParser(xml2_archive('RID', self.queries), ordered=False, chunk_size=1,
+                                             executor=self.executor))
+        groups = group_by_query(records)
+        expected = group_by_query(expected_records(self.queries))
+        self.assertEqual(sorted(groups, key=lambda group: group[0][1]['query_id']), expected)
+
+    def test_own_pool(self):
+        for max_workers in (1, 2):
+            parser = ParallelArchiveParser(json2_archive('RID', self.queries), max_workers=max_workers, chunk_size=2)
+            self.assertEqual(list(parser), expected_records(self.queries))
+
+    def test_single_member(self):
+        queries = make_queries(query_count=1)
+        parser = ParallelArchiveParser(xml2_archive('RID', queries), executor=self.executor)
+        self.assertEqual(list(parser), expected_records(queries))
+
+    def test_sequential_streaming(self):
+        single = make_queries(query_count=1)
+        with mock.patch.object(zipfile.ZipFile, 'read', side_effect=AssertionError('Member read at once')):
+            parser = ParallelArchiveParser(xml2_archive('RID', single), executor=self.executor)
+            self.assertEqual(list(parser), expected_records(single))
+            parser = ParallelArchiveParser(json2_archive('RID', self.queries), max_workers=1)
+            self.assertEqual(list(parser), expected_records(self.queries))
+
+    def test_invalid_chunk_size(self):
+        self.assertRaises(ValueError, ParallelArchiveParser, 'results.zip', chunk_size=0)
+
+    def test_report(self):
+        archive = io.BytesIO(json2_archive('RID', self.queries))
+        report = BlastReport.read(archive, 'JSON2', parallel=True)
+        self.assertEqual([query.query_id for query in report], [query['query_id'] for query in self.queries])
+        self.assertEqual([len(query.hits) for query in report], [2] * 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+import numpy
+
+from BlastApi.Parser.TabularParser import parse_tabular
+
+_REPORT = """<PRE>
+# blastn
+# Iteration: 0
+# Query: seq1 test sequence
+# RID: 1337
+# Database: nt
+# Fields: query acc.ver, subject acc.ver, % identity, alignment length, mismatches, gap opens, q. start, q. end, \
+s. start, s. end, evalue, bit score
+# 2 hits found
+seq1\tNM_1.1\t100.000\t50\t0\t0\t1\t50\t101\t150\t1.05e-18\t93.5
+seq1\tNM_2.1\t98.000\t50\t1\t0\t1\t50\t150\t101\t4.90e-17\t87.9
+# blastn
+# Iteration: 0
+# Query: seq2 test sequence
+# RID: 1337
+# Database: nt
+# Fields: query acc.ver, subject acc.ver, % identity, alignment length, mismatches, gap opens, q. start, q. end, \
+s. start, s. end, evalue, bit score
+# 1 hits found
+seq2\tXM_3.2\t91.837\t49\t4\t0\t2\t50\t1\t49\t3.2e-12\t71.3
+</PRE>
+"""
+
+
+class TabularParserTest(unittest.TestCase):
+    def test_parse(self):
+        report = parse_tabular(_REPORT)
+        self.assertEqual(len(report), 3)
+        self.assertEqual(report.hits.dtype.names, ('query_acc_ver', 'subject_acc_ver', 'identity', 'alignment_length',
+                                                   'mismatches', 'gap_opens', 'query_start', 'query_end',
+                                                   'subject_start', 'subject_end', 'evalue', 'bit_score'))
+        self.assertEqual(report.hits['evalue'].dtype, numpy.float64)
+        self.assertEqual(report.hits['subject_end'].dtype, numpy.int64)
+        self.assertEqual(list(report.hits['subject_acc_ver']), ['NM_1.1', 'NM_2.1', 'XM_3.2'])
+        numpy.testing.assert_allclose(report.hits['bit_score'], [93.5, 87.9, 71.3])
+        self.assertEqual(list(report.hits[report.hits['evalue'] < 1e-16]['subject_acc_ver']), ['NM_1.1', 'NM_2.1'])
+        self.assertEqual(list(report.columns()['query_start']), [1, 1, 2])
+
+        self.assertEqual(len(report.headers), 2)
+        self.assertEqual(report.headers[0]['Query'], 'seq1 test sequence')
+        self.assertEqual(report.headers[0]['Program'], 'blastn')
+        self.assertEqual(report.headers[1]['hits found'], 1)
+        self.assertEqual(report.headers[1]['Database'], 'nt')
+
+    def test_parse_bytes_without_headers(self):
+        report = parse_tabular(b'seq1\tNM_1.1\t100.000\t50\t0\t0\t1\t50\t101\t150\t1e-18\t93.5\n')
+        self.assertEqual(report.headers, [])
+        self.assertEqual(report.hits['alignment_length'][0], 50)
+
+    def test_custom_fields(self):
+        report = parse_tabular('# Fields: query id, subject tax ids, score, unknown field\nq\t9606;10090\t72\tx\n')
+        self.assertEqual(report.hits.dtype.names, ('query_id', 'subject_tax_ids', 'score', 'unknown_field'))
+        self.assertEqual(report.hits['score'][0], 72)
+
+    def test_empty_report(self):
+        report = parse_tabular('# blastn\n# Query: seq1\n# 0 hits found\n')
+        self.assertEqual(len(report), 0)
+        self.assertEqual(report.headers[0]['hits found'], 0)
+
+    def test_invalid_rows(self):
+        with self.assertRaises(ValueError):
+            parse_tabular('seq1\tNM_1.1\t100.000\n')
+        with self.assertRaises(ValueError):
+            parse_tabular('# Fields: query id, evalue\nq\t1\n# Fields: query id\nq\n')
+        # Extra field of one row and missing field of another one don't cancel out
+        with self.assertRaises(ValueError):
+            parse_tabular('# Fields: query id, subject id, evalue\nq1\ts1\t1e-5\textra\nq2\t2e-3\n')
+
+    def test_string_columns(self):
+        report = parse_tabular('# Fields: query id, subject title, evalue\nq\t{0}\t1e-5\n'.format('t' * 100))
+        self.assertEqual(report.hits.dtype['query_id'], numpy.dtype('<U1'))
+        self.assertEqual(report.hits.dtype['subject_title'], numpy.dtype('<U100'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import itertools
+import threading
+import time
+import unittest
+
+from BlastApi import BlastClient
+from BlastApi.DownloadManager import DownloadManager
+from BlastApi.Pipeline import Pipeline
+from BlastApi.PollScheduler import PollScheduler
+from BlastApi.Transport.SessionTransport import SessionTransport
+from tests.FakeBlastServer import FakeBlastServer
+
+
+class PipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeBlastServer(queue_delay=0.05, query_count=1, hit_count=5)
+        self.server.start()
+        self.bc = BlastClient(transport=SessionTransport(pool_maxsize=20), endpoints=[self.server.url])
+        self.scheduler = PollScheduler(self.bc, min_interval=0.05, max_workers=4)
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+        self.bc.close()
+        self.server.stop()
+
+    def test_run(self):
+        sunk = []
+        pipeline = Pipeline(self.bc, 'nt', 'blastn', format_type='XML2', max_in_flight=4, queue_size=2,
+                            fetch_workers=2, sink=lambda item: sunk.append(item.query_id), scheduler=self.scheduler,
+                            expect=10)
+        queries = [('seq{0}'.format(number), 'ACGT' * number) for number in range(1, 21)]
+        items = list(pipeline.run(queries))
+        self.assertEqual(sorted(item.query_id for item in items), sorted(query_id for query_id, _ in queries))
+        self.assertEqual(sorted(sunk), sorted(query_id for query_id, _ in queries))
+        for item in items:
+            self.assertIsNone(item.error)
+            self.assertEqual(item.status, 'READY')
+            self.assertIsNone(item.results)
+            self.assertEqual(len(item.report), 1)
+            self.assertEqual(len(item.report.queries[0].hits), 5)
+        self.assertLessEqual(pipeline.peak_in_flight, 4)
+        self.assertEqual(self.server.requests['Put'], 20)
+        self.assertEqual(self.server.requests['Get'], 20)
+
+    def test_buffered_bytes(self):
+        release = threading.Event()
+
+        def parse(results):
+            release.wait(5)
+            return len(results)
+
+        pipeline = Pipeline(self.bc, 'nt', 'blastn', format_type='Text', max_in_flight=10, max_buffered_bytes=1,
+                            fetch_workers=3, parse_workers=1, parse=parse, scheduler=self.scheduler)
+        run = pipeline.run('ACGT' for _ in range(10))
+        time.sleep(0.5)
+        # Parse stage is blocked on the first result, which fills the memory limit until parsed
+        self.assertEqual(self.server.requests['Get'], 1)
+        self.assertEqual(self.server.requests['Put'], 10)
+        release.set()
+        items = list(run)
+        self.assertEqual(len(items), 10)
+        self.assertTrue(all(item.report > 0 and item.error is None for item in items))
+        # Limit is exceeded by at most one result per fetch worker
+        self.assertLessEqual(pipeline.peak_buffered_bytes, 3 * items[0].report)
+
+    def test_spooled_results(self):
+        bc = BlastClient(transport=SessionTransport(), endpoints=[self.server.url],
+                         download_manager=DownloadManager(spool_size=100))
+        pipeline = Pipeline(bc, 'nt', 'blastn', format_type='JSON2', max_buffered_bytes=1, scheduler=self.scheduler)
+        items = list(pipeline.run(['ACGT', 'GGCC', 'TTAA']))
+        self.assertEqual([len(item.report) for item in items], [1, 1, 1])
+        self.assertEqual(pipeline.peak_buffered_bytes, 0)
+
+    def test_errors(self):
+        def sink(item):
+            if item.query_id == 'query_2':
+                raise RuntimeError('Sink failed')
+
+        pipeline = Pipeline(self.bc, 'nt', '', sink=sink, scheduler=self.scheduler)
+        items = list(pipeline.run(['ACGT', 'GGCC']))
+        self.assertEqual(len(items), 2)
+        self.assertTrue(all(isinstance(item.error, AttributeError) for item in items))
+
+        pipeline = Pipeline(self.bc, 'nt', 'blastn', sink=sink, scheduler=self.scheduler)
+        items = {item.query_id: item for item in pipeline.run(['ACGT', 'GGCC'])}
+        self.assertIsNone(items['query_1'].error)
+        self.assertIsInstance(items['query_2'].error, RuntimeError)
+        self.assertIsNotNone(items['query_2'].report)
+
+    def test_invalid_queries(self):
+        def queries():
+            yield 'ACGT'
+            raise ValueError('Invalid FASTA')
+
+        run = Pipeline(self.bc, 'nt', 'blastn', scheduler=self.scheduler).run(queries())
+        items = []
+        with self.assertRaises(ValueError):
+            for item in run:
+                items.append(item)
+        self.assertEqual(len(items), 1)
+
+    def test_backpressure(self):
+        consumed = itertools.count()
+        queries = ('ACGT' for _ in consumed)
+        pipeline = Pipeline(self.bc, 'nt', 'blastn', format_type='Tabular', max_in_flight=2, queue_size=1,
+                            scheduler=self.scheduler)
+        run = pipeline.run(queries)
+        first = next(run)
+        time.sleep(0.5)
+        # Queries are read only as the stages have capacity
+        self.assertLess(next(consumed), 30)
+        run.close()
+        self.assertIsNone(first.error)
+        self.assertLessEqual(pipeline.peak_in_flight, 2)
+        self.assertFalse([thread for thread in threading.enumerate() if thread.name.startswith('Pipeline-')])
+
+    def test_close_before_iteration(self):
+        pipeline = Pipeline(self.bc, 'nt', 'blastn', scheduler=self.scheduler)
+        run = pipeline.run('ACGT' for _ in range(100))
+        time.sleep(0.2)
+        run.close()
+        requests = (self.server.requests['Put'], self.server.requests['Get'])
+        time.sleep(0.5)
+        self.assertEqual((self.server.requests['Put'], self.server.requests['Get']), requests)
+        self.assertFalse([thread for thread in threading.enumerate() if thread.name.startswith('Pipeline-')])
+
+        with pipeline.run('ACGT' for _ in range(100)):
+            pass
+        self.assertFalse([thread for thread in threading.enumerate() if thread.name.startswith('Pipeline-')])
+
+    def test_invalid_limits(self):
+        self.assertRaises(ValueError, Pipeline, self.bc, 'nt', 'blastn', max_in_flight=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import threading
+import time
+import unittest
+
+from BlastApi.PollScheduler import PollScheduler, _PollJob
+
+
+class StatusClientMock:
+    def __init__(self, statuses) -> None:
+        self.statuses = {request_id: list(values) for request_id, values in statuses.items()}
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def check_submission_status(self, request_id):
+        with self.lock:
+            self.calls.append((request_id, time.monotonic()))
+            status = self.statuses[request_id].pop(0)
+        if isinstance(status, Exception):
+            raise status
+        return status
+
+
+class PollSchedulerTest(unittest.TestCase):
+    def test_futures_and_callbacks(self):
+        client = StatusClientMock({'1': ['WAITING', 'READY'], '2': ['UNKNOWN'], '3': ['WAITING'] * 3 + ['READY']})
+        finished = []
+        with PollScheduler(client, min_interval=0.01, max_interval=0.05) as scheduler:
+            futures = {rid: scheduler.submit(rid, callback=lambda *args: finished.append(args)) for rid in '123'}
+            results = {rid: future.result(timeout=5) for rid, future in futures.items()}
+
+        self.assertEqual(results, {'1': 'READY', '2': 'UNKNOWN', '3': 'READY'})
+        self.assertEqual(sorted(finished), [('1', 'READY'), ('2', 'UNKNOWN'), ('3', 'READY')])
+        self.assertEqual(len(client.calls), 7)
+
+    def test_failing_callback(self):
+        client = StatusClientMock({'1': ['READY'], '2': ['READY']})
+        with PollScheduler(client, min_interval=0.01) as scheduler:
+            future = scheduler.submit('1', callback=lambda *args: 1 / 0)
+            self.assertRaises(ZeroDivisionError, future.result, timeout=2)
+            self.assertEqual(scheduler.submit('2').result(timeout=2), 'READY')
+
+    def test_transient_errors(self):
+        client = StatusClientMock({'1': [ConnectionError('Dropped')] * 2 + ['WAITING', TimeoutError(), 'READY'],
+                                   '2': [ConnectionError('Dropped')] * 3})
+        with PollScheduler(client, min_interval=0.01, max_errors=3) as scheduler:
+            self.assertEqual(scheduler.submit('1').result(timeout=5), 'READY')
+            self.assertRaises(ConnectionError, scheduler.submit('2').result, timeout=5)
+        self.assertEqual(len(client.calls), 8)
+        self.assertRaises(ValueError, PollScheduler, client, max_errors=0)
+
+    def test_cancelled_during_poll(self):
+        scheduler = PollScheduler(None)
+        future = scheduler.submit('1', estimated_time=60)
+
+        class CancellingClientMock:
+            def check_submission_status(self, request_id):
+                # shutdown() cancels the future while status is being checked
+                scheduler.shutdown()
+                return 'READY'
+
+        scheduler.client = CancellingClientMock()
+        scheduler._poll(_PollJob('1', 1, future, None))
+        self.assertTrue(future.cancelled())
+
+    def test_adaptive_backoff(self):
+        client = StatusClientMock({'1': ['WAITING'] * 4 + ['READY']})
+        with PollScheduler(client, min_interval=0.02, max_interval=1, backoff=2) as scheduler:
+            self.assertEqual(scheduler.submit('1').result(timeout=5), 'READY')
+
+        gaps = [second[1] - first[1] for first, second in zip(client.calls, client.calls[1:])]
+        for gap, expected in zip(gaps, [0.02, 0.04, 0.08, 0.16]):
+            self.assertGreaterEqual(gap, expected)
+        self.assertLess(gaps[0], gaps[-1])
+
+    def test_global_poll_limit(self):
+        client = StatusClientMock({str(rid): ['READY'] for rid in range(10)})
+        with PollScheduler(client, max_polls_per_second=50) as scheduler:
+            futures = [scheduler.submit(str(rid)) for rid in range(10)]
+            for future in futures:
+                future.result(timeout=5)
+
+        self.assertGreaterEqual(client.calls[-1][1] - client.calls[0][1], 9 / 50)
+
+    def test_shutdown_cancels_pending_jobs(self):
+        client = StatusClientMock({'1': ['READY']})
+        scheduler = PollScheduler(client)
+        future = scheduler.submit('1', estimated_time=60)
+        self.assertEqual(len(scheduler), 1)
+        scheduler.shutdown()
+        self.assertTrue(future.cancelled())
+        self.assertEqual(client.calls, [])
+        with self.assertRaises(RuntimeError):
+            scheduler.submit('2')
+
+
+if __name__ == '__main__':
+    unittest.main()
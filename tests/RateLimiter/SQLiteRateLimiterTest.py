@@ -0,0 +1,49 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from BlastApi.RateLimiter.SQLiteRateLimiter import SQLiteRateLimiter
+
+
+class SQLiteRateLimiterTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.database_path = os.path.join(self.directory.name, 'limits.sqlite')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_acquire(self):
+        limiter = SQLiteRateLimiter(self.database_path, {'Put': (20, 1)})
+
+        start = time.monotonic()
+        delays = [limiter.acquire('Put') for _ in range(4)]
+        self.assertGreaterEqual(time.monotonic() - start, 3 / 20)
+        self.assertEqual(delays[0], 0)
+
+    def test_shared_by_limiters(self):
+        quotas = {'Put': (25, 1)}
+        limiters = [SQLiteRateLimiter(self.database_path, quotas) for _ in range(3)]
+        threads = [threading.Thread(target=limiter.acquire, args=('Put',)) for limiter in limiters * 3]
+
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertGreaterEqual(time.monotonic() - start, 8 / 25)
+
+    def test_prune(self):
+        limiter = SQLiteRateLimiter(self.database_path, {'SearchInfo': (1000, 1)})
+        for rid in range(300):
+            limiter.acquire('SearchInfo:' + str(rid))
+        time.sleep(0.01)
+        connection = limiter._connection()
+        limiter._prune(connection, time.time())
+        self.assertEqual(connection.execute('SELECT COUNT(*) FROM buckets').fetchone()[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import threading
+import time
+import unittest
+
+from BlastApi import BlastClient
+from BlastApi.RateLimiter.TokenBucketRateLimiter import TokenBucketRateLimiter
+from tests.ResultsValidatorMock import ResultsValidatorMock
+from tests.SearchValidatorMock import SearchValidatorMock
+from tests.TransportMock import TransportMock
+
+
+class TokenBucketRateLimiterTest(unittest.TestCase):
+    def test_acquire(self):
+        limiter = TokenBucketRateLimiter({'Put': (20, 1), 'Get': (1000, 1000)})
+
+        start = time.monotonic()
+        delays = [limiter.acquire('Put') for _ in range(5)]
+        self.assertGreaterEqual(time.monotonic() - start, 4 / 20)
+        self.assertEqual(delays[0], 0)
+        self.assertTrue(all(delay > 0 for delay in delays[1:]))
+
+        start = time.monotonic()
+        for _ in range(100):
+            limiter.acquire('Get')
+        limiter.acquire('Unlimited')
+        self.assertLess(time.monotonic() - start, 0.1)
+
+    def test_shared_by_threads(self):
+        limiter = TokenBucketRateLimiter({'Get': (50, 2)})
+        threads = [threading.Thread(target=limiter.acquire, args=('Get',)) for _ in range(12)]
+
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertGreaterEqual(time.monotonic() - start, 10 / 50)
+
+    def test_throttle_status_checks_per_request_id(self):
+        limiter = TokenBucketRateLimiter({'Get': (1000, 1000), 'SearchInfo': (10, 1)})
+        params = {'CMD': 'Get', 'FORMAT_OBJECT': 'SearchInfo', 'RID': '1'}
+
+        self.assertEqual(limiter.throttle(params), 0)
+        self.assertEqual(limiter.throttle(dict(params, RID='2')), 0)
+        self.assertGreater(limiter.throttle(params), 0.05)
+        self.assertEqual(limiter.throttle({'CMD': 'Get', 'RID': '1', 'FORMAT_TYPE': 'HTML'}), 0)
+
+    def test_client_throttling(self):
+        limiter = TokenBucketRateLimiter({'Put': (10, 1)})
+        bc = BlastClient(transport=TransportMock(), rate_limiter=limiter)
+        bc.search_validator = SearchValidatorMock()
+        bc.result_validator = ResultsValidatorMock()
+
+        start = time.monotonic()
+        for _ in range(3):
+            bc.search('test123', 'test_db', 'test_prog')
+        bc.get_results('1337')
+        self.assertGreaterEqual(time.monotonic() - start, 2 / 10)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
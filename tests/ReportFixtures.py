@@ -0,0 +1,89 @@
+import io
+import json
+import zipfile
+
+_XML_HEADER = '<?xml version="1.0"?>\n'
+_NAMESPACE = 'http://www.ncbi.nlm.nih.gov'
+
+
+def make_queries(query_count=2, hit_count=3, hsp_count=2):
+    queries = []
+    for query_number in range(1, query_count + 1):
+        hits = []
+        for hit_number in range(1, hit_count + 1):
+            hsps = []
+            for hsp_number in range(1, hsp_count + 1):
+                hsps.append({'num': hsp_number, 'bit_score': 100.5 / hsp_number, 'score': 200 // hsp_number,
+                             'evalue': 1e-30 * hit_number, 'identity': 50 - hsp_number, 'gaps': hsp_number - 1,
+                             'query_from': hsp_number, 'query_to': 50, 'query_strand': 'Plus', 'hit_from': 101,
+                             'hit_to': 150, 'hit_strand': 'Minus', 'align_len': 50, 'qseq': 'ACGT' * 12 + 'AC',
+                             'hseq': 'ACGA' * 12 + 'AC', 'midline': '||| ' * 12 + '||'})
+            hits.append({'num': hit_number,
+                         'description': [{'id': 'gi|{0}|ref|NM_{0}.1|'.format(hit_number),
+                                          'accession': 'NM_{0}'.format(hit_number),
+                                          'title': 'Hit {0} of query {1}'.format(hit_number, query_number),
+                                          'taxid': 9606, 'sciname': 'Homo sapiens'}],
+                         'len': 1000 + hit_number, 'hsps': hsps})
+        queries.append({'query_id': 'Query_{0}'.format(query_number),
+                        'query_title': 'seq{0} test sequence'.format(query_number),
+                        'query_len': 50, 'hits': hits})
+    return queries
+
+
+def json2_archive(rid, queries):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        names = ['{0}_{1}.json'.format(rid, number) for number in range(1, len(queries) + 1)]
+        archive.writestr(rid + '.json', json.dumps({'BlastJSON': [{'File': name} for name in names]}))
+        for name, query in zip(names, queries):
+            report = {'BlastOutput2': {'report': {'program': 'blastn', 'results': {'search': query}}}}
+            archive.writestr(name, json.dumps(report))
+    return buffer.getvalue()
+
+
+def xml2_archive(rid, queries):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        names = ['{0}_{1}.xml'.format(rid, number) for number in range(1, len(queries) + 1)]
+        includes = ''.join('<xi:include href="{0}"/>'.format(name) for name in names)
+        archive.writestr(rid + '.xml', _XML_HEADER + '<BlastXML2 xmlns="{0}" xmlns:xi="http://www.w3.org/2003/'
+                                                     'XInclude">{1}</BlastXML2>'.format(_NAMESPACE, includes))
+        for name, query in zip(names, queries):
+            archive.writestr(name, _XML_HEADER + _xml_report(query))
+    return buffer.getvalue()
+
+
+def tabular_report(rid, queries):
+    fields = ('query acc.ver, subject acc.ver, % identity, alignment length, mismatches, gap opens, q. start, q. end, '
+              's. start, s. end, evalue, bit score')
+    lines = ['<PRE>']
+    for query in queries:
+        query_id = query['query_title'].split(None, 1)[0]
+        hsps = [(hit, hsp) for hit in query['hits'] for hsp in hit['hsps']]
+        lines += ['# blastn', '# Iteration: 0', '# Query: ' + query['query_title'], '# RID: ' + rid,
+                  '# Database: nt', '# Fields: ' + fields, '# {0} hits found'.format(len(hsps))]
+        for hit, hsp in hsps:
+            lines.append('\t'.join(str(value) for value in (
+                query_id, hit['description'][0]['accession'] + '.1', '{0:.3f}'.format(
+                    100 * hsp['identity'] / hsp['align_len']), hsp['align_len'],
+                hsp['align_len'] - hsp['identity'] - hsp['gaps'], hsp['gaps'], hsp['query_from'], hsp['query_to'],
+                hsp['hit_from'], hsp['hit_to'], hsp['evalue'], hsp['bit_score'])))
+    lines.append('</PRE>')
+    return '\n'.join(lines) + '\n'
+
+
+def _xml_report(query):
+    hits = ''.join(_xml_hit(hit) for hit in query['hits'])
+    return ('<BlastXML2 xmlns="{0}"><BlastOutput2><report><Report><program>blastn</program><results><Results>'
+            '<search><Search><query-id>{1}</query-id><query-title>{2}</query-title><query-len>{3}</query-len>'
+            '<hits>{4}</hits><stat><Statistics><db-num>100</db-num></Statistics></stat></Search></search>'
+            '</Results></results></Report></report></BlastOutput2></BlastXML2>'
+            .format(_NAMESPACE, query['query_id'], query['query_title'], query['query_len'], hits))
+
+
+def _xml_hit(hit):
+    description = ''.join('<{0}>{1}</{0}>'.format(key, value) for key, value in hit['description'][0].items())
+    hsps = ''.join('<Hsp>' + ''.join('<{0}>{1}</{0}>'.format(key.replace('_', '-'), value)
+                                     for key, value in hsp.items()) + '</Hsp>' for hsp in hit['hsps'])
+    return ('<Hit><num>{0}</num><description><HitDescr>{1}</HitDescr></description><len>{2}</len>'
+            '<hsps>{3}</hsps></Hit>'.format(hit['num'], description, hit['len'], hsps))
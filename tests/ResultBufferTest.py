@@ -0,0 +1,61 @@
+import io
+import unittest
+import zipfile
+
+from BlastApi.BlastReport import BlastReport
+from BlastApi.ResultBuffer import ResultBuffer
+from tests.ReportFixtures import make_queries, xml2_archive
+
+
+class ResultBufferTest(unittest.TestCase):
+    def test_in_memory(self):
+        with ResultBuffer(b'Tabular_RESPONSE', max_size=100) as buffer:
+            self.assertTrue(buffer.in_memory)
+            self.assertEqual(len(buffer), 16)
+            self.assertEqual(buffer.read(7), b'Tabular')
+            self.assertEqual(buffer.getvalue(), b'Tabular_RESPONSE')
+            self.assertEqual(buffer.tell(), 7)
+            self.assertEqual(bytes(buffer.getbuffer()[8:]), b'RESPONSE')
+            self.assertEqual(buffer.text(), 'Tabular_RESPONSE')
+        self.assertTrue(buffer.closed)
+
+    def test_roll_over(self):
+        buffer = ResultBuffer(max_size=10)
+        buffer.write(b'0123456789')
+        self.assertTrue(buffer.in_memory)
+        buffer.write(b'abc')
+        self.assertFalse(buffer.in_memory)
+        self.assertEqual(buffer.tell(), 13)
+        self.assertEqual(len(buffer), 13)
+        self.assertEqual(buffer.getvalue(), b'0123456789abc')
+        self.assertEqual(bytes(buffer.getbuffer()), b'0123456789abc')
+        buffer.seek(10)
+        self.assertEqual(buffer.read(), b'abc')
+        buffer.truncate(5)
+        self.assertEqual(buffer.text(), '01234')
+        buffer.close()
+        self.assertTrue(buffer.closed)
+
+    def test_archive(self):
+        archive = xml2_archive('RID1', make_queries())
+        for max_size in (len(archive), 100):
+            with ResultBuffer(archive, max_size=max_size) as buffer:
+                self.assertEqual(buffer.in_memory, max_size != 100)
+                with zipfile.ZipFile(buffer) as zip_file:
+                    self.assertIsNone(zip_file.testzip())
+                buffer.seek(0)
+                self.assertEqual(len(BlastReport.read(buffer, 'XML2')), 2)
+
+    def test_copy(self):
+        source = io.BytesIO(b'x' * 1000)
+        with ResultBuffer(max_size=512) as buffer:
+            data = source.read(300)
+            while data:
+                buffer.write(data)
+                data = source.read(300)
+            self.assertFalse(buffer.in_memory)
+            self.assertEqual(buffer.getvalue(), b'x' * 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from BlastApi import BlastClient
+from BlastApi.ResultCache import ResultCache, params_hash
+from BlastApi.Transport.SessionTransport import SessionTransport
+from tests.FakeBlastServer import FakeBlastServer
+from tests.ResultsValidatorMock import ResultsValidatorMock
+from tests.SearchValidatorMock import SearchValidatorMock
+from tests.TransportMock import TransportMock
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_params_hash(self):
+        params = {'CMD': 'Put', 'QUERY': 'u00001', 'DATABASE': 'nt', 'PROGRAM': 'blastn'}
+        self.assertEqual(params_hash(params), params_hash({'PROGRAM': 'blastn', 'DATABASE': 'nt', 'QUERY': 'u00001'}))
+        self.assertEqual(params_hash(params), params_hash(dict(params, RESULTS_FILE_PATH='x.zip', CMD='Get')))
+        self.assertNotEqual(params_hash(params), params_hash(dict(params, QUERY='u00002')))
+
+    def test_store_entries(self):
+        cache = ResultCache(self.directory.name)
+        params = {'QUERY': 'u00001', 'DATABASE': 'nt', 'PROGRAM': 'blastn'}
+        self.assertIsNone(cache.get_request_id(params))
+        cache.put_request_id(params, '1337')
+        self.assertEqual(cache.get_request_id(params), '1337')
+
+        results_params = {'RID': '1337', 'FORMAT_TYPE': 'Text'}
+        self.assertIsNone(cache.get_results(results_params))
+        cache.put_results(results_params, b'Text_RESPONSE')
+        self.assertEqual(cache.get_results(results_params), b'Text_RESPONSE')
+        self.assertIsNone(cache.get_results(dict(results_params, FORMAT_TYPE='XML')))
+
+        cache = ResultCache(self.directory.name)
+        self.assertEqual(cache.get_results(results_params), b'Text_RESPONSE')
+        cache.clear()
+        self.assertIsNone(cache.get_results(results_params))
+
+    def test_least_recently_used_eviction(self):
+        cache = ResultCache(self.directory.name, max_size=250, memory_items=0)
+        for rid in range(3):
+            cache.put_results({'RID': str(rid)}, b'x' * 100)
+            time.sleep(0.01)
+        self.assertIsNone(cache.get_results({'RID': '0'}))
+        self.assertIsNotNone(cache.get_results({'RID': '1'}))
+        time.sleep(0.01)
+        cache.put_results({'RID': '3'}, b'x' * 100)
+        self.assertIsNotNone(cache.get_results({'RID': '1'}))
+        self.assertIsNone(cache.get_results({'RID': '2'}))
+
+    def test_directory_scans(self):
+        cache = ResultCache(self.directory.name, max_size=250, memory_items=0)
+        with mock.patch('os.scandir', wraps=os.scandir) as scandir:
+            for rid in range(2):
+                cache.put_request_id({'QUERY': str(rid)}, str(rid))
+            # Only the first put scans the directory while it's under max_size
+            self.assertEqual(scandir.call_count, 1)
+            cache.put_results({'RID': '0'}, b'x' * 200)
+            self.assertEqual(scandir.call_count, 2)
+        self.assertLessEqual(cache._total_size, 250)
+        self.assertEqual(cache._total_size, sum(entry.stat().st_size for entry in os.scandir(self.directory.name)))
+
+    def test_evicted_while_read(self):
+        cache = ResultCache(self.directory.name, memory_items=0)
+        cache.put_results({'RID': '1'}, b'results')
+        with mock.patch('os.utime', side_effect=lambda path, times: os.remove(path)):
+            self.assertIsNone(cache.get_results({'RID': '1'}))
+
+    def test_age_eviction(self):
+        cache = ResultCache(self.directory.name, max_age=60)
+        cache.put_results({'RID': '1'}, b'results')
+        path = os.path.join(self.directory.name, 'results-' + params_hash({'RID': '1'}))
+        os.utime(path, (time.time(), time.time() - 120))
+        self.assertIsNone(cache.get_results({'RID': '1'}))
+        self.assertFalse(os.path.exists(path))
+
+    def test_memory_tier(self):
+        cache = ResultCache(self.directory.name, memory_items=1, memory_item_size=10)
+        cache.put_results({'RID': '1'}, b'small')
+        cache.put_results({'RID': '2'}, b'too large for memory')
+        self.assertEqual(list(cache._memory.values()), [b'small'])
+        cache.put_results({'RID': '3'}, b'small 2')
+        self.assertEqual(list(cache._memory.values()), [b'small 2'])
+
+    def test_client_cache(self):
+        transport = TransportMock()
+        bc = BlastClient(transport=transport, result_cache=ResultCache(self.directory.name))
+        bc.search_validator = SearchValidatorMock()
+        bc.result_validator = ResultsValidatorMock()
+
+        self.assertEqual(bc.search('u00001', 'nt', 'blastn'), ('1337', '17'))
+        self.assertEqual(bc.search('u00001', 'nt', 'blastn'), ('1337', '0'))
+        self.assertEqual(len(transport.requests), 1)
+
+        self.assertEqual(bc.get_results('1337', format_type='Text'), 'Text_RESPONSE')
+        start = time.time()
+        self.assertEqual(bc.wait_for_results('1337', 10, format_type='Text'), 'Text_RESPONSE')
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(len(transport.requests), 2)
+
+        bc.get_results('1337', format_type='XML')
+        self.assertEqual(len(transport.requests), 3)
+
+    def test_forget_request_id(self):
+        cache = ResultCache(self.directory.name)
+        params = {'QUERY': 'u00001', 'DATABASE': 'nt', 'PROGRAM': 'blastn'}
+        cache.put_request_id(params, '1337')
+        cache.forget_request_id('1337')
+        self.assertIsNone(cache.get_request_id(params))
+        cache.forget_request_id('unknown')
+
+        # Newer request ID of the same search isn't forgotten with the old one
+        cache.put_request_id(params, '1')
+        cache.put_request_id(params, '2')
+        cache.forget_request_id('1')
+        self.assertEqual(cache.get_request_id(params), '2')
+
+    def test_client_skips_status_pages(self):
+        with FakeBlastServer(queue_delay=0.5) as server, \
+                BlastClient(transport=SessionTransport(), endpoints=[server.url],
+                            result_cache=ResultCache(self.directory.name)) as bc:
+            request_id, _ = bc.search('ACGT', 'nt', 'blastn')
+            self.assertIn('Status=WAITING', bc.get_results(request_id, format_type='Text'))
+            time.sleep(0.5)
+            self.assertIn('Text_RESPONSE', bc.get_results(request_id, format_type='Text'))
+            self.assertEqual(server.requests['Get'], 2)
+            self.assertIn('Text_RESPONSE', bc.get_results(request_id, format_type='Text'))
+            self.assertEqual(server.requests['Get'], 2)
+
+        with FakeBlastServer(failure_rate=1.0) as server, \
+                BlastClient(transport=SessionTransport(max_retries=0), endpoints=[server.url],
+                            result_cache=ResultCache(self.directory.name)) as bc:
+            self.assertIn('Service Unavailable', bc.get_results('FAKE1', format_type='Text'))
+            bc.get_results('FAKE1', format_type='Text')
+            self.assertEqual(server.requests['Get'], 2)
+
+    def test_client_forgets_unknown_request_id(self):
+        with FakeBlastServer() as server, \
+                BlastClient(transport=SessionTransport(), endpoints=[server.url],
+                            result_cache=ResultCache(self.directory.name)) as bc:
+            request_id, _ = bc.search('ACGT', 'nt', 'blastn')
+            self.assertEqual(bc.search('ACGT', 'nt', 'blastn'), (request_id, '0'))
+            # Search expired at NCBI
+            server._submissions.clear()
+            with self.assertRaises(ValueError):
+                bc.wait_for_results(request_id, 0, format_type='Text')
+            self.assertNotEqual(bc.search('ACGT', 'nt', 'blastn')[0], request_id)
+            self.assertEqual(server.requests['Put'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import concurrent.futures
+import os
+import tempfile
+import threading
+import time
+import unittest
+import zipfile
+
+from BlastApi import BlastClient
+from BlastApi.SingleFlight import SingleFlight, request_key
+from BlastApi.Transport.SessionTransport import SessionTransport
+from tests.FakeBlastServer import FakeBlastServer
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_do_coalesces(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def function():
+            calls.append(1)
+            release.wait(5)
+            return 'result'
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(single_flight.do, {'CMD': 'Get', 'RID': 'R1'}, function) for _ in range(5)]
+            time.sleep(0.2)
+            release.set()
+            self.assertEqual([future.result() for future in futures], ['result'] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(single_flight.calls, 1)
+        self.assertEqual(single_flight.coalesced, 4)
+
+        # Finished calls aren't remembered
+        self.assertEqual(single_flight.do({'RID': 'R1', 'CMD': 'Get'}, lambda: 'next'), 'next')
+        self.assertEqual(single_flight.calls, 2)
+
+    def test_do_exception(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+
+        def function():
+            release.wait(5)
+            raise ConnectionError('failed')
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(single_flight.do, {'RID': 'R1'}, function) for _ in range(3)]
+            time.sleep(0.2)
+            release.set()
+            for future in futures:
+                self.assertRaises(ConnectionError, future.result)
+        self.assertEqual(single_flight.calls, 1)
+        self.assertEqual(single_flight.do({'RID': 'R1'}, lambda: 'retried'), 'retried')
+
+    def test_request_key(self):
+        self.assertEqual(request_key({'CMD': 'Get', 'RID': 'R1'}), request_key({'RID': 'R1', 'CMD': 'Get'}))
+        self.assertNotEqual(request_key({'CMD': 'Get', 'RID': 'R1'}), request_key({'CMD': 'Get', 'RID': 'R2'}))
+
+    def test_ready_status(self):
+        single_flight = SingleFlight(ready_ttl=0.2, max_request_ids=2)
+        single_flight.remember_status('R1', 'WAITING')
+        self.assertIsNone(single_flight.ready_status('R1'))
+        single_flight.remember_status('R1', 'READY')
+        self.assertEqual(single_flight.ready_status('R1'), 'READY')
+        single_flight.remember_status('R2', 'READY')
+        single_flight.remember_status('R3', 'READY')
+        self.assertIsNone(single_flight.ready_status('R1'))
+        self.assertEqual(single_flight.ready_status('R3'), 'READY')
+        time.sleep(0.3)
+        self.assertIsNone(single_flight.ready_status('R3'))
+
+        single_flight = SingleFlight(ready_ttl=0)
+        single_flight.remember_status('R1', 'READY')
+        self.assertIsNone(single_flight.ready_status('R1'))
+
+
+class SingleFlightClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeBlastServer(latency=0.2)
+        self.server.start()
+        self.single_flight = SingleFlight()
+        self.bc = BlastClient(transport=SessionTransport(pool_maxsize=10), endpoints=[self.server.url],
+                              single_flight=self.single_flight)
+        self.request_id, _ = self.bc.search('ACGT', 'nt', 'blastn')
+
+    def tearDown(self):
+        self.bc.close()
+        self.server.stop()
+
+    def test_status(self):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+            statuses = list(executor.map(self.bc.check_submission_status, [self.request_id] * 5))
+        self.assertEqual(statuses, ['READY'] * 5)
+        self.assertEqual(self.server.requests['SearchInfo'], 1)
+
+        # READY status is remembered
+        self.assertEqual(self.bc.check_submission_status(self.request_id), 'READY')
+        self.assertEqual(self.server.requests['SearchInfo'], 1)
+
+    def test_results(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.zip')
+            with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+                futures = [executor.submit(self.bc.get_results, self.request_id, format_type='XML2',
+                                           results_file_path=path) for _ in range(5)]
+                results = [future.result() for future in futures]
+            self.assertEqual(results, [path] * 5)
+            self.assertEqual(self.server.requests['Get'], 1)
+            self.assertTrue(zipfile.is_zipfile(path))
+
+        # Buffers aren't shared
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            buffers = list(executor.map(
+                lambda _: self.bc.get_results(self.request_id, format_type='Text', as_buffer=True), range(2)))
+        self.assertIsNot(buffers[0], buffers[1])
+        self.assertEqual(buffers[0].getvalue(), buffers[1].getvalue())
+        self.assertEqual(self.server.requests['Get'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
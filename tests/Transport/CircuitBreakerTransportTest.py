@@ -0,0 +1,112 @@
+import threading
+import time
+import unittest
+
+from BlastApi.Transport import BlastTransport
+from BlastApi.Transport.CircuitBreakerTransport import CircuitBreakerTransport
+
+
+class ResponseMock:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FailingTransportMock(BlastTransport):
+    def __init__(self):
+        self.outcomes = []
+        self.requests = 0
+
+    def get(self, url, params, *, stream=False, headers=None):
+        self.requests += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else 200
+        if isinstance(outcome, Exception):
+            raise outcome
+        if isinstance(outcome, threading.Event):
+            # Slow request succeeding once the event is set
+            outcome.wait(5)
+            outcome = 200
+        return ResponseMock(outcome)
+
+
+class CircuitBreakerTransportTest(unittest.TestCase):
+    def test_open(self):
+        transport = FailingTransportMock()
+        breaker = CircuitBreakerTransport(transport, failure_threshold=3, reset_timeout=0.2)
+        transport.outcomes = [503, ConnectionError('failed'), 200, 429, 500]
+        self.assertEqual(breaker.get('a', {}).status_code, 503)
+        self.assertRaises(ConnectionError, breaker.get, 'a', {})
+        # Success resets consecutive failures
+        breaker.get('a', {})
+        breaker.get('a', {})
+        self.assertEqual(breaker.state('a'), 'closed')
+        breaker.get('a', {})
+        self.assertEqual(breaker.state('a'), 'closed')
+        transport.outcomes = [TimeoutError('timed out')]
+        self.assertRaises(TimeoutError, breaker.get, 'a', {})
+        self.assertEqual(breaker.state('a'), 'open')
+
+        # Open circuit fails fast, other URLs aren't affected
+        requests = transport.requests
+        self.assertRaises(ConnectionError, breaker.get, 'a', {})
+        self.assertEqual(transport.requests, requests)
+        self.assertEqual(breaker.rejected, 1)
+        self.assertEqual(breaker.get('b', {}).status_code, 200)
+
+    def test_half_open(self):
+        transport = FailingTransportMock()
+        breaker = CircuitBreakerTransport(transport, failure_threshold=1, reset_timeout=0.1)
+        transport.outcomes = [500]
+        breaker.get('a', {})
+        self.assertEqual(breaker.state('a'), 'open')
+        time.sleep(0.15)
+        self.assertEqual(breaker.state('a'), 'half-open')
+
+        # Failed trial opens the circuit again
+        transport.outcomes = [500]
+        breaker.get('a', {})
+        self.assertEqual(breaker.state('a'), 'open')
+        self.assertRaises(ConnectionError, breaker.get, 'a', {})
+        time.sleep(0.15)
+        breaker.get('a', {})
+        self.assertEqual(breaker.state('a'), 'closed')
+
+        with self.assertRaises(ValueError):
+            CircuitBreakerTransport(transport, failure_threshold=0)
+
+
+    def test_slow_requests(self):
+        transport = FailingTransportMock()
+        breaker = CircuitBreakerTransport(transport, failure_threshold=1, reset_timeout=0.1)
+        first, second = threading.Event(), threading.Event()
+        transport.outcomes = [first, second]
+        threads = [threading.Thread(target=breaker.get, args=('a', {})) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        transport.outcomes = [500]
+        breaker.get('a', {})
+        self.assertEqual(breaker.state('a'), 'open')
+
+        # Success of request sent before the circuit opened doesn't close it
+        first.set()
+        threads[0].join()
+        self.assertEqual(breaker.state('a'), 'open')
+
+        # Nor does it count as finished trial of half-open circuit
+        time.sleep(0.15)
+        trial = threading.Event()
+        transport.outcomes = [trial]
+        trial_thread = threading.Thread(target=breaker.get, args=('a', {}))
+        trial_thread.start()
+        time.sleep(0.05)
+        second.set()
+        threads[1].join()
+        self.assertEqual((breaker.state('a'), breaker._circuits['a'].trials), ('half-open', 1))
+        self.assertRaises(ConnectionError, breaker.get, 'a', {})
+        trial.set()
+        trial_thread.join()
+        self.assertEqual(breaker.state('a'), 'closed')
+
+
+if __name__ == '__main__':
+    unittest.main()
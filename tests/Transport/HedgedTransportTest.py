@@ -0,0 +1,110 @@
+import threading
+import time
+import unittest
+
+from BlastApi import BlastClient
+from BlastApi.Transport import BlastTransport
+from BlastApi.Transport.HedgedTransport import HedgedTransport
+from BlastApi.Transport.SessionTransport import SessionTransport
+from tests.FakeBlastServer import FakeBlastServer
+
+_STATUS = {'CMD': 'Get', 'FORMAT_OBJECT': 'SearchInfo', 'RID': 'R1'}
+
+
+class ResponseMock:
+    def __init__(self, number):
+        self.number = number
+        self.status_code = 200
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class DelayedTransportMock(BlastTransport):
+    def __init__(self, delays):
+        r"""Returns responses numbered by request order, request is delayed by the next of delays (or fails if the
+        delay is an exception)."""
+        self.delays = list(delays)
+        self.responses = []
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def get(self, url, params, *, stream=False, headers=None):
+        with self._lock:
+            delay = self.delays.pop(0) if self.delays else 0
+            response = ResponseMock(len(self.responses) + 1)
+            self.responses.append(response)
+        if isinstance(delay, Exception):
+            raise delay
+        time.sleep(delay)
+        return response
+
+    def close(self):
+        self.closed = True
+
+
+class HedgedTransportTest(unittest.TestCase):
+    def test_hedge(self):
+        transport = DelayedTransportMock([1, 0])
+        hedged = HedgedTransport(transport, max_delay=0.1)
+        start = time.monotonic()
+        response = hedged.get('url', _STATUS)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(response.number, 2)
+        self.assertEqual((hedged.requests, hedged.hedges, hedged.hedge_wins), (1, 1, 1))
+        time.sleep(1)
+        # Response of the slower request is closed when it arrives
+        self.assertTrue(transport.responses[0].closed)
+        self.assertFalse(response.closed)
+        hedged.close()
+        self.assertTrue(transport.closed)
+
+    def test_not_hedged(self):
+        transport = DelayedTransportMock([0.2, 0.2])
+        hedged = HedgedTransport(transport, max_delay=0.05)
+        self.assertEqual(hedged.get('url', {'CMD': 'Put', 'QUERY': 'ACGT'}).number, 1)
+        self.assertEqual(hedged.get('url', {'CMD': 'Get', 'RID': 'R1', 'FORMAT_TYPE': 'XML2'}).number, 2)
+        self.assertEqual((hedged.requests, hedged.hedges), (0, 0))
+
+        transport = DelayedTransportMock([0.3, 0.3])
+        hedged = HedgedTransport(transport, max_delay=0.05, max_hedges=0)
+        self.assertEqual(hedged.get('url', _STATUS).number, 1)
+        self.assertEqual(len(transport.responses), 1)
+
+        with self.assertRaises(ValueError):
+            HedgedTransport(transport, operations=('submit',))
+
+    def test_errors(self):
+        # Failed request doesn't fail hedged call while the other one may succeed
+        transport = DelayedTransportMock([0.2, ConnectionError('failed')])
+        hedged = HedgedTransport(transport, max_delay=0.05)
+        self.assertEqual(hedged.get('url', _STATUS).number, 1)
+
+        transport = DelayedTransportMock([ConnectionError('failed')])
+        hedged = HedgedTransport(transport, max_delay=1)
+        self.assertRaises(ConnectionError, hedged.get, 'url', _STATUS)
+        self.assertEqual(hedged.hedges, 0)
+
+    def test_delay(self):
+        hedged = HedgedTransport(None, min_delay=0.01, max_delay=1, min_samples=10, percentile=90)
+        self.assertEqual(hedged.delay('status'), 1)
+        hedged._latencies['status'].extend(number / 100 for number in range(1, 11))
+        self.assertAlmostEqual(hedged.delay('status'), 0.09)
+        hedged._latencies['status'].extend([5] * 20)
+        self.assertEqual(hedged.delay('status'), 1)
+
+    def test_client(self):
+        with FakeBlastServer(stall_rate=0.3, stall_time=2, seed=1) as server:
+            hedged = HedgedTransport(SessionTransport(), min_delay=0.05, max_delay=0.2, max_hedges=2)
+            with BlastClient(transport=hedged, endpoints=[server.url]) as bc:
+                request_id, _ = bc.search('ACGT', 'nt', 'blastn')
+                start = time.monotonic()
+                for _ in range(10):
+                    self.assertEqual(bc.check_submission_status(request_id), 'READY')
+                self.assertLess(time.monotonic() - start, 2)
+                self.assertGreater(hedged.hedge_wins, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import threading
+import time
+import unittest
+
+import requests
+
+from BlastApi import BlastClient
+from BlastApi.Transport.SessionTransport import SessionTransport
+from tests.FakeBlastServer import FakeBlastServer
+
+
+class SessionTransportTest(unittest.TestCase):
+    def test_adapter_configuration(self):
+        transport = SessionTransport(pool_connections=4, pool_maxsize=32, max_retries=5, backoff_factor=1)
+        self.assertEqual(transport.adapter._pool_maxsize, 32)
+        self.assertEqual(transport.adapter._pool_connections, 4)
+        self.assertEqual(transport.adapter.max_retries.total, 5)
+        self.assertEqual(transport.adapter.max_retries.backoff_factor, 1)
+        transport.close()
+
+    def test_sessions_share_connection_pool(self):
+        transport = SessionTransport()
+        sessions = []
+
+        def collect():
+            sessions.append(transport._session())
+
+        threads = [threading.Thread(target=collect) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(session) for session in sessions}), 4)
+        for session in sessions:
+            self.assertIs(session.get_adapter('https://blast.ncbi.nlm.nih.gov'), transport.adapter)
+            self.assertEqual(session.headers['Connection'], 'keep-alive')
+        self.assertIs(transport._session(), transport._session())
+        transport.close()
+        self.assertEqual(transport._sessions, [])
+
+    def test_timeouts(self):
+        with FakeBlastServer(latency=0.3) as server:
+            transport = SessionTransport(max_retries=0, timeout=5, timeouts={'status': 0.1})
+            status = {'CMD': 'Get', 'FORMAT_OBJECT': 'SearchInfo', 'RID': 'R1'}
+            self.assertRaises(requests.exceptions.RequestException, transport.get, server.url, status)
+            self.assertEqual(transport.get(server.url, {'CMD': 'Put', 'QUERY': 'ACGT'}).status_code, 200)
+            transport.close()
+        self.assertEqual(SessionTransport().timeouts, {'status': (3.05, 15)})
+
+    def test_submission_not_retried(self):
+        with FakeBlastServer(latency=0.3) as server:
+            with BlastClient(transport=SessionTransport(timeouts={'submit': 0.1}), endpoints=[server.url]) as bc:
+                self.assertRaises(requests.exceptions.RequestException, bc.search, 'ACGT', 'nt', 'blastn')
+            # Server counts requests after the latency
+            time.sleep(1)
+            self.assertEqual(server.requests['Put'], 1)
+
+        with FakeBlastServer(failure_rate=1.0) as server:
+            with BlastClient(transport=SessionTransport(backoff_factor=0), endpoints=[server.url]) as bc:
+                self.assertRaises(Exception, bc.search, 'ACGT', 'nt', 'blastn')
+                self.assertRaises(Exception, bc.check_submission_status, 'R1')
+            self.assertEqual(server.requests['Put'], 1)
+            # Status checks are still retried
+            self.assertEqual(server.requests['SearchInfo'], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,17 @@
+import tests
+from BlastApi.Transport import BlastTransport
+
+
+class TransportMock(BlastTransport):
+    def __init__(self) -> None:
+        self.closed = False
+        self.requests = []
+        self.urls = []
+
+    def get(self, url, params, *, stream=False, headers=None):
+        self.requests.append(dict(params))
+        self.urls.append(url)
+        return tests.get(url, params)
+
+    def close(self):
+        self.closed = True
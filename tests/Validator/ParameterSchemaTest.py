@@ -0,0 +1,42 @@
+import unittest
+
+from BlastApi.Validator.BlastResultsValidator import RESULTS_SCHEMA, BlastResultsValidator
+from BlastApi.Validator.BlastSearchValidator import SEARCH_SCHEMA, BlastSearchValidator
+from tests.Validator.TestCase import _INVALID_ERROR, _NOT_EMPTY_ERROR, _NOT_NONE_ERROR
+
+
+class ParameterSchemaTest(unittest.TestCase):
+    def test_build_search_params(self):
+        arguments = {'self': object(), 'query': 'ACGT', 'database': 'nt', 'program': 'blastn', 'gapcosts': (11, 1),
+                     'expect': 10, 'matrix': None, 'filter': '', 'composition_based_statistics': 0,
+                     'estimated_time': 5}
+        self.assertEqual(SEARCH_SCHEMA.build(arguments), {'QUERY': 'ACGT', 'DATABASE': 'nt', 'PROGRAM': 'blastn',
+                                                          'GAPCOSTS': '11 1', 'EXPECT': 10})
+        self.assertEqual(SEARCH_SCHEMA.build({'gapcosts': '5 2'}), {'GAPCOSTS': '5 2'})
+
+    def test_build_results_params(self):
+        arguments = {'self': object(), 'request_id': '1337', 'estimated_time': 10, 'format_type': 'XML2',
+                     'hitlist_size': None, 'results_file_path': 'results.zip'}
+        self.assertEqual(RESULTS_SCHEMA.build(arguments), {'RID': '1337', 'FORMAT_TYPE': 'XML2',
+                                                           'RESULTS_FILE_PATH': 'results.zip'})
+
+    def test_errors_order(self):
+        params = {'QUERY': '', 'PROGRAM': 'xyz', 'GAPCOSTS': 'a b', 'EXPECT': 0, 'NCBI_GI': 'X'}
+        self.assertFalse(SEARCH_SCHEMA.is_valid(params))
+        self.assertEqual(SEARCH_SCHEMA.validate(params), [
+            _NOT_EMPTY_ERROR.format('query'), _NOT_NONE_ERROR.format('database'), _INVALID_ERROR.format('program'),
+            _INVALID_ERROR.format('expect'), _INVALID_ERROR.format('gapcosts'), _INVALID_ERROR.format('ncbi_gi')])
+        self.assertTrue(SEARCH_SCHEMA.is_valid({'QUERY': 'ACGT', 'DATABASE': 'nt', 'PROGRAM': 'blastn',
+                                                'CMD': 'Put', 'EXPECT': None}))
+
+    def test_validate_many(self):
+        valid = {'QUERY': 'ACGT', 'DATABASE': 'nt', 'PROGRAM': 'blastn'}
+        params_sets = [valid] * 1000 + [dict(valid, PROGRAM='xyz')] + [valid] * 10 + [dict(valid, QUERY='')]
+        self.assertEqual(list(BlastSearchValidator().validate_many(iter(params_sets))),
+                         [(1000, [_INVALID_ERROR.format('program')]), (1011, [_NOT_EMPTY_ERROR.format('query')])])
+        self.assertEqual(list(BlastResultsValidator().validate_many([{'RID': '1'}, {'FORMAT_OBJECT': 'x'}])),
+                         [(1, [_INVALID_ERROR.format('format_object')])])
+
+
+if __name__ == '__main__':
+    unittest.main()
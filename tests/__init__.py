@@ -4,6 +4,15 @@ _PARAMS = None
 class Response:
     def __init__(self, text) -> None:
         self.text = text
+        self.content = text.encode('utf-8')
+        self.closed = False
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        self.closed = True
 
 
 def toggle_params(params=None):